@@ -32,7 +32,12 @@ def _get(path: str) -> Optional[dict]:
 # ---- Public APIs ----
 
 def save_rule(rule_json: dict) -> Optional[dict]:
-    return _post("/save_rule", rule_json)
+    # Imported here so MCP clients don't pull in pymongo/mcp.db at import time
+    from agents.rule_classification_agent import invalidate_city_cache
+
+    res = _post("/save_rule", rule_json)
+    invalidate_city_cache(rule_json.get("city"))
+    return res
 
 def list_rules() -> List[dict]:
     res = _get("/list_rules")
@@ -1,7 +1,7 @@
 # agents/calculator_agent.py
 import logging
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from agents.agent_clients import (
     get_rules_for_city,
     log_geometry,
@@ -32,13 +32,58 @@ def _evaluate_height_condition(parsed_height, subject_height_m: float) -> bool:
         return subject_height_m == val
     return False
 
+def _log_subject_geometry(city: str, subject: Dict[str, Any], status: str, case_id: str) -> Optional[str]:
+    """
+    Render the subject building as GLB and upload it to MCP under case_id.
+    Returns the uploaded file path or None on failure.
+    """
+    geometry_spec = {
+        "parameters": {
+            "height_m": subject.get("height_m", 20),
+            "width_m": subject.get("width_m", 30),
+            "depth_m": subject.get("depth_m", 20),
+            "setback_m": subject.get("setback_m", 3),
+            "floor_height_m": subject.get("floor_height_m", 3),
+            "type": subject.get("type", "residential"),
+            "fsi": subject.get("fsi")
+        },
+        "status": status
+    }
+    geom_path = None
+    try:
+        geom_path = json_to_glb(
+            json_path=f"{case_id}.json",  # Naming hint only
+            output_dir="outputs/geometry",
+            spec_data=geometry_spec,
+        )
+        log_geometry(
+            case_id,
+            geom_path,
+            metadata={"city": city, "source": "calculator_agent", "status": status},
+            include_file_blob=True,
+        )
+        logging.info("✅ Generated 3D geometry for %s: %s", case_id, geom_path)
+        return geom_path
+    except Exception as e:
+        logging.error("Failed to generate geometry for %s: %s", case_id, e)
+        return None
+    finally:
+        if geom_path and os.path.exists(geom_path):
+            try:
+                os.remove(geom_path)
+            except OSError:
+                logging.debug("Could not remove temp geometry %s", geom_path)
+
 def calculator_agent(city: str, subject: Dict[str, Any]) -> List[Dict[str,Any]]:
     """
     subject: dict with properties to check, e.g. {"height_m": 20, "fsi": 2.2}
-    Returns outputs and logs geometry file references in MCP.
+    Returns outputs and logs geometry file references in MCP under each rule's case id.
+    The GLB is uploaded once per compliance status, with the first rule of that status;
+    later rules log a reference to it and every outcome names it in geometry_case_id.
     """
     rules = get_rules_for_city(city)
     outputs = []
+    statuses = []
 
     for r in rules:
         rule_obj = r.get("rule", r)  # some endpoints return wrapped
@@ -66,46 +111,39 @@ def calculator_agent(city: str, subject: Dict[str, Any]) -> List[Dict[str,Any]]:
             outcome["checks"]["fsi"] = {"ok": None, "rule": fsi_rule, "subject": subject.get("fsi")}
 
         outputs.append(outcome)
+        statuses.append(
+            "compliant" if all(c.get("ok") for c in outcome["checks"].values() if c.get("ok") is not None) else "non-compliant"
+        )
+
+    # Geometry depends only on the subject and compliance status: render and upload
+    # once per status, then log the other rules as references to that upload
+    geometry_refs = {}
+    for r, outcome, status in zip(rules, outputs, statuses):
+        case_id = r.get("id") or (outcome.get("clause_no") or "unknown")
+        if status not in geometry_refs:
+            geom_path = _log_subject_geometry(city, subject, status, case_id)
+            geometry_refs[status] = (case_id, geom_path) if geom_path else None
+            outcome["geometry_case_id"] = case_id if geom_path else None
+            continue
+        if geometry_refs[status] is None:
+            outcome["geometry_case_id"] = None
+            continue
 
-        # Create realistic 3D geometry from the rule and subject data
-        case_id = r.get("id") or (rule_obj.get("clause_no") or "unknown")
-        
-        # Build spec data for geometry generation
-        geometry_spec = {
-            "parameters": {
-                "height_m": subject.get("height_m", 20),
-                "width_m": subject.get("width_m", 30),
-                "depth_m": subject.get("depth_m", 20),
-                "setback_m": subject.get("setback_m", 3),
-                "floor_height_m": subject.get("floor_height_m", 3),
-                "type": subject.get("type", "residential"),
-                "fsi": subject.get("fsi")
-            },
-            "status": "compliant" if all(c.get("ok") for c in outcome["checks"].values() if c.get("ok") is not None) else "non-compliant"
-        }
-        
-        geom_path = None
+        geometry_case_id, geom_path = geometry_refs[status]
+        outcome["geometry_case_id"] = geometry_case_id
         try:
-            geom_path = json_to_glb(
-                json_path=f"{case_id}.json",  # Naming hint only
-                output_dir="outputs/geometry",
-                spec_data=geometry_spec,
-            )
             log_geometry(
                 case_id,
                 geom_path,
-                metadata={"city": city, "source": "calculator_agent"},
-                include_file_blob=True,
+                metadata={
+                    "city": city,
+                    "source": "calculator_agent",
+                    "status": status,
+                    "geometry_case_id": geometry_case_id,
+                },
             )
-            logging.info("✅ Generated 3D geometry for %s: %s", case_id, geom_path)
         except Exception as e:
-            logging.error("Failed to generate geometry for %s: %s", case_id, e)
-        finally:
-            if geom_path and os.path.exists(geom_path):
-                try:
-                    os.remove(geom_path)
-                except OSError:
-                    logging.debug("Could not remove temp geometry %s", geom_path)
+            logging.error("Failed to log geometry reference for %s: %s", case_id, e)
 
     summary_case_id = f"{city}_calc_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
     try:
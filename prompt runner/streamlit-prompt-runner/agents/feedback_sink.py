@@ -0,0 +1,284 @@
+# agents/feedback_sink.py
+"""
+Buffered feedback sink.
+
+``submit`` only enqueues in memory and returns a ticket; a single background
+writer drains the queue in batches and hands each batch to a handler (which
+forwards to MCP/CreatorCore and appends to the local logs). Callers that need
+the handler's result can ``ticket.wait()``.
+
+Also provides the O(1) persistence helpers the handler uses: in-place appends
+to a JSON array file, JSON-lines appends, and incremental feedback counters;
+plus the (throttled, O(n)) rendering of a JSON-lines log into a JSON report.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("FeedbackSink")
+
+FEEDBACK_BATCH_SIZE = int(os.getenv("RL_FEEDBACK_BATCH_SIZE", "100"))
+FEEDBACK_FLUSH_INTERVAL = float(os.getenv("RL_FEEDBACK_FLUSH_INTERVAL", "0.5"))  # seconds
+FEEDBACK_MAX_QUEUE = int(os.getenv("RL_FEEDBACK_MAX_QUEUE", "100000"))
+
+
+class FeedbackTicket:
+    """Handle for one submitted item; ``wait`` returns the handler's result for it."""
+
+    __slots__ = ("item", "result", "_done")
+
+    def __init__(self, item: Dict[str, Any]):
+        self.item = item
+        self.result: Any = None
+        self._done = threading.Event()
+
+    def set_result(self, result: Any):
+        self.result = result
+        self._done.set()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        self._done.wait(timeout)
+        return self.result
+
+
+class FeedbackSink:
+    """
+    In-memory queue drained by one background writer thread.
+
+    Args:
+        handler: Called with a batch of items, returns one result per item
+        batch_size: Maximum items per handler call
+        flush_interval: How long the writer waits to fill a batch
+        max_queue: Queue bound; ``submit`` blocks (back-pressure) when full
+    """
+
+    def __init__(self, handler: Callable[[List[Dict[str, Any]]], List[Any]],
+                 batch_size: int = FEEDBACK_BATCH_SIZE,
+                 flush_interval: float = FEEDBACK_FLUSH_INTERVAL,
+                 max_queue: int = FEEDBACK_MAX_QUEUE):
+        self.handler = handler
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[FeedbackTicket]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "processed": 0, "failed": 0, "batches": 0}
+        # Don't drop acknowledged feedback on interpreter exit
+        atexit.register(self.flush, 10)
+
+    def _ensure_writer(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="feedback-sink", daemon=True)
+                self._thread.start()
+
+    def submit(self, item: Dict[str, Any]) -> FeedbackTicket:
+        """Enqueue an item and return immediately."""
+        self._ensure_writer()
+        ticket = FeedbackTicket(item)
+        self._queue.put(ticket)
+        with self._lock:
+            self._stats["submitted"] += 1
+        return ticket
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything submitted so far has been handled."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, queued=self._queue.qsize())
+
+    def _next_batch(self) -> List[FeedbackTicket]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                results = self.handler([t.item for t in batch])
+                failed = 0
+            except Exception as e:
+                logger.exception("Feedback batch of %d failed: %s", len(batch), e)
+                results, failed = [None] * len(batch), len(batch)
+            for ticket, result in zip(batch, results):
+                ticket.set_result(result)
+            with self._lock:
+                self._stats["batches"] += 1
+                self._stats["processed"] += len(batch) - failed
+                self._stats["failed"] += failed
+            for _ in batch:
+                self._queue.task_done()
+
+
+# ---------- Persistence helpers ----------
+def _indent_json(record: Dict[str, Any]) -> str:
+    return "  " + json.dumps(record, indent=2).replace("\n", "\n  ")
+
+
+def append_to_json_array(path: str, records: List[Dict[str, Any]]):
+    """
+    Append records to a file holding one JSON array without rewriting it:
+    the closing bracket is overwritten in place. Falls back to a full rewrite
+    if the file is not a JSON array.
+    """
+    if not records:
+        return
+    body = ",\n".join(_indent_json(r) for r in records)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[\n" + body + "\n]")
+        return
+
+    with open(path, "rb+") as f:
+        head = f.read(64).lstrip()
+        size = f.seek(0, os.SEEK_END)
+        tail_start = max(0, size - 4096)
+        f.seek(tail_start)
+        tail = f.read()
+        close = tail.rfind(b"]")
+        if head.startswith(b"[") and close != -1 and not tail[close + 1:].strip():
+            empty = tail[:close].rstrip().endswith(b"[")
+            f.seek(tail_start + close)
+            f.truncate()
+            f.write(((b"\n" if empty else b",\n") + body.encode("utf-8") + b"\n]"))
+            return
+
+    logger.warning("%s is not a JSON array; rewriting it", path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            existing = json.load(f)
+    except Exception:
+        existing = []
+    if not isinstance(existing, list):
+        existing = []
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(existing + records, f, indent=2)
+
+
+def append_jsonl(path: str, records: Iterable[Dict[str, Any]]):
+    """Append one JSON document per line."""
+    lines = "".join(json.dumps(r) + "\n" for r in records)
+    if lines:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+def _read_json_object(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def seed_jsonl_from_report(jsonl_path: str, report_path: str, key: str):
+    """One-time import of a JSON report's ``key`` list into a JSON-lines log that does not exist yet."""
+    if os.path.exists(jsonl_path):
+        return
+    records = _read_json_object(report_path).get(key)
+    if records:
+        os.makedirs(os.path.dirname(jsonl_path) or ".", exist_ok=True)
+        append_jsonl(jsonl_path, records)
+
+
+def render_jsonl_report(jsonl_path: str, report_path: str, key: str):
+    """
+    Rewrite ``key`` of a JSON object report as the records of a JSON-lines log,
+    keeping the report's other fields. Reads the whole log, so callers throttle it.
+    """
+    report = _read_json_object(report_path)
+    records = []
+    if os.path.exists(jsonl_path):
+        with open(jsonl_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    report[key] = records
+    tmp_path = f"{report_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, report_path)
+
+
+class FeedbackCounters:
+    """Running up/down totals per case and per city, updated one record at a time."""
+
+    def __init__(self):
+        self.per_case: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        self.per_city: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        self.total = 0
+        self.core_success = 0
+
+    def add(self, case_id: str, city: str, feedback: str, core_success: bool = False):
+        idx = 0 if feedback == "up" else 1
+        self.per_case[case_id][idx] += 1
+        self.per_city[city][idx] += 1
+        self.total += 1
+        self.core_success += int(bool(core_success))
+
+    def seed(self, case_id: str, entries: Iterable[Dict[str, Any]]):
+        """Count a case's history persisted elsewhere (e.g. MCP) that is not in the local log."""
+        for e in entries:
+            fb = e.get("feedback") or e.get("user_feedback")
+            if fb in ("up", "down"):
+                self.per_case[case_id][0 if fb == "up" else 1] += 1
+
+    def case_history_size(self, case_id: str) -> int:
+        return sum(self.per_case.get(case_id, (0, 0)))
+
+    def case_confidence(self, case_id: str) -> float:
+        """Same score as the old list-based calculation: (up - down) / n."""
+        up, down = self.per_case.get(case_id, (0, 0))
+        return round((up - down) / (up + down), 2) if up + down else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "total_feedback": self.total,
+            "core_success_count": self.core_success,
+            "cases": len(self.per_case),
+            "cities": {city: {"up": up, "down": down} for city, (up, down) in self.per_city.items()},
+        }
+
+    @classmethod
+    def from_jsonl(cls, path: str) -> "FeedbackCounters":
+        """Rebuild counters from a feedback JSON-lines log (once, at writer start-up)."""
+        counters = cls()
+        if not os.path.exists(path):
+            return counters
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    e = json.loads(line)
+                except ValueError:
+                    continue
+                counters.add(e.get("case_id"), e.get("city"), "up" if e.get("feedback", 0) > 0 else "down", e.get("success"))
+        return counters
+
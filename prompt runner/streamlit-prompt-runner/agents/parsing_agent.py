@@ -1,8 +1,8 @@
 """
 Parsing Agent (production-ready)
 --------------------------------
-- Extracts text from PDFs using fitz/pdfplumber
-- Detects clauses, classifies rules, and extracts numeric info
+- Extracts page text from PDFs using fitz/pdfplumber on a process pool (utils.pdf_pages)
+- Streams clause detection over page text (utils.clause_segmenter), classifies rules, and extracts numeric info
 - Pushes data to MongoDB Atlas (MCP)
 - Saves parsed JSON locally
 
@@ -10,17 +10,17 @@ Environment variables:
 - MONGO_URI : MongoDB Atlas connection string (required)
 - MONGO_DB  : MongoDB database name (default: mcp_database)
 - PARSED_OUTPUT_DIR : optional local folder to save json outputs (default: data/parsed)
+- PDF_TEXT_CACHE_DIR / PDF_EXTRACT_WORKERS : page text cache and extraction processes (utils.pdf_pages)
 
 Usage (CLI):
 python agents/parsing_agent.py "path/to/file.pdf" "Mumbai"
 """
 #parsing_agent.py
 import os
-import re
 import json
 import logging
 from datetime import datetime
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Iterator, Tuple
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -43,18 +43,14 @@ if not MONGO_URI:
     raise EnvironmentError("❌ MONGO_URI environment variable must be set to your MongoDB Atlas URI.")
 
 # ---------------- IMPORTS ----------------
-try:
-    import fitz  # PyMuPDF
-except Exception:
-    fitz = None
-try:
-    import pdfplumber
-except Exception:
-    pdfplumber = None
-
 from pymongo import MongoClient
 import certifi
 
+from mcp.db import bulk_insert
+from utils.clause_segmenter import iter_clauses
+from utils.pdf_pages import iter_pdf_pages
+from utils.rule_classifier import rule_fields
+
 # ---------------- LOGGING ----------------
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("ParsingAgent")
@@ -71,106 +67,44 @@ except Exception as e:
     raise ConnectionError(f"❌ Failed to connect to MongoDB Atlas: {e}")
 
 # ---------------- TEXT EXTRACTION ----------------
+def iter_page_text(pdf_path: str) -> Iterator[Tuple[int, str]]:
+    """Non-empty pages (sharded across processes, cached by file hash) with page markers."""
+    for pno, txt in iter_pdf_pages(pdf_path):
+        if txt.strip():
+            yield pno, f"--- PAGE {pno} ---\n" + txt
+
+
 def extract_text_from_pdf(pdf_path: str) -> str:
-    if not os.path.exists(pdf_path):
-        raise FileNotFoundError(pdf_path)
-
-    text_parts: List[str] = []
-
-    if fitz:
-        try:
-            doc = fitz.open(pdf_path)
-            for pno in range(len(doc)):
-                page = doc.load_page(pno)
-                txt = page.get_text("text") or ""
-                if txt.strip():
-                    text_parts.append(f"--- PAGE {pno+1} ---\n" + txt)
-            if text_parts:
-                logger.info("Extracted text using PyMuPDF (fitz).")
-                return "\n\n".join(text_parts)
-        except Exception as e:
-            logger.warning("fitz extraction failed: %s", e)
-
-    if pdfplumber:
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for idx, p in enumerate(pdf.pages):
-                    txt = p.extract_text() or ""
-                    if txt.strip():
-                        text_parts.append(f"--- PAGE {idx+1} ---\n" + txt)
-            if text_parts:
-                logger.info("Extracted text using pdfplumber.")
-                return "\n\n".join(text_parts)
-        except Exception as e:
-            logger.warning("pdfplumber extraction failed: %s", e)
+    text_parts: List[str] = [txt for _, txt in iter_page_text(pdf_path)]
+    if text_parts:
+        return "\n\n".join(text_parts)
 
     logger.warning("⚠️ No text extracted — possibly scanned PDF (image only).")
     return ""
 
 # ---------------- CLAUSE DETECTION ----------------
-CLAUSE_RE = re.compile(
-    r"(?:Clause|Section)\s*([0-9]+(?:\.[0-9]+)*)\s*[:.\-]?\s*(.*?)\n(?=(?:Clause|Section|\d+\.)|\Z)",
-    re.IGNORECASE | re.DOTALL,
-)
-HEADING_RE = re.compile(r"(^\d+(?:\.\d+)*\s*[).:-]\s*(.+))", re.MULTILINE)
-
 def find_clauses(text: str) -> List[Dict[str, Any]]:
-    rules: List[Dict[str, Any]] = []
     if not text:
-        return rules
-    t = text.replace("\r\n", "\n")
-
-    for m in CLAUSE_RE.finditer(t):
-        clause_no = m.group(1).strip()
-        clause_text = m.group(2).strip()
-        if clause_text:
-            rules.append({"clause_no": clause_no, "text": clause_text})
-
-    if not rules:
-        for m in HEADING_RE.finditer(t):
-            raw = m.group(1).strip()
-            parts = re.split(r"\s*[).:-]\s*", raw, maxsplit=1)
-            if len(parts) == 2:
-                rules.append({"clause_no": parts[0].strip(), "text": parts[1].strip()})
-
-    if not rules:
-        paras = [p.strip() for p in t.split("\n\n") if p.strip()]
-        for p in paras:
-            if len(p) > 60:
-                rules.append({"clause_no": None, "text": p})
-
-    return rules
+        return []
+    return list(iter_clauses([(None, text)]))
 
-# ---------------- CLASSIFICATION ----------------
-METER_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:m|meter|metre|meters|metres)\b", re.IGNORECASE)
-FSI_RE = re.compile(r"(?:FSI|F\.S\.I|floor space index)\s*(?:[:=]|\s)?\s*([\d\.]+)", re.IGNORECASE)
-SETBACK_RE = re.compile(r"setback[s]?\s*(?:[:=]|\s)?\s*(\d+(?:\.\d+)?)\s*(?:m|meter|metre)?", re.IGNORECASE)
-FLOOR_RE = re.compile(r"(\d+)\s*(?:floors|storeys|stories|storey|floor)\b", re.IGNORECASE)
-ENTITLEMENT_RE = re.compile(r"(?:entitle(?:ment|d)?|allow(?:ed)?|permitted|permit)\b.*", re.IGNORECASE)
 
+def iter_pdf_clauses(pdf_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Clause records streamed from page text: each clause is yielded as soon as
+    its closing boundary is read, while later pages are still being extracted.
+    """
+    def pages() -> Iterator[Tuple[int, str]]:
+        sep = ""
+        for pno, txt in iter_page_text(pdf_path):
+            yield pno, sep + txt
+            sep = "\n\n"
+
+    return iter_clauses(pages())
+
+# ---------------- CLASSIFICATION ----------------
 def classify_rule_text(text: str) -> Tuple[str, Dict[str, Any]]:
-    lc = text.lower()
-    fsi_m = FSI_RE.search(text)
-    if fsi_m:
-        try:
-            val = float(fsi_m.group(1))
-            return "fsi", {"fsi": val}
-        except:
-            return "fsi", {}
-
-    if "height" in lc:
-        m = METER_RE.search(text)
-        if m:
-            return "height", {"height_m": float(m.group(1))}
-    if "setback" in lc:
-        m = SETBACK_RE.search(text)
-        if m:
-            return "setback", {"setback_m": float(m.group(1))}
-    if FLOOR_RE.search(text):
-        return "floors", {"floors": int(FLOOR_RE.search(text).group(1))}
-    if any(w in lc for w in ["allowed", "permitted", "entitlement", "may be permitted", "shall be permitted"]):
-        return "entitlement", {"note": text[:200]}
-    return "other", {}
+    return rule_fields(text)
 
 # ---------------- MONGO PUSH ----------------
 def push_parsed_document_to_mcp(parsed_doc: Dict[str, Any]) -> Dict[str, Any]:
@@ -183,43 +117,46 @@ def push_parsed_document_to_mcp(parsed_doc: Dict[str, Any]) -> Dict[str, Any]:
     }
     dres = _docs_col.insert_one(doc_record)
     doc_id = str(dres.inserted_id)
-    inserted_rule_ids = []
-    for r in parsed_doc.get("rules", []):
-        rr = {
+    inserted_at = datetime.utcnow().isoformat() + "Z"
+    rule_docs = [
+        {
             "city": parsed_doc.get("city"),
             "clause_no": r.get("clause_no"),
             "text": r.get("text"),
             "parsed_fields": r.get("parsed_fields"),
             "rule_type": r.get("rule_type"),
             "source_doc_id": doc_id,
-            "inserted_at": datetime.utcnow().isoformat() + "Z",
+            "inserted_at": inserted_at,
         }
-        ins = _rules_col.insert_one(rr)
-        inserted_rule_ids.append(str(ins.inserted_id))
+        for r in parsed_doc.get("rules", [])
+    ]
+    inserted_rule_ids = [str(i) for i in bulk_insert(_rules_col, rule_docs)]
     return {"document_id": doc_id, "inserted_rules": inserted_rule_ids}
 
 # ---------------- MAIN PARSER ----------------
 def parse_pdf_to_json(pdf_path: str, city: str) -> Dict[str, Any]:
     logger.info("Parsing PDF: %s for city=%s", pdf_path, city)
-    text = extract_text_from_pdf(pdf_path)
-    clauses = find_clauses(text)
     parsed = {
         "city": city,
         "source_file": os.path.basename(pdf_path),
         "parsed_at": datetime.utcnow().isoformat() + "Z",
-        "rule_count": len(clauses),
+        "rule_count": 0,
         "rules": [],
     }
 
-    for idx, c in enumerate(clauses, start=1):
+    for idx, c in enumerate(iter_pdf_clauses(pdf_path), start=1):
         rtype, fields = classify_rule_text(c.get("text", ""))
         parsed["rules"].append({
             "id": f"{city.lower()}_r_{idx}",
             "clause_no": c.get("clause_no"),
             "text": c.get("text"),
+            "page": c.get("page"),
             "parsed_fields": fields,
             "rule_type": rtype,
         })
+    parsed["rule_count"] = len(parsed["rules"])
+    if not parsed["rules"]:
+        logger.warning("⚠️ No clauses found — possibly scanned PDF (image only).")
 
     out_name = f"{Path(pdf_path).stem}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
     out_path = os.path.join(PARSED_OUTPUT_DIR, out_name)
@@ -20,6 +20,7 @@ from mcp.schemas import (
 )
 from mcp.db import get_collection, Collections
 from agents.compliance_pipeline import run_compliance_pipeline, set_trace_id
+from agents.rule_classification_agent import invalidate_city_cache
 
 logger = logging.getLogger(__name__)
 
@@ -172,15 +173,21 @@ async def core_feedback(request: CoreFeedbackRequest):
         # Update RL agent policy
         confidence_score = await _update_rl_policy(request.session_id, request.feedback, request.output, city)
         
-        # Store in feedback flow report
-        _append_to_report("feedback_flow.json", {
-            "session_id": request.session_id,
-            "feedback": request.feedback,
-            "city": city,
-            "reward": request.feedback,
-            "timestamp": timestamp,
-            "rl_update": True
-        })
+        # Store in the feedback flow log (the RL agent renders it into feedback_flow.json)
+        try:
+            from agents.feedback_sink import append_jsonl
+            from agents.rl_agent import FEEDBACK_FLOW_LOG
+            append_jsonl(FEEDBACK_FLOW_LOG, [{
+                "case_id": request.session_id,
+                "session_id": request.session_id,
+                "feedback": request.feedback,
+                "city": city,
+                "reward": request.feedback,
+                "timestamp": timestamp,
+                "rl_update": True
+            }])
+        except Exception as e:
+            logger.warning(f"Failed to append to feedback flow log: {e}")
 
         # Append RL training log (standardized)
         try:
@@ -333,6 +340,7 @@ async def save_rule(request: SaveRuleRequest):
             {"$set": rule_doc},
             upsert=True
         )
+        invalidate_city_cache(request.city)
         
         logger.info(f"Rule saved: city={request.city}, rule_id={request.rule_id}")
         
@@ -10,6 +10,7 @@ import logging
 from typing import Dict, Any, Tuple, List
 import requests
 from utils.rule_explanation import format_rule_outcomes
+from agents.rule_classification_agent import invalidate_city_cache
 
 load_dotenv()
 
@@ -164,6 +165,7 @@ def save_rule():
                 }
                 rr = rules_col.insert_one(rule_record)
                 inserted_ids.append(str(rr.inserted_id))
+            invalidate_city_cache(payload.get("city"))
             return jsonify({"success": True, "document_id": doc_id, "inserted_rules": inserted_ids}), 201
 
         rule = payload
@@ -179,6 +181,7 @@ def save_rule():
             "created_at": datetime.utcnow().isoformat() + "Z",
         }
         res = rules_col.insert_one(rule_record)
+        invalidate_city_cache(rule.get("city"))
         return jsonify({"success": True, "inserted_id": str(res.inserted_id)}), 201
 
     except Exception as e:
@@ -209,6 +212,7 @@ def delete_rule(rule_id):
             res = rules_col.delete_one({"id": rule_id})
         if res.deleted_count == 0:
             return jsonify({"success": False, "message": "No rule deleted"}), 404
+        invalidate_city_cache()  # city unknown from the id alone
         return jsonify({"success": True, "deleted_count": res.deleted_count}), 200
     except Exception as e:
         logger.exception("Error in delete_rule: %s", e)
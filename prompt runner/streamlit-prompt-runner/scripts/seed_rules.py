@@ -14,6 +14,7 @@ import logging
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from agents.rule_classification_agent import invalidate_city_cache
 from mcp.db import Collections, get_database
 
 logger = logging.getLogger(__name__)
@@ -183,6 +184,7 @@ def seed_rules(cities: Optional[List[str]] = None, force: bool = False) -> Dict[
                 inserted += 1
             else:
                 upserted += 1
+        invalidate_city_cache(city)
     logger.info("Seed complete: inserted=%d updated=%d", inserted, upserted)
     return {"inserted": inserted, "updated": upserted}
 
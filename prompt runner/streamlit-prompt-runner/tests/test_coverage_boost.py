@@ -224,7 +224,8 @@ class TestRLAgentCoverage:
             user_feedback="up",
             metadata={"city": "Mumbai"},
             prompt="Test prompt",
-            output={"result": "test"}
+            output={"result": "test"},
+            wait=True
         )
         
         # Should return reward or None
@@ -296,7 +297,8 @@ class TestErrorRecovery:
                 result = rl_agent_submit_feedback(
                     case_id="file_ops_test",
                     user_feedback="up",
-                    metadata={"city": "Mumbai"}
+                    metadata={"city": "Mumbai"},
+                    wait=True
                 )
         finally:
             os.chdir(original_cwd)
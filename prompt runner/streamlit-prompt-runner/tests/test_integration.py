@@ -106,7 +106,7 @@ class TestFeedbackLoop:
         mock_send.return_value = {"success": True, "reward": 2}
         
         # Submit feedback
-        reward = rl_agent_submit_feedback("case_123", "up", {"test": "data"})
+        reward = rl_agent_submit_feedback("case_123", "up", {"test": "data"}, wait=True)
         
         assert reward == 2
         mock_send.assert_called_once()
@@ -118,7 +118,7 @@ class TestFeedbackLoop:
         
         mock_send.return_value = {"success": True, "reward": -2}
         
-        reward = rl_agent_submit_feedback("case_456", "down")
+        reward = rl_agent_submit_feedback("case_456", "down", wait=True)
         
         assert reward == -2
 
@@ -0,0 +1,81 @@
+# tests/test_mcp_store.py
+"""
+Tests for the SQLite-backed local MCP fallback store
+"""
+import json
+import threading
+
+from utils.mcp_store import LocalMCPStore
+
+
+class TestLocalMCPStore:
+    """Test LocalMCPStore appends, indexed reads and JSON migration"""
+
+    def test_rules_feedback_geometry(self, tmp_path):
+        """Saves are readable per city / case id in insertion order"""
+        store = LocalMCPStore(str(tmp_path / "mcp.db"))
+
+        first = store.save_rule("Mumbai", {"fsi": 2.0}, {"source": "test"})
+        store.save_rule("Pune", {"fsi": 1.5})
+        store.save_rule("Mumbai", {"height_m": 24})
+
+        assert [r["rule"] for r in store.get_rules("Mumbai")] == [{"fsi": 2.0}, {"height_m": 24}]
+        assert store.get_rules("Mumbai")[0]["id"] == first
+        assert store.save_feedback("case_1", "up") == 2
+        assert store.save_feedback("case_1", "down") == -2
+        assert [f["reward"] for f in store.get_feedback("case_1")] == [2, -2]
+        store.log_geometry("case_1", "a.glb")
+        store.log_geometry("case_1", "b.glb")
+        assert store.get_geometry("case_1")["file"] == "b.glb"
+
+    def test_concurrent_writers(self, tmp_path):
+        """Writers on separate threads do not lose each other's records"""
+        store = LocalMCPStore(str(tmp_path / "mcp.db"))
+
+        def write(n):
+            for i in range(25):
+                store.save_rule("Mumbai", {"writer": n, "i": i})
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(store.get_rules("Mumbai")) == 100
+
+    def test_migrates_legacy_json_once(self, tmp_path):
+        """Existing JSON files are imported on first use and renamed"""
+        (tmp_path / "rules.json").write_text(json.dumps(
+            {"Mumbai": [{"id": "abc12345", "rule": {"fsi": 2.0}, "meta": {}, "time": "2024-01-01T00:00:00Z"}]}
+        ))
+        (tmp_path / "feedback.json").write_text(json.dumps(
+            {"case_1": [{"case_id": "case_1", "feedback": "up", "reward": 2, "time": "2024-01-01T00:00:00Z"}]}
+        ))
+        (tmp_path / "geometry.json").write_text(json.dumps({"case_1": {"file": "a.glb", "time": "2024-01-01T00:00:00Z"}}))
+
+        store = LocalMCPStore(str(tmp_path / "mcp.db"), legacy_dir=str(tmp_path))
+
+        assert store.get_rules("Mumbai")[0]["id"] == "abc12345"
+        assert store.get_feedback("case_1")[0]["reward"] == 2
+        assert store.get_geometry("case_1")["file"] == "a.glb"
+        assert (tmp_path / "rules.json.migrated").exists() and not (tmp_path / "rules.json").exists()
+
+        reopened = LocalMCPStore(str(tmp_path / "mcp.db"), legacy_dir=str(tmp_path))
+        assert len(reopened.get_rules("Mumbai")) == 1
+
+    def test_corrupt_legacy_json_moved_aside(self, tmp_path):
+        """Unparseable files are renamed *.json.corrupt; entries missing feedback are skipped"""
+        (tmp_path / "rules.json").write_text('{"Mumbai": [{"id": ')
+        (tmp_path / "feedback.json").write_text(json.dumps(
+            {"case_1": [{"reward": 2}, {"feedback": "down", "reward": -2}]}
+        ))
+
+        store = LocalMCPStore(str(tmp_path / "mcp.db"), legacy_dir=str(tmp_path))
+
+        assert store.get_rules("Mumbai") == []
+        assert [e["feedback"] for e in store.get_feedback("case_1")] == ["down"]
+        assert (tmp_path / "rules.json.corrupt").exists() and not (tmp_path / "rules.json").exists()
+        assert (tmp_path / "feedback.json.migrated").exists()
+        store.save_rule("Mumbai", {"fsi": 2.0})
+        assert len(store.get_rules("Mumbai")) == 1
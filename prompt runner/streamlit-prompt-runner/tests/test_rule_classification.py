@@ -0,0 +1,113 @@
+# tests/test_rule_classification.py
+"""
+Tests for incremental rule classification (content hashes + per-city cache)
+"""
+import mongomock
+import pytest
+from unittest.mock import patch
+
+import agents.rule_classification_agent as classifier
+from utils.rule_classifier import classify_rule, extract_document_rules, rule_fields
+
+
+@pytest.fixture
+def rule_db():
+    """Fresh mongomock rules/classified_rules collections and an empty cache"""
+    db = mongomock.MongoClient().test_db
+    classifier.invalidate_city_cache()
+    with patch.object(classifier, "_collections", return_value=(db.rules, db.classified_rules)):
+        yield db
+    classifier.invalidate_city_cache()
+
+
+def _seed(db, count=3):
+    db.rules.insert_many([
+        {"city": "Mumbai", "rule_id": f"r{i}", "clause_no": f"3.{i}", "full_text": f"Maximum height {20 + i} m"}
+        for i in range(count)
+    ])
+
+
+class TestIncrementalClassification:
+    """Test classify_rules_for_city change tracking"""
+
+    def test_one_document_per_rule_across_runs(self, rule_db):
+        """Repeated runs upsert instead of appending classified documents"""
+        _seed(rule_db)
+
+        first = classifier.classify_rules_for_city("Mumbai")
+        classifier.classify_rules_for_city("Mumbai", force=True)
+
+        assert len(first) == 3
+        assert rule_db.classified_rules.count_documents({}) == 3
+        assert all(doc["category"] == "height" and doc["content_hash"] for doc in first)
+
+    def test_only_changed_rules_are_reclassified(self, rule_db):
+        """Unchanged rules are skipped; edited and deleted rules are tracked"""
+        _seed(rule_db)
+        classifier.classify_rules_for_city("Mumbai")
+        rule_db.rules.update_one({"rule_id": "r1"}, {"$set": {"full_text": "FSI 2.5 permitted"}})
+        rule_db.rules.delete_one({"rule_id": "r2"})
+
+        with patch.object(classifier, "classify_rule_text", wraps=classifier.classify_rule_text) as classify:
+            results = classifier.classify_rules_for_city("Mumbai", force=True)
+
+        assert classify.call_count == 1
+        assert [doc["category"] for doc in results] == ["height", "fsi"]
+        assert rule_db.classified_rules.count_documents({}) == 2
+
+    def test_cache_served_until_invalidated(self, rule_db):
+        """Cached results skip MongoDB until the city cache is invalidated"""
+        _seed(rule_db)
+        classifier.classify_rules_for_city("Mumbai")
+        rule_db.rules.insert_one({"city": "Mumbai", "rule_id": "r9", "clause_no": "9.1", "full_text": "Parking for 2 cars"})
+
+        assert len(classifier.classify_rules_for_city("Mumbai")) == 3
+
+        classifier.invalidate_city_cache("Mumbai")
+        assert len(classifier.classify_rules_for_city("Mumbai")) == 4
+
+
+class TestRuleClassifierEngine:
+    """Test the shared single-pass classifier in utils.rule_classifier"""
+
+    def test_classify_rule_value_and_unit(self):
+        """Category, the number following its keyword and the unit come from one scan"""
+        info = classify_rule("Maximum height 24 m for residential buildings")
+
+        assert info == {"category": "height", "details": {"value": 24.0, "unit": "m", "matched": "Maximum height 24 m"}}
+        assert classify_rule("FSI: 2.5 permitted")["details"]["value"] == 2.5
+        assert classify_rule("No relevant content")["category"] == "other"
+
+    @pytest.mark.parametrize("text, category", [
+        ("Provide 1 car park for every 100 sq.m of built-up area", "parking"),
+        ("The building shall not exceed 3 storeys and 10 m in height", "height"),
+        ("Max 4 storeys or 15 m height", "height"),
+        ("Plot area 1000\ncar park spaces required", "parking"),
+    ])
+    def test_units_do_not_swallow_keywords(self, text, category):
+        """A unit after a number never hides a category keyword (old classify_rule_text categories)"""
+        assert classify_rule(text)["category"] == category
+
+    def test_rule_fields_priority(self):
+        """Parsing agent fields keep the fsi > height > setback > floors > entitlement order"""
+        assert rule_fields("FSI 1.8 and height 30 m") == ("fsi", {"fsi": 1.8})
+        assert rule_fields("Setback: 3 m from road") == ("setback", {"setback_m": 3.0})
+        assert rule_fields("Buildings up to 4 storeys") == ("floors", {"floors": 4})
+        assert rule_fields("Shops shall be permitted")[0] == "entitlement"
+
+    def test_rule_fields_keyword_semantics(self):
+        """Height and FSI keep the parsing agent's substring and value-less matches"""
+        assert rule_fields("In the heights of 12 m") == ("height", {"height_m": 12.0})
+        assert rule_fields("The F.S.I. shall be 2") == ("fsi", {})
+        assert rule_fields("FSI: 2.5 for plots above 500 sqm") == ("fsi", {"fsi": 2.5})
+        assert rule_fields("2.5 floor space index") == ("other", {})
+
+    def test_extract_document_rules(self):
+        """Ingestion flows get every FSI, setback, height and parking rule in text order"""
+        text = "FSI 1.5\nsetback: 3 m\nmaximum height 30 metres\nparking: 1 space per 100 sqm\n"
+
+        rules = extract_document_rules(text)
+
+        assert [r["type"] for r in rules] == ["fsi", "setback", "height", "parking"]
+        assert rules[2]["unit"] == "m"
+        assert rules[3]["spaces_per_area"] == "1 per 100 sqm"
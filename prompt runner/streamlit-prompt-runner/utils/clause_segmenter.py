@@ -0,0 +1,131 @@
+# utils/clause_segmenter.py
+"""
+Streaming clause segmentation over page text.
+
+Same rules as the whole-document regexes it replaces, applied line by line:
+- "Clause 3.2 ..." / "Section 4 ..." starts a clause that runs until a line
+  beginning with Clause, Section or "<n>."
+- if the document has no such clauses, numbered heading lines ("3.1) ...")
+- if it has neither, paragraphs longer than 60 characters
+
+Only the unfinished last line is carried across page boundaries, so clauses
+are yielded while later pages are still being read. The heading and paragraph
+fallbacks are only known to apply at the end of the document, so their
+candidates are held until then (and dropped once the first non-empty clause
+is complete).
+"""
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+CLAUSE_START_RE = re.compile(r"(?:Clause|Section)\s*([0-9]+(?:\.[0-9]+)*)\s*[:.\-]?\s*", re.IGNORECASE)
+BOUNDARY_RE = re.compile(r"(?:Clause|Section|\d+\.)", re.IGNORECASE)
+HEADING_RE = re.compile(r"^\d+(?:\.\d+)*\s*[).:-]\s*(.+)")
+HEADING_SPLIT_RE = re.compile(r"\s*[).:-]\s*")
+MIN_PARAGRAPH_CHARS = 60
+
+
+class ClauseSegmenter:
+    """
+    Incremental segmenter: ``feed`` page text, collect the clauses it returns,
+    then ``close`` for the final clause (or the fallback records).
+    """
+
+    def __init__(self, min_paragraph_chars: int = MIN_PARAGRAPH_CHARS):
+        self.min_paragraph_chars = min_paragraph_chars
+        self._carry = ""
+        self._carry_page: Optional[int] = None
+        self._page: Optional[int] = None
+        self._found_clause = False
+        # Open clause: (clause_no, page, text lines)
+        self._current: Optional[Tuple[str, Optional[int], List[str]]] = None
+        self._headings: List[Dict[str, Any]] = []
+        self._paragraphs: List[Dict[str, Any]] = []
+        self._paragraph: List[str] = []
+        self._paragraph_page: Optional[int] = None
+
+    def feed(self, text: str, page: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Consume more text; returns the clauses completed by it."""
+        # A line carried over from the previous page belongs to the page it started on
+        carry_page = self._carry_page if self._carry else page
+        lines = (self._carry + text).split("\n")
+        self._carry = lines.pop()
+        self._carry_page = page if lines else carry_page
+        out: List[Dict[str, Any]] = []
+        for i, line in enumerate(lines):
+            self._page = carry_page if i == 0 else page
+            self._line(line.rstrip("\r"), out)
+        return out
+
+    def close(self) -> List[Dict[str, Any]]:
+        """Flush the carried line and the open clause; fallbacks if no clause was found."""
+        out: List[Dict[str, Any]] = []
+        if self._carry:
+            self._page = self._carry_page
+            self._line(self._carry.rstrip("\r"), out)
+            self._carry = ""
+        self._finish_clause(out)
+        if self._found_clause:
+            return out
+        if self._headings:
+            return self._headings
+        self._finish_paragraph()
+        return self._paragraphs
+
+    # ---------- internals ----------
+    def _line(self, line: str, out: List[Dict[str, Any]]):
+        if not self._found_clause:
+            self._fallback_line(line)
+
+        if self._current is not None:
+            clause_no, page, parts = self._current
+            # Like the greedy "\s*" after the clause number, blank lead-in lines belong to the clause
+            if not "".join(parts).strip() or not BOUNDARY_RE.match(line):
+                parts.append(line)
+                return
+            self._finish_clause(out)
+
+        m = CLAUSE_START_RE.search(line)
+        if m:
+            self._current = (m.group(1).strip(), self._page, [line[m.end():]])
+
+    def _finish_clause(self, out: List[Dict[str, Any]]):
+        if self._current is None:
+            return
+        clause_no, page, parts = self._current
+        self._current = None
+        text = "\n".join(parts).strip()
+        if text:
+            # Only a clause with text rules out the fallbacks, as with the whole-document regexes
+            self._found_clause = True
+            self._headings, self._paragraphs, self._paragraph = [], [], []
+            out.append({"clause_no": clause_no, "text": text, "page": page})
+
+    def _fallback_line(self, line: str):
+        m = HEADING_RE.match(line)
+        if m:
+            parts = HEADING_SPLIT_RE.split(m.group(0).strip(), maxsplit=1)
+            if len(parts) == 2:
+                self._headings.append({"clause_no": parts[0].strip(), "text": parts[1].strip(), "page": self._page})
+        if line:
+            if not self._paragraph:
+                self._paragraph_page = self._page
+            self._paragraph.append(line)
+        else:
+            self._finish_paragraph()
+
+    def _finish_paragraph(self):
+        text = "\n".join(self._paragraph).strip()
+        self._paragraph = []
+        if len(text) > self.min_paragraph_chars:
+            self._paragraphs.append({"clause_no": None, "text": text, "page": self._paragraph_page})
+
+
+def iter_clauses(pages: Iterable[Tuple[Optional[int], str]], min_paragraph_chars: int = MIN_PARAGRAPH_CHARS) -> Iterator[Dict[str, Any]]:
+    """
+    Yield {"clause_no", "text", "page"} records from (page_number, text) chunks
+    as soon as each clause is complete.
+    """
+    segmenter = ClauseSegmenter(min_paragraph_chars)
+    for page, text in pages:
+        yield from segmenter.feed(text, page)
+    yield from segmenter.close()
@@ -0,0 +1,18 @@
+# utils/pdf_pages.py
+"""
+Prompt-runner entry point for page-sharded PDF text extraction.
+
+The implementation lives in the main tree's backend
+(prompt-to-json-main/backend/app/pdf_pages.py); the agents import it from there so
+both trees share one copy of the extractor.
+"""
+import os
+import sys
+
+_BACKEND = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "prompt-to-json-main", "backend"
+)
+if _BACKEND not in sys.path:
+    sys.path.append(_BACKEND)
+
+from app.pdf_pages import *  # noqa: E402,F401,F403
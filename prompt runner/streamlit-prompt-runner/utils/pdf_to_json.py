@@ -6,21 +6,14 @@ import logging
 from datetime import datetime
 from typing import List, Dict, Any
 
-# optional extractors
-try:
-    import fitz  # PyMuPDF
-except Exception:
-    fitz = None
-
-try:
-    import pdfplumber
-except Exception:
-    pdfplumber = None
-
 # HTTP fallback
 import requests
 from dotenv import load_dotenv
 
+from utils.clause_segmenter import iter_clauses
+from utils.pdf_pages import iter_pdf_pages
+from utils.rule_classifier import rule_fields
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -40,36 +33,11 @@ def _extract_text(pdf_path: str) -> str:
         logger.error("PDF not found: %s", pdf_path)
         return ""
 
-    text_parts: List[str] = []
-
-    # PyMuPDF preferred
-    if fitz:
-        try:
-            doc = fitz.open(pdf_path)
-            for i in range(len(doc)):
-                page = doc.load_page(i)
-                txt = page.get_text("text") or ""
-                if txt.strip():
-                    text_parts.append(txt)
-            if text_parts:
-                logger.info("Extracted text via PyMuPDF")
-                return "\n\n".join(text_parts)
-        except Exception as e:
-            logger.debug("PyMuPDF extraction failed: %s", e)
-
-    # pdfplumber fallback
-    if pdfplumber:
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for p in pdf.pages:
-                    txt = p.extract_text() or ""
-                    if txt.strip():
-                        text_parts.append(txt)
-            if text_parts:
-                logger.info("Extracted text via pdfplumber")
-                return "\n\n".join(text_parts)
-        except Exception as e:
-            logger.debug("pdfplumber extraction failed: %s", e)
+    # PyMuPDF preferred, pdfplumber fallback; pages sharded across processes and cached
+    text_parts = [txt for _, txt in iter_pdf_pages(pdf_path) if txt.strip()]
+    if text_parts:
+        logger.info("Extracted text from %d pages", len(text_parts))
+        return "\n\n".join(text_parts)
 
     # plain text fallback
     try:
@@ -86,38 +54,9 @@ def _extract_text(pdf_path: str) -> str:
 
 
 def _find_clauses(text: str) -> List[Dict[str, Any]]:
-    import re
-
     if not text:
         return []
-
-    t = text.replace("\r\n", "\n")
-
-    clause_pattern = re.compile(
-        r"(?:Clause|Section)\s*([0-9]+(?:\.[0-9]+)*)\s*[:.-]?\s*(.*?)\n(?=(?:Clause|Section|\d+\.)|\Z)",
-        re.IGNORECASE | re.DOTALL,
-    )
-
-    clauses = []
-    for m in clause_pattern.finditer(t):
-        clause_no = m.group(1).strip()
-        clause_text = m.group(2).strip()
-        clauses.append({"clause_no": clause_no, "text": clause_text})
-
-    if not clauses:
-        heading_pattern = re.compile(r"(^\d+(?:\.\d+)*\s*[).:-]\s*(.+))", re.MULTILINE)
-        for m in heading_pattern.finditer(t):
-            parts = re.split(r"\s*[).:-]\s*", m.group(1), maxsplit=1)
-            if len(parts) == 2:
-                clauses.append({"clause_no": parts[0].strip(), "text": parts[1].strip()})
-
-    if not clauses:
-        paras = [p.strip() for p in t.split("\n\n") if p.strip()]
-        for p in paras:
-            if len(p) > 50:
-                clauses.append({"clause_no": None, "text": p})
-
-    return clauses
+    return list(iter_clauses([(None, text.replace("\r\n", "\n"))], min_paragraph_chars=50))
 
 
 def parse_pdf_to_json(city: str, pdf_path: str) -> Dict[str, Any]:
@@ -137,12 +76,15 @@ def parse_pdf_to_json(city: str, pdf_path: str) -> Dict[str, Any]:
     }
 
     for idx, c in enumerate(clauses, start=1):
+        rtype, fields = rule_fields(c.get("text") or "")
         parsed_rule = {
             "id": f"{city.lower()}_r_{idx}",
             "clause_no": c.get("clause_no"),
             "summary": (c.get("text")[:300] + "...") if c.get("text") and len(c.get("text")) > 300 else c.get("text"),
             "full_text": c.get("text"),
-            "page": None,
+            "page": c.get("page"),
+            "rule_type": rtype,
+            "parsed_fields": fields,
             "notes": "",
         }
         parsed["rules"].append(parsed_rule)
@@ -162,6 +104,7 @@ def parse_pdf_to_json(city: str, pdf_path: str) -> Dict[str, Any]:
     push_result = {"pushed": False, "reason": None}
     try:
         from utils.mongo import get_collection  # type: ignore
+        from mcp.db import bulk_insert
 
         docs = get_collection("documents")
         rules_col = get_collection("rules")
@@ -176,18 +119,21 @@ def parse_pdf_to_json(city: str, pdf_path: str) -> Dict[str, Any]:
         dres = docs.insert_one(doc_record)
         doc_id = str(dres.inserted_id)
 
-        inserted = []
-        for r in parsed["rules"]:
-            rr = {
+        inserted_at = datetime.utcnow().isoformat() + "Z"
+        rule_docs = [
+            {
                 "city": parsed["city"],
                 "clause_no": r.get("clause_no"),
                 "summary": r.get("summary"),
                 "full_text": r.get("full_text"),
+                "rule_type": r.get("rule_type"),
+                "parsed_fields": r.get("parsed_fields"),
                 "source_doc_id": doc_id,
-                "inserted_at": datetime.utcnow().isoformat() + "Z",
+                "inserted_at": inserted_at,
             }
-            ir = rules_col.insert_one(rr)
-            inserted.append(str(ir.inserted_id))
+            for r in parsed["rules"]
+        ]
+        inserted = [str(i) for i in bulk_insert(rules_col, rule_docs)]
 
         push_result["pushed"] = True
         push_result["inserted_rules"] = inserted
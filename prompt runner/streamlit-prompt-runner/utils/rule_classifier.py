@@ -0,0 +1,18 @@
+# utils/rule_classifier.py
+"""
+Prompt-runner entry point for the single-pass rule classifier.
+
+The implementation lives in the main tree's backend
+(prompt-to-json-main/backend/app/rule_classifier.py); the agents import it from there so
+both trees share one copy of the engine.
+"""
+import os
+import sys
+
+_BACKEND = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "prompt-to-json-main", "backend"
+)
+if _BACKEND not in sys.path:
+    sys.path.append(_BACKEND)
+
+from app.rule_classifier import *  # noqa: E402,F401,F403
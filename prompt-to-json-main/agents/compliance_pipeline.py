@@ -10,13 +10,16 @@ EXECUTION ORDER (STRICT):
 5. Generate Geometry (if dimensions exist)
 6. Summarize Output (traceable by case_id + trace_id)
 """
+import heapq
 import logging
 import json
 import uuid
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, FrozenSet, List, Optional, Any, Tuple, Union
 from pathlib import Path
 
+import numpy as np
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -156,77 +159,154 @@ def blocked_response(spec: Dict[str, Any], missing_fields: List[str]) -> Dict[st
 # STEP 3: FILTER RULES (Only Applicable Rules, No Duplicates)
 # ============================================================================
 
-def filter_applicable_rules(
-    rules: List[Dict[str, Any]],
-    spec: Dict[str, Any]
-) -> List[Dict[str, Any]]:
+# Compiled condition kinds
+_IN, _RANGE, _EQUALS = "in", "range", "equals"
+
+
+def _compile_conditions(conditions: Optional[Dict[str, Any]]) -> Tuple[Tuple[Any, ...], ...]:
     """
-    Filter rules to only those applicable to spec.
-    Remove duplicates (same clause_no).
-    Target: 5-8 rules, not 40+.
-    
-    Each rule must define:
-    - clause_no: unique identifier
-    - required_fields: list of fields needed in spec
-    - category: height/fsi/setback/etc.
+    Compile rule conditions once into (field, kind, a, b, equals) predicates.
+    Lists become membership checks, dicts become closed intervals with bounds
+    already converted to float, anything else is an equality check.
     """
-    def conditions_match(conditions: Dict[str, Any], subject: Dict[str, Any]) -> bool:
-        if not conditions:
-            return True
-        for field, cond in conditions.items():
-            val = subject.get(field)
-            if val is None:
+    compiled = []
+    for field, cond in (conditions or {}).items():
+        if isinstance(cond, list):
+            compiled.append((field, _IN, tuple(cond), None, None))
+        elif isinstance(cond, dict):
+            min_v = cond.get("min")
+            max_v = cond.get("max")
+            low = float(min_v) if min_v is not None else None
+            high = float(max_v) if max_v is not None else None
+            compiled.append((field, _RANGE, low, high, cond.get("equals")))
+        else:
+            compiled.append((field, _EQUALS, cond, None, None))
+    return tuple(compiled)
+
+
+def _predicates_match(predicates: Tuple[Tuple[Any, ...], ...], subject: Dict[str, Any]) -> bool:
+    for field, kind, a, b, eq_v in predicates:
+        val = subject.get(field)
+        if val is None:
+            return False
+        if kind is _IN:
+            if val not in a:
                 return False
-            if isinstance(cond, list):
-                if val not in cond:
-                    return False
-            elif isinstance(cond, dict):
-                min_v = cond.get("min")
-                max_v = cond.get("max")
-                eq_v = cond.get("equals")
-                if min_v is not None and float(val) < float(min_v):
-                    return False
-                if max_v is not None and float(val) > float(max_v):
-                    return False
-                if eq_v is not None and val != eq_v:
+        elif kind is _RANGE:
+            if a is not None or b is not None:
+                num = float(val)
+                if a is not None and num < a:
                     return False
-            else:
-                if val != cond:
+                if b is not None and num > b:
                     return False
-        return True
+            if eq_v is not None and val != eq_v:
+                return False
+        elif val != a:
+            return False
+    return True
 
-    applicable = []
-    seen_clauses = set()
 
-    for rule in rules:
-        clause_no = rule.get("clause_no") or rule.get("id")
+class RuleIndex:
+    """
+    Precompiled rule corpus for repeated filtering.
 
-        # City match
-        rule_city = (rule.get("city") or spec.get("city") or "").lower()
-        if rule_city and rule_city != (spec.get("city") or "").lower():
-            continue
+    Rules are grouped by city ("" = any city) and required-field signature,
+    conditions are compiled once, and rules without required_fields or
+    repeating an earlier clause with identical scope are dropped at load.
+    Build it once per corpus and pass it to filter_applicable_rules.
+    """
 
-        # Skip duplicates
-        if clause_no in seen_clauses:
-            continue
+    def __init__(self, rules: List[Dict[str, Any]]):
+        self.rule_count = len(rules)
+        # city -> required-field signature -> [(position, clause_no, rule, predicates)]
+        self._groups: Dict[str, Dict[FrozenSet[str], List[Tuple[int, Any, Dict[str, Any], Tuple]]]] = {}
+        seen = set()
+        dropped = 0
+
+        for position, rule in enumerate(rules):
+            required_fields = rule.get("required_fields") or []
+            if not required_fields:
+                # Without explicit required fields, skip to avoid false positives
+                dropped += 1
+                continue
 
-        required_fields = rule.get("required_fields") or []
-        if not required_fields:
-            # Without explicit required fields, skip to avoid false positives
-            continue
+            clause_no = rule.get("clause_no") or rule.get("id")
+            city = (rule.get("city") or "").lower()
+            signature = frozenset(required_fields)
 
-        # Ensure all required fields are present and non-null
-        if not all(spec.get(f) is not None for f in required_fields):
-            continue
+            # A later copy with the same scope can never be selected over the first
+            conditions_key = json.dumps(rule.get("conditions") or {}, sort_keys=True, default=str)
+            identity = (clause_no, city, signature, conditions_key)
+            if identity in seen:
+                dropped += 1
+                continue
 
-        # Evaluate conditions
-        if not conditions_match(rule.get("conditions", {}), spec):
-            continue
+            try:
+                predicates = _compile_conditions(rule.get("conditions"))
+            except (TypeError, ValueError) as e:
+                logger.warning("Skipping rule %s: invalid conditions (%s)", clause_no, e)
+                dropped += 1
+                continue
+
+            seen.add(identity)
+            self._groups.setdefault(city, {}).setdefault(signature, []).append((position, clause_no, rule, predicates))
+
+        logger.info("Indexed %s rules (%s dropped at load)", self.rule_count - dropped, dropped)
+
+    def __len__(self) -> int:
+        return self.rule_count
+
+    def candidates(self, spec: Dict[str, Any]):
+        """Rules whose city and required fields fit the spec, in corpus order."""
+        present = {field for field, value in spec.items() if value is not None}
+        cities = {"", (spec.get("city") or "").lower()}
+        groups = [
+            entries
+            for city in cities
+            for signature, entries in self._groups.get(city, {}).items()
+            if signature <= present
+        ]
+        return heapq.merge(*groups, key=lambda entry: entry[0])
+
+    def _select(self, spec: Dict[str, Any]):
+        seen_clauses = set()
+        for entry in self.candidates(spec):
+            _, clause_no, _, predicates = entry
+            if clause_no in seen_clauses:
+                continue
+            if not _predicates_match(predicates, spec):
+                continue
+            seen_clauses.add(clause_no)
+            yield entry
+
+    def filter(self, spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [rule for _, _, rule, _ in self._select(spec)]
+
+    def positions(self, spec: Dict[str, Any]) -> List[int]:
+        """Corpus positions of the rules filter() would return."""
+        return [position for position, _, _, _ in self._select(spec)]
+
+
+def filter_applicable_rules(
+    rules: Union[List[Dict[str, Any]], RuleIndex],
+    spec: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """
+    Filter rules to only those applicable to spec.
+    Remove duplicates (same clause_no).
+    Target: 5-8 rules, not 40+.
+    
+    Each rule must define:
+    - clause_no: unique identifier
+    - required_fields: list of fields needed in spec
+    - category: height/fsi/setback/etc.
 
-        applicable.append(rule)
-        seen_clauses.add(clause_no)
+    Pass a RuleIndex to reuse a compiled corpus across specs.
+    """
+    index = rules if isinstance(rules, RuleIndex) else RuleIndex(rules)
+    applicable = index.filter(spec)
 
-    logger.info("Filtered %s rules → %s applicable", len(rules), len(applicable))
+    logger.info("Filtered %s rules → %s applicable", len(index), len(applicable))
     return applicable
 
 
@@ -328,6 +408,150 @@ def evaluate_all_rules(
     return results
 
 
+class LimitChecks:
+    """
+    Columnar min/max limit checks for N specs x M rules.
+
+    Every (rule, limit field) pair is one column. ``present``, ``ok`` and
+    ``subject`` are (N, columns) arrays; ``failed`` is (N, M) and marks rules
+    evaluate_single_rule would raise on (non-numeric subject or limit).
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]], specs: List[Dict[str, Any]]):
+        self.rules = rules
+        self.specs = specs
+        fields: Dict[str, int] = {}
+        column_field, has_min, has_max, mins, maxs, bad_limit = [], [], [], [], [], []
+        starts, ends, bad_rules = [], [], []
+
+        # Compile limits once: one column per (rule, field)
+        for r, rule in enumerate(rules):
+            starts.append(len(column_field))
+            limits = rule.get("limits", {})
+            if not isinstance(limits, dict):
+                bad_rules.append(r)
+                limits = {}
+            for field, limit in limits.items():
+                scalar = not isinstance(limit, dict)
+                bounds = (None, limit) if scalar else (limit.get("min"), limit.get("max"))
+                try:
+                    if scalar:
+                        # evaluate_single_rule float()s a scalar limit even when it is None
+                        low, high = 0.0, float(limit)
+                    else:
+                        low, high = (float(v) if v is not None else 0.0 for v in bounds)
+                    bad = False
+                except (TypeError, ValueError):
+                    low = high = 0.0
+                    bad = True
+                column_field.append(fields.setdefault(field, len(fields)))
+                has_min.append(bounds[0] is not None)
+                has_max.append(bounds[1] is not None)
+                mins.append(low)
+                maxs.append(high)
+                bad_limit.append(bad)
+            ends.append(len(column_field))
+
+        self.field_names = list(fields)
+        self.starts = np.array(starts, dtype=np.intp)
+        self.ends = np.array(ends, dtype=np.intp)
+        self.has_min = np.array(has_min, dtype=bool)
+        self.has_max = np.array(has_max, dtype=bool)
+        self.mins = np.array(mins, dtype=np.float64)
+        self.maxs = np.array(maxs, dtype=np.float64)
+
+        # Spec columns: float value, present (not None), numeric
+        values = np.zeros((len(specs), len(fields)), dtype=np.float64)
+        given = np.zeros(values.shape, dtype=bool)
+        numeric = np.ones(values.shape, dtype=bool)
+        for s, spec in enumerate(specs):
+            for field, f in fields.items():
+                value = spec.get(field)
+                if value is None:
+                    continue
+                given[s, f] = True
+                try:
+                    values[s, f] = float(value)
+                except (TypeError, ValueError):
+                    numeric[s, f] = False
+
+        # The vectorised part: every check for every spec at once
+        column_field = np.array(column_field, dtype=np.intp)
+        self.column_field = column_field
+        self.subject = values[:, column_field]
+        self.present = given[:, column_field]
+        self.ok = (~self.has_min | (self.subject >= self.mins)) & (~self.has_max | (self.subject <= self.maxs))
+
+        errors = self.present & (~numeric[:, column_field] | np.array(bad_limit, dtype=bool))
+        cumulative = np.zeros((len(specs), len(column_field) + 1), dtype=np.intp)
+        np.cumsum(errors, axis=1, out=cumulative[:, 1:])
+        self.failed = cumulative[:, self.ends] > cumulative[:, self.starts]
+        self.failed[:, bad_rules] = True
+
+    def counts(self, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-spec (compliant, non_compliant) check counts over evaluated rules."""
+        evaluated = ~self.failed if mask is None else mask & ~self.failed
+        column_rule = np.repeat(np.arange(len(self.rules)), self.ends - self.starts)
+        counted = self.present & evaluated[:, column_rule]
+        return (counted & self.ok).sum(axis=1), (counted & ~self.ok).sum(axis=1)
+
+    def results(self, mask: Optional[np.ndarray] = None) -> List[List[Dict[str, Any]]]:
+        """Per spec, the evaluate_all_rules output for the (masked) rules."""
+        evaluated_at = datetime.utcnow().isoformat() + "Z"
+        clause_nos = [str(rule.get("clause_no") or rule.get("id") or "unknown") for rule in self.rules]
+        has_min, has_max = self.has_min.tolist(), self.has_max.tolist()
+        mins, maxs = self.mins.tolist(), self.maxs.tolist()
+        # Static part of each check, per rule: (column, field, {rule_min, rule_max})
+        rule_columns = []
+        for start, end in zip(self.starts.tolist(), self.ends.tolist()):
+            columns = []
+            for c in range(start, end):
+                bounds = {}
+                if has_min[c]:
+                    bounds["rule_min"] = mins[c]
+                if has_max[c]:
+                    bounds["rule_max"] = maxs[c]
+                columns.append((c, self.field_names[self.column_field[c]], bounds))
+            rule_columns.append(columns)
+        evaluated = ~self.failed if mask is None else mask & ~self.failed
+
+        batch = []
+        for s in range(len(self.specs)):
+            present, ok, subject = self.present[s].tolist(), self.ok[s].tolist(), self.subject[s].tolist()
+            spec_results = []
+            for r in np.flatnonzero(evaluated[s]).tolist():
+                checks = {}
+                for c, field, bounds in rule_columns[r]:
+                    if present[c]:
+                        checks[field] = {**bounds, "subject": subject[c], "ok": ok[c]}
+                spec_results.append({"clause_no": clause_nos[r], "checks": checks, "evaluated_at": evaluated_at})
+            batch.append(spec_results)
+        return batch
+
+
+def evaluate_rules_batch(
+    rules: List[Dict[str, Any]],
+    specs: List[Dict[str, Any]],
+    index: Optional[RuleIndex] = None
+) -> List[List[Dict[str, Any]]]:
+    """
+    Evaluate many specs against one rule set with columnar NumPy checks.
+    Returns, per spec, the same clean results as evaluate_all_rules.
+
+    With the RuleIndex built from ``rules``, each spec is only evaluated
+    against the rules filter_applicable_rules would select for it.
+    """
+    mask = None
+    if index is not None:
+        mask = np.zeros((len(specs), len(rules)), dtype=bool)
+        for s, spec in enumerate(specs):
+            mask[s, index.positions(spec)] = True
+
+    batch = LimitChecks(rules, specs).results(mask)
+    logger.info("Batch evaluated %s specs x %s rules", len(specs), len(rules))
+    return batch
+
+
 # ============================================================================
 # STEP 5: GENERATE GEOMETRY
 # ============================================================================
@@ -483,7 +707,7 @@ def summarize_compliance(
 def run_compliance_pipeline(
     prompt: str,
     city: str = None,
-    rules: List[Dict[str, Any]] = None,
+    rules: Union[List[Dict[str, Any]], RuleIndex] = None,
     spec_override: Optional[Dict[str, Any]] = None,
     trace_id: Optional[str] = None
 ) -> Dict[str, Any]:
@@ -500,7 +724,7 @@ def run_compliance_pipeline(
     Args:
         prompt: User input
         city: Target city
-        rules: List of DCR rules
+        rules: List of DCR rules, or a prebuilt RuleIndex
         spec_override: Override normalized spec fields
         trace_id: Optional trace ID for distributed tracing
     
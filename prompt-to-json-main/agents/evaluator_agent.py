@@ -7,6 +7,9 @@ Evaluator Agent (production-ready)
   against rules and decides compliance status per-rule and overall
 - Writes evaluation documents to MongoDB (collection: evaluations)
 - Supports CLI usage to evaluate a single project or batch (pending projects)
+- Batch evaluation loads each city's rules once (TTL cache shared with the
+  rule classifier, CLASSIFIED_RULES_CACHE_TTL)
+  and evaluates on EVAL_WORKERS threads with bulk write-back
 
 Usage:
   # Evaluate a specific project by its project_id (string or ObjectId)
@@ -30,15 +33,20 @@ import os
 import json
 import logging
 import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
 from typing import Any, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 import certifi
 from bson import ObjectId
 
+from agents.rule_classification_agent import cache_city_rules, cached_city_rules, invalidate_city_cache
+from mcp.db import bulk_insert, bulk_write
+
 # ----------------- CONFIG & ENV -----------------
 # load .env from project root (one directory up from agents/)
 env_path = os.path.join(os.path.dirname(__file__), "..", ".env")
@@ -52,6 +60,7 @@ if not MONGO_URI:
 
 # Partial tolerance multiplier: if proposed <= allowed * TOLERANCE => Partial
 PARTIAL_TOLERANCE = float(os.getenv("EVAL_PARTIAL_TOLERANCE", "1.10"))  # 10% default
+EVAL_WORKERS = int(os.getenv("EVAL_WORKERS", "8"))
 
 # ----------------- LOGGING -----------------
 logger = logging.getLogger("EvaluatorAgent")
@@ -113,11 +122,33 @@ def compare_numeric(proposed: Optional[float], allowed: Optional[float]) -> Tupl
         return "NON_COMPLIANT", 0.0
 
 # ----------------- CORE EVALUATION -----------------
+def invalidate_rules_cache(city: Optional[str] = None):
+    """Drop cached classified rules for a city (or all cities); the cache is the classifier's."""
+    invalidate_city_cache(city)
+
+def load_classified_rules_for_cities(cities: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Classified rule docs per city, from the cache shared with the rule classifier
+    (so classification writes are seen at once). Cities not cached (or past its TTL)
+    are fetched together in a single query. Returned lists are shared; treat as read-only.
+    """
+    now = time.monotonic()
+    rules_by_city = cached_city_rules(cities)
+
+    missing = [city for city in dict.fromkeys(cities) if city not in rules_by_city]
+    if missing:
+        fetched: Dict[str, List[Dict[str, Any]]] = {city: [] for city in missing}
+        for doc in CLASSIFIED_COL.find({"city": {"$in": missing}}):
+            fetched[doc.get("city")].append(doc)
+        for city, docs in fetched.items():
+            cache_city_rules(city, docs, now)
+            logger.info("Loaded %d classified rules for city %s", len(docs), city)
+        rules_by_city.update(fetched)
+    return rules_by_city
+
 def load_classified_rules_for_city(city: str) -> List[Dict[str, Any]]:
-    """Return list of classified rule docs for a city."""
-    docs = list(CLASSIFIED_COL.find({"city": city}))
-    logger.info("Loaded %d classified rules for city %s", len(docs), city)
-    return docs
+    """Return list of classified rule docs for a city (cached per city)."""
+    return load_classified_rules_for_cities([city])[city]
 
 def evaluate_project(project_doc: Dict[str, Any], rules: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
@@ -262,17 +293,28 @@ def evaluate_pending_projects(city: Optional[str] = None, limit: int = 200) -> L
     query = {"status": "pending"} if city is None else {"status": "pending", "city": city}
     projects = list(PROJECTS_COL.find(query).limit(limit))
     logger.info("Found %d pending projects to evaluate (city=%s)", len(projects), city)
-    out_evals = []
-    for p in projects:
-        try:
-            rules = load_classified_rules_for_city(p.get("city"))
-            eval_doc = evaluate_project(p, rules)
-            EVAL_COL.insert_one(eval_doc)
-            PROJECTS_COL.update_one({"_id": p["_id"]}, {"$set": {"status": "evaluated", "last_evaluated": datetime.utcnow().isoformat() + "Z"}})
-            out_evals.append(eval_doc)
-            logger.info("Evaluated and stored project %s", str(p.get("_id")))
-        except Exception as e:
-            logger.exception("Failed to evaluate project %s: %s", str(p.get("_id")), e)
+    if not projects:
+        return []
+
+    # One rules fetch per city (not per project), then evaluate on worker threads
+    rules_by_city = load_classified_rules_for_cities([p.get("city") for p in projects])
+    with ThreadPoolExecutor(max_workers=max(1, min(EVAL_WORKERS, len(projects))), thread_name_prefix="eval") as pool:
+        futures = [(p, pool.submit(evaluate_project, p, rules_by_city[p.get("city")])) for p in projects]
+
+        out_evals = []
+        status_ops = []
+        for p, future in futures:
+            try:
+                eval_doc = future.result()
+                out_evals.append(eval_doc)
+                status_ops.append(UpdateOne({"_id": p["_id"]}, {"$set": {"status": "evaluated", "last_evaluated": eval_doc["evaluated_at"]}}))
+            except Exception as e:
+                logger.exception("Failed to evaluate project %s: %s", str(p.get("_id")), e)
+
+    # Evaluations first, then statuses: a failed write leaves projects pending for the next run
+    bulk_insert(EVAL_COL, out_evals)
+    bulk_write(PROJECTS_COL, status_ops, ordered=False)
+    logger.info("Evaluated and stored %d projects", len(out_evals))
     return out_evals
 
 # ----------------- CLI -----------------
@@ -1,20 +1,37 @@
 # agents/rl_agent.py
+import atexit
 import logging
 from datetime import datetime
 import json
 import os
 import pickle
+import threading
+import time
 from typing import List, Dict, Optional, Tuple
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import requests
 
 from agents.agent_clients import send_feedback, list_feedback_entries
 from creatorcore_bridge.bridge_client import send_feedback_to_core
+from agents.feedback_sink import (
+    FeedbackCounters, FeedbackSink, append_jsonl, append_to_json_array, render_jsonl_report, seed_jsonl_from_report
+)
 
 logging.basicConfig(level=logging.INFO)
 TRAIN_LOG = "rl_training_logs.json"
 POLICY_FILE = "rl_policy.pkl"
+# Compact the policy WAL into a snapshot after this many records or seconds
+POLICY_COMPACT_EVERY = int(os.getenv("RL_POLICY_COMPACT_EVERY", "500"))
+POLICY_COMPACT_SECONDS = float(os.getenv("RL_POLICY_COMPACT_SECONDS", "300"))
+REPORTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "reports"))
+FEEDBACK_FLOW_LOG = os.path.join(REPORTS_DIR, "feedback_flow.jsonl")
+FEEDBACK_SUMMARY_FILE = os.path.join(REPORTS_DIR, "feedback_summary.json")
+# {"feedback_submissions": [...]} report read by the integration checks, rendered from the flow log
+FEEDBACK_FLOW_REPORT = os.path.join(REPORTS_DIR, "feedback_flow.json")
+FEEDBACK_FLOW_RENDER_SECONDS = float(os.getenv("RL_FEEDBACK_FLOW_RENDER_SECONDS", "60"))
+FEEDBACK_FORWARD_WORKERS = int(os.getenv("RL_FEEDBACK_FORWARD_WORKERS", "8"))
 os.makedirs(os.path.dirname(TRAIN_LOG) or ".", exist_ok=True)
 
 
@@ -40,6 +57,12 @@ class SimpleRLPolicy:
         self.visit_counts = defaultdict(int)
         # Successful parameter history
         self.success_history = defaultdict(list)
+        # Checkpointing: updates not yet in the WAL, last WAL sequence number, WAL size since the snapshot
+        self._pending = []
+        self._wal_seq = 0
+        self._wal_records = 0
+        self._last_compaction = time.monotonic()
+        self._persist_lock = threading.Lock()
         
     def get_state_key(self, city: str, param_type: str = "residential") -> Tuple[str, str]:
         """Generate state key from city and building type."""
@@ -93,13 +116,23 @@ class SimpleRLPolicy:
                     self.q_values[state_key][param] = new_value
                     
             # Record successful parameters
-            self.success_history[state_key].append({
+            success = {
                 "parameters": parameters.copy(),
                 "timestamp": datetime.utcnow().isoformat() + "Z"
-            })
+            }
+            self.success_history[state_key].append(success)
             logging.info(f"RL Policy updated for {state_key}: {self.q_values[state_key]}")
         else:
+            success = None
             logging.info(f"RL Policy: negative feedback for {state_key}, no update (exploration continues)")
+
+        # Delta for the write-ahead log: the state's resulting values, so replay just overwrites them
+        self._pending.append({
+            "state": list(state_key),
+            "visits": self.visit_counts[state_key],
+            "q": dict(self.q_values[state_key]),
+            "success": success,
+        })
     
     def get_success_rate(self, city: str, param_type: str = "residential") -> float:
         """Calculate success rate for a given state."""
@@ -109,37 +142,122 @@ class SimpleRLPolicy:
         return successes / visits if visits > 0 else 0.0
     
     def save(self, filepath: str):
-        """Save policy to disk."""
-        with open(filepath, "wb") as f:
+        """Save a full snapshot to disk (atomic rename) and start a new WAL."""
+        with self._persist_lock:
+            self._write_snapshot(filepath)
+        logging.info(f"RL Policy saved to {filepath}")
+
+    def checkpoint(self, filepath: str):
+        """
+        Persist updates since the last checkpoint by appending them to the
+        write-ahead log, so the cost is proportional to the updates and not to
+        the policy size. The WAL is compacted into a snapshot every
+        POLICY_COMPACT_EVERY records or POLICY_COMPACT_SECONDS seconds.
+        """
+        with self._persist_lock:
+            pending, self._pending = self._pending, []
+            if pending:
+                lines = []
+                for delta in pending:
+                    self._wal_seq += 1
+                    lines.append(json.dumps(dict(delta, seq=self._wal_seq)) + "\n")
+                with open(filepath + ".wal", "a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._wal_records += len(pending)
+
+            if self._wal_records >= POLICY_COMPACT_EVERY or (
+                    self._wal_records and time.monotonic() - self._last_compaction >= POLICY_COMPACT_SECONDS):
+                self._write_snapshot(filepath)
+                logging.info(f"RL Policy WAL compacted into {filepath}")
+
+    def _write_snapshot(self, filepath: str):
+        tmp_path = f"{filepath}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
             pickle.dump({
                 "q_values": dict(self.q_values),
                 "visit_counts": dict(self.visit_counts),
                 "success_history": dict(self.success_history),
-                "alpha": self.alpha
+                "alpha": self.alpha,
+                # WAL records up to here are in the snapshot; replay skips them if truncation is interrupted
+                "wal_seq": self._wal_seq,
             }, f)
-        logging.info(f"RL Policy saved to {filepath}")
-    
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+        # Anything still pending is now in the snapshot too
+        self._pending = []
+        with open(filepath + ".wal", "w", encoding="utf-8"):
+            pass
+        self._wal_records = 0
+        self._last_compaction = time.monotonic()
+
+    def _replay_wal(self, wal_path: str) -> int:
+        """
+        Apply WAL records newer than the snapshot; returns how many were applied.
+        A torn final record is truncated away so later appends start on a clean line.
+        """
+        applied = 0
+        valid_bytes = 0
+        with open(wal_path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("record not terminated")
+                    delta = json.loads(line)
+                except ValueError:
+                    # Torn final line from a crash mid-append
+                    logging.warning(f"Truncating incomplete RL Policy WAL record in {wal_path}")
+                    break
+                valid_bytes += len(line)
+                if delta["seq"] <= self._wal_seq:
+                    continue
+                state_key = tuple(delta["state"])
+                self.visit_counts[state_key] = delta["visits"]
+                self.q_values[state_key] = delta["q"]
+                if delta.get("success"):
+                    self.success_history[state_key].append(delta["success"])
+                self._wal_seq = delta["seq"]
+                applied += 1
+        if valid_bytes < os.path.getsize(wal_path):
+            with open(wal_path, "r+b") as f:
+                f.truncate(valid_bytes)
+                f.flush()
+                os.fsync(f.fileno())
+        return applied
+
     @classmethod
     def load(cls, filepath: str) -> 'SimpleRLPolicy':
-        """Load policy from disk."""
-        if not os.path.exists(filepath):
+        """Load policy from disk: the snapshot, then the WAL records after it."""
+        wal_path = filepath + ".wal"
+        if not os.path.exists(filepath) and not os.path.exists(wal_path):
             logging.info(f"No existing policy found at {filepath}, creating new")
             return cls()
-        
-        with open(filepath, "rb") as f:
-            data = pickle.load(f)
-        
+
+        data = {}
+        if os.path.exists(filepath):
+            with open(filepath, "rb") as f:
+                data = pickle.load(f)
+
         policy = cls(alpha=data.get("alpha", 0.1))
-        policy.q_values = defaultdict(lambda: {"height_m": 15.0, "fsi": 2.0, "setback_m": 3.0}, data["q_values"])
-        policy.visit_counts = defaultdict(int, data["visit_counts"])
-        policy.success_history = defaultdict(list, data["success_history"])
-        
-        logging.info(f"RL Policy loaded from {filepath}")
+        policy.q_values = defaultdict(lambda: {"height_m": 15.0, "fsi": 2.0, "setback_m": 3.0}, data.get("q_values", {}))
+        policy.visit_counts = defaultdict(int, data.get("visit_counts", {}))
+        policy.success_history = defaultdict(list, data.get("success_history", {}))
+        policy._wal_seq = data.get("wal_seq", 0)
+        if os.path.exists(wal_path):
+            policy._wal_records = policy._replay_wal(wal_path)
+
+        logging.info(f"RL Policy loaded from {filepath} ({policy._wal_records} WAL records replayed)")
         return policy
 
 
 # Global policy instance
 _policy = None
+# Background feedback writer and its running totals
+_sink = None
+_counters = None
+_flow_rendered_at = None
 
 def get_rl_policy() -> SimpleRLPolicy:
     """Get or create global RL policy instance."""
@@ -170,53 +288,39 @@ def _calculate_confidence(feedback_history: List[Dict]) -> float:
     return round(score / len(feedback_history), 2)
 
 
-def rl_agent_submit_feedback(case_id: str, user_feedback: str, metadata: dict = None,
-                           prompt: str = None, output: Dict = None) -> int:
-    """
-    Submit feedback for RL training, now integrated with CreatorCore feedback system
-    and real RL policy updates.
-
-    Args:
-        case_id: Unique identifier for the case/session
-        user_feedback: "up" or "down"
-        metadata: Additional metadata (city, etc.)
-        prompt: Original prompt text
-        output: Generated output data
-
-    Returns:
-        reward (int) or None on failure
-    """
-    metadata = metadata or {}
-    city = metadata.get("city", "Unknown")
-
-    # Strict payload validation
-    if not case_id or user_feedback not in ("up", "down"):
-        logging.error("Invalid feedback payload: case_id and user_feedback required")
-        return None
+def _extract_parameters(output: Optional[Dict]) -> Dict:
+    """Building parameters from the various output formats."""
+    if not output:
+        return {}
+    if "parameters" in output:
+        return output["parameters"]
+    if "subject" in output:
+        return output["subject"]
+    # Try to extract from nested structures
+    return {key: output[key] for key in ["height_m", "fsi", "setback_m", "width_m", "depth_m"] if key in output}
 
-    # Convert feedback to CreatorCore format (1 for positive, -1 for negative)
-    creatorcore_feedback = 1 if user_feedback == "up" else -1
 
-    # Send to both legacy MCP and CreatorCore systems
-    resp = send_feedback(case_id, user_feedback)
+def _forward_feedback(item: Dict) -> Tuple[Optional[int], bool, Optional[int]]:
+    """Send one feedback item to legacy MCP and CreatorCore; returns (reward, core_success, core_reward)."""
+    case_id = item["case_id"]
+    resp = send_feedback(case_id, item["feedback"])
     reward = None
     if resp and isinstance(resp, dict) and resp.get("success"):
         reward = resp.get("reward")
     else:
         logging.error("Failed to send feedback to legacy MCP for %s", case_id)
 
-    # Send to CreatorCore feedback system
     core_success = False
     core_reward = None
     try:
         core_response = send_feedback_to_core(
             case_id=case_id,
-            feedback=creatorcore_feedback,
-            prompt=prompt,
-            output=output,
+            feedback=item["feedback_value"],
+            prompt=item["prompt"],
+            output=item["output"],
             metadata={
-                "city": city,
-                "legacy_feedback": user_feedback,
+                "city": item["city"],
+                "legacy_feedback": item["feedback"],
                 "reward": reward
             }
         )
@@ -228,99 +332,180 @@ def rl_agent_submit_feedback(case_id: str, user_feedback: str, metadata: dict =
             logging.warning("Failed to send feedback to CreatorCore: %s", core_response.get("error"))
     except Exception as e:
         logging.warning("Exception sending feedback to CreatorCore: %s", e)
+    return reward, core_success, core_reward
 
-    persisted_history = list_feedback_entries(case_id)
-    confidence_score = _calculate_confidence(persisted_history)
 
-    # ** RL LEARNING UPDATE **
-    # Extract building parameters from output if available
-    if output and city != "Unknown":
-        try:
-            policy = get_rl_policy()
-            parameters = {}
-            
-            # Extract parameters from various output formats
-            if "parameters" in output:
-                parameters = output["parameters"]
-            elif "subject" in output:
-                parameters = output["subject"]
-            else:
-                # Try to extract from nested structures
-                for key in ["height_m", "fsi", "setback_m", "width_m", "depth_m"]:
-                    if key in output:
-                        parameters[key] = output[key]
-            
-            if parameters:
-                # Update policy with this feedback
-                policy.update(
+def _get_feedback_counters() -> FeedbackCounters:
+    """Running feedback totals, rebuilt from the feedback flow log once per process."""
+    global _counters
+    if _counters is None:
+        # Entries only in the old JSON report become the start of the flow log
+        seed_jsonl_from_report(FEEDBACK_FLOW_LOG, FEEDBACK_FLOW_REPORT, "feedback_submissions")
+        _counters = FeedbackCounters.from_jsonl(FEEDBACK_FLOW_LOG)
+    return _counters
+
+
+def _process_feedback_batch(items: List[Dict]) -> List[Optional[int]]:
+    """
+    Background writer: forward a batch, update the policy and counters, and
+    append the batch to the training and feedback flow logs in one write each.
+    """
+    counters = _get_feedback_counters()
+    for item in items:
+        if not counters.case_history_size(item["case_id"]):
+            # First sighting of this case in this log: count any history MCP already holds
+            counters.seed(item["case_id"], list_feedback_entries(item["case_id"]))
+
+    # The MCP and CreatorCore clients have no bulk endpoint, so a batch is forwarded concurrently
+    with ThreadPoolExecutor(max_workers=min(FEEDBACK_FORWARD_WORKERS, len(items))) as pool:
+        forwarded = list(pool.map(_forward_feedback, items))
+
+    policy_updated = False
+    records, flow_entries, rewards = [], [], []
+    for item, (reward, core_success, core_reward) in zip(items, forwarded):
+        case_id, city = item["case_id"], item["city"]
+        counters.add(case_id, city, item["feedback"], core_success)
+
+        # ** RL LEARNING UPDATE **
+        parameters = _extract_parameters(item["output"]) if city != "Unknown" else {}
+        if parameters:
+            try:
+                get_rl_policy().update(
                     city=city,
                     parameters=parameters,
-                    reward=creatorcore_feedback,
+                    reward=item["feedback_value"],
                     param_type=parameters.get("type", "residential")
                 )
-                # Save updated policy
-                policy.save(POLICY_FILE)
+                policy_updated = True
+            except Exception as e:
+                logging.warning(f"Failed to update RL policy: {e}")
+
+        # Decide final reward (fallback to legacy reward if core not available)
+        final_reward = core_reward if core_reward is not None else reward
+        rewards.append(final_reward)
+
+        # Local training record for offline RL training
+        records.append({
+            "case_id": case_id,
+            "session_id": case_id,  # For CreatorCore compatibility
+            "feedback": item["feedback"],  # Preserve original string for tests
+            "feedback_value": item["feedback_value"],
+            "reward": final_reward,
+            "meta": item["metadata"],
+            "city": city,
+            "timestamp": item["timestamp"],
+            "confidence_score": counters.case_confidence(case_id),
+            "history_size": counters.case_history_size(case_id),
+            "core_success": core_success,
+            "rl_learning_active": True  # Flag indicating real RL is active
+        })
+        flow_entries.append({
+            "case_id": case_id,
+            "feedback": item["feedback_value"],
+            "city": city,
+            "reward": core_reward,
+            "success": core_success,
+            "timestamp": item["timestamp"],
+            "rl_update": True
+        })
+        logging.info("RL feedback recorded: %s -> %s (reward=%s, CreatorCore=%s)",
+                     case_id, item["feedback_value"], final_reward, core_success)
+
+    if policy_updated:
+        try:
+            get_rl_policy().checkpoint(POLICY_FILE)
         except Exception as e:
-            logging.warning(f"Failed to update RL policy: {e}")
+            logging.warning(f"Failed to save RL policy: {e}")
 
-    # Decide final reward (fallback to legacy reward if core not available)
-    final_reward = core_reward if core_reward is not None else reward
+    append_to_json_array(TRAIN_LOG, records)
+    try:
+        os.makedirs(os.path.dirname(FEEDBACK_FLOW_LOG), exist_ok=True)
+        append_jsonl(FEEDBACK_FLOW_LOG, flow_entries)
+        with open(FEEDBACK_SUMMARY_FILE, "w", encoding="utf-8") as f:
+            json.dump(counters.summary(), f, indent=2)
+        if _flow_rendered_at is None or time.monotonic() - _flow_rendered_at >= FEEDBACK_FLOW_RENDER_SECONDS:
+            render_feedback_flow_report()
+    except Exception as e:
+        logging.warning(f"Failed to update feedback flow log: {e}")
+    return rewards
+
+
+def render_feedback_flow_report():
+    """Rewrite the feedback_submissions of reports/feedback_flow.json from the flow log."""
+    global _flow_rendered_at
+    _flow_rendered_at = time.monotonic()
+    render_jsonl_report(FEEDBACK_FLOW_LOG, FEEDBACK_FLOW_REPORT, "feedback_submissions")
 
-    # Persist local training record for offline RL training
-    record = {
-        "case_id": case_id,
-        "session_id": case_id,  # For CreatorCore compatibility
-        "feedback": user_feedback,  # Preserve original string for tests
-        "feedback_value": creatorcore_feedback,
-        "reward": final_reward,
-        "meta": metadata,
-        "city": city,
-        "timestamp": datetime.utcnow().isoformat()+"Z",
-        "confidence_score": confidence_score,
-        "history_size": len(persisted_history),
-        "core_success": core_success,
-        "rl_learning_active": True  # Flag indicating real RL is active
-    }
 
-    # append to local training log
-    logs = []
-    if os.path.exists(TRAIN_LOG):
+def _flush_at_exit():
+    """Write the feedback still queued, then bring feedback_flow.json up to date."""
+    if _sink is not None and _sink.flush(10):
         try:
-            with open(TRAIN_LOG, "r", encoding="utf-8") as f:
-                logs = json.load(f)
-        except Exception:
-            logs = []
-    logs.append(record)
-    with open(TRAIN_LOG, "w", encoding="utf-8") as f:
-        json.dump(logs, f, indent=2)
-
-    # Update feedback_flow.json for integration reporting
-    feedback_flow_path = os.path.join(os.path.dirname(__file__), "..", "reports", "feedback_flow.json")
-    feedback_flow_path = os.path.abspath(feedback_flow_path)
-    feedback_entry = {
-        "case_id": case_id,
-        "feedback": creatorcore_feedback,
-        "city": city,
-        "reward": core_reward,
-        "success": core_success,
-        "timestamp": record["timestamp"],
-        "rl_update": True
-    }
-    try:
-        if os.path.exists(feedback_flow_path):
-            with open(feedback_flow_path, "r", encoding="utf-8") as f:
-                feedback_flow = json.load(f)
-        else:
-            feedback_flow = {"feedback_submissions": []}
-        feedback_flow.setdefault("feedback_submissions", []).append(feedback_entry)
-        with open(feedback_flow_path, "w", encoding="utf-8") as f:
-            json.dump(feedback_flow, f, indent=2)
-    except Exception as e:
-        logging.warning(f"Failed to update feedback_flow.json: {e}")
+            render_feedback_flow_report()
+        except Exception as e:
+            logging.warning(f"Failed to render feedback_flow.json: {e}")
+
+
+atexit.register(_flush_at_exit)
+
 
-    logging.info("RL feedback recorded & policy updated: %s -> %s (reward=%s, CreatorCore=%s)",
-                case_id, creatorcore_feedback, final_reward, core_success)
-    return final_reward
+def get_feedback_sink() -> FeedbackSink:
+    """Get or create the global feedback sink."""
+    global _sink
+    if _sink is None:
+        _sink = FeedbackSink(_process_feedback_batch)
+    return _sink
+
+
+def rl_agent_submit_feedback(case_id: str, user_feedback: str, metadata: dict = None,
+                           prompt: str = None, output: Dict = None, wait: bool = False) -> int:
+    """
+    Submit feedback for RL training, integrated with CreatorCore feedback system
+    and real RL policy updates.
+
+    The feedback is only queued here; a background writer forwards it to MCP and
+    CreatorCore, updates the policy and appends the training logs in batches.
+
+    Args:
+        case_id: Unique identifier for the case/session
+        user_feedback: "up" or "down"
+        metadata: Additional metadata (city, etc.)
+        prompt: Original prompt text
+        output: Generated output data
+        wait: Block until the feedback is processed and return the final reward
+
+    Returns:
+        The provisional reward (+2/-2, as MCP assigns it) once queued, or with
+        wait=True the reward reported by MCP/CreatorCore (None if both failed).
+        None on an invalid payload.
+    """
+    metadata = metadata or {}
+
+    # Strict payload validation
+    if not case_id or user_feedback not in ("up", "down"):
+        logging.error("Invalid feedback payload: case_id and user_feedback required")
+        return None
+
+    # Convert feedback to CreatorCore format (1 for positive, -1 for negative)
+    creatorcore_feedback = 1 if user_feedback == "up" else -1
+    ticket = get_feedback_sink().submit({
+        "case_id": case_id,
+        "feedback": user_feedback,
+        "feedback_value": creatorcore_feedback,
+        "metadata": metadata,
+        "city": metadata.get("city", "Unknown"),
+        "prompt": prompt,
+        "output": output,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    })
+    if wait:
+        return ticket.wait()
+    return creatorcore_feedback * 2
+
+
+def flush_feedback(timeout: float = None) -> bool:
+    """Block until all queued feedback has been written."""
+    return _sink.flush(timeout) if _sink is not None else True
 
 
 def get_rl_suggestions(city: str, param_type: str = "residential") -> Dict[str, float]:
@@ -3,21 +3,30 @@
 Rule Classification Agent (Production-Ready)
 -------------------------------------------
 - Reads parsed rules from MongoDB (collection: rules)
-- Applies NLP + regex-based classification and normalization
+- Applies single-pass regex classification and normalization (utils.rule_classifier)
 - Detects rule categories like FSI, Height, Setback, Parking, LandUse, etc.
 - Outputs cleaned, structured rule data into MongoDB (collection: classified_rules)
+- Incremental: only new/changed rules (content hash) are reclassified;
+  classified rules are cached per city (shared with the evaluator) until
+  save_rule / delete_rule or the next classification write replaces them
 
 Usage (CLI):
   python -m agents.rule_classification_agent "Mumbai"
 """
 
 import os
-import re
 import json
+import time
+import hashlib
 import logging
+import threading
 from datetime import datetime
+from typing import Dict, Iterable, List, Optional
 from dotenv import load_dotenv
-from bson import ObjectId
+from pymongo import DeleteMany, UpdateOne
+
+from mcp.db import bulk_write
+from utils.rule_classifier import classify_rule
 
 # ---------- Setup ----------
 logger = logging.getLogger("RuleClassifier")
@@ -27,69 +36,106 @@ logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s:%(message
 env_path = os.path.join(os.path.dirname(__file__), '..', '.env')
 load_dotenv(env_path)
 
-# Use centralized MongoDB connection from mcp.db
-try:
+# Bump when the classification patterns change so stored results are recomputed
+CLASSIFIER_VERSION = 3
+# classified_rules documents cached per city, shared with the evaluator:
+# {city: (loaded_at, docs, classified)}. ``classified`` marks entries written by
+# classify_rules_for_city; docs the evaluator read straight from MongoDB do not
+# mean the source rules were checked. Invalidated by save_rule / delete_rule;
+# the TTL bounds staleness from writes in other processes.
+CACHE_TTL_SECONDS = float(os.environ.get("CLASSIFIED_RULES_CACHE_TTL", "300"))
+_city_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _collections():
+    """Source and classified rule collections (centralized MongoDB connection from mcp.db)."""
     from mcp.db import get_database
-    _db = get_database()
-    _rules = _db.get_collection("rules")
-    _classified = _db.get_collection("classified_rules")
-    logger.info("✅ Connected to MongoDB database: %s", _db.name)
-except Exception as e:
-    logger.error(f"❌ Failed to connect to MongoDB: {e}")
-    raise
-
-# ---------- Classification Patterns ----------
-patterns = {
-    "fsi": re.compile(r"\b(FSI|floor space index|F\.S\.I)\b[:\s]*([\d\.]+)?", re.IGNORECASE),
-    "height": re.compile(r"\b(height|storey|storeys|floor height|maximum height)\b.*?(\d+(?:\.\d+)?)(?:\s*m|meter|metre)?", re.IGNORECASE),
-    "setback": re.compile(r"\b(setback|set back|distance from boundary)\b.*?(\d+(?:\.\d+)?)(?:\s*m|meter|metre)?", re.IGNORECASE),
-    "parking": re.compile(r"\b(parking|car park|vehicle space|parking area|stilt)\b", re.IGNORECASE),
-    "land_use": re.compile(r"\b(residential|commercial|industrial|institutional|mixed use|green zone)\b", re.IGNORECASE),
-    "density": re.compile(r"\b(population density|tenements|units per hectare|plinth area)\b", re.IGNORECASE),
-    "coverage": re.compile(r"\b(site coverage|ground coverage|building coverage)\b", re.IGNORECASE),
-}
+    db = get_database()
+    return db.get_collection("rules"), db.get_collection("classified_rules")
+
+
+def invalidate_city_cache(city: Optional[str] = None):
+    """Drop cached classifications for a city (or all cities)."""
+    with _cache_lock:
+        if city is None:
+            _city_cache.clear()
+        else:
+            _city_cache.pop(city, None)
+
+
+def cached_city_rules(cities: Iterable[str], classified_only: bool = False) -> Dict[str, List[dict]]:
+    """Cached classified rule docs for the given cities that have a fresh entry."""
+    now = time.monotonic()
+    hits = {}
+    with _cache_lock:
+        for city in cities:
+            cached = _city_cache.get(city)
+            if cached and now - cached[0] < CACHE_TTL_SECONDS and (cached[2] or not classified_only):
+                hits[city] = cached[1]
+    return hits
 
+
+def cache_city_rules(city: str, docs: List[dict], loaded_at: float, classified: bool = False):
+    """Store a city's classified rule docs as read (or written) at ``loaded_at``."""
+    with _cache_lock:
+        _city_cache[city] = (loaded_at, docs, classified)
+
+
+def rule_content_hash(rule: dict) -> str:
+    """Hash of the fields classification depends on (plus the classifier version)."""
+    text = rule.get("full_text") or rule.get("summary") or ""
+    payload = json.dumps([CLASSIFIER_VERSION, rule.get("clause_no"), text], default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ---------- Classification ----------
 def classify_rule_text(text: str) -> dict:
     """
     Classify rule text into a category with structured info.
+    Single scan through the shared engine in utils.rule_classifier.
     """
-    text_lower = text.lower()
-    rule_info = {"category": "other", "details": {}}
-
-    for cat, pattern in patterns.items():
-        m = pattern.search(text)
-        if m:
-            rule_info["category"] = cat
-            # Try to extract numeric value if present
-            nums = re.findall(r"[\d\.]+", text)
-            if nums:
-                try:
-                    rule_info["details"]["value"] = float(nums[0])
-                except ValueError:
-                    pass
-            rule_info["details"]["matched"] = m.group(0)
-            break
-
-    return rule_info
+    return classify_rule(text)
 
 # ---------- Main Processor ----------
-def classify_rules_for_city(city: str):
+def classify_rules_for_city(city: str, force: bool = False):
     """
-    Reads all rules for a given city, classifies them,
-    and pushes structured results to `classified_rules`.
+    Reads all rules for a given city and returns their classifications.
+    Only new or changed rules (by content hash) are classified; results are
+    bulk-upserted into `classified_rules`, one document per source rule.
     """
-    query = {"city": city}
-    city_rules = list(_rules.find(query))
+    if not force:
+        cached = cached_city_rules([city], classified_only=True).get(city)
+        if cached is not None:
+            return list(cached)
+
+    loaded_at = time.monotonic()
+    rules_col, classified_col = _collections()
+    city_rules = list(rules_col.find({"city": city}, {"clause_no": 1, "full_text": 1, "summary": 1}))
     logger.info("Found %d rules for city '%s'", len(city_rules), city)
 
-    if not city_rules:
-        return []
+    existing = {}
+    duplicated = set()
+    for doc in classified_col.find({"city": city}):
+        rule_id = doc.get("source_rule_id")
+        if rule_id in existing:
+            duplicated.add(rule_id)
+        existing[rule_id] = doc
 
     output_docs = []
+    ops = []
+    changed = 0
     for r in city_rules:
         rule_text = r.get("full_text") or r.get("summary") or ""
         rule_id = str(r.get("_id"))
+        content_hash = rule_content_hash(r)
+        current = existing.get(rule_id)
+        if current and current.get("content_hash") == content_hash and rule_id not in duplicated:
+            output_docs.append(current)
+            continue
+
         parsed = classify_rule_text(rule_text)
+        now = datetime.utcnow().isoformat() + "Z"
         result_doc = {
             "source_rule_id": rule_id,
             "city": city,
@@ -97,13 +143,35 @@ def classify_rules_for_city(city: str):
             "category": parsed["category"],
             "details": parsed["details"],
             "original_text": rule_text,
-            "created_at": datetime.utcnow().isoformat() + "Z"
+            "content_hash": content_hash,
+            "created_at": (current or {}).get("created_at", now),
+            "updated_at": now,
         }
-        _classified.insert_one(result_doc)
+        if rule_id in duplicated:
+            # Collapse copies left by the old insert-per-run behaviour
+            ops.append(DeleteMany({"source_rule_id": rule_id}))
+        ops.append(UpdateOne({"source_rule_id": rule_id}, {"$set": result_doc}, upsert=True))
         output_docs.append(result_doc)
-
-    logger.info("✅ Classified and stored %d rules for city '%s'", len(output_docs), city)
-    return output_docs
+        changed += 1
+
+    current_ids = {str(r.get("_id")) for r in city_rules}
+    removed = [rule_id for rule_id in existing if rule_id not in current_ids]
+    if removed:
+        ops.append(DeleteMany({"city": city, "source_rule_id": {"$in": removed}}))
+
+    if ops:
+        bulk_write(classified_col, ops, ordered=True)
+        # Re-read so the cached docs carry their _id, as the evaluator expects
+        order = {str(r.get("_id")): i for i, r in enumerate(city_rules)}
+        output_docs = sorted(classified_col.find({"city": city}), key=lambda doc: order.get(doc.get("source_rule_id"), len(order)))
+
+    logger.info(
+        "✅ Classified %d new/changed rules for city '%s' (%d unchanged, %d removed)",
+        changed, city, len(output_docs) - changed, len(removed)
+    )
+
+    cache_city_rules(city, output_docs, loaded_at, classified=True)
+    return list(output_docs)
 
 
 # ---------- CLI Entry ----------
@@ -8,8 +8,10 @@ from datetime import datetime, timezone
 from typing import Any, Dict
 
 from app.config import settings
+from app.database import get_current_user
+from app.execution import StageTimer, run_io
 from app.lm_adapter import lm_run
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -135,9 +137,9 @@ def calculate_estimated_cost(spec_json: Dict) -> float:
 def generate_mock_glb(spec_json: Dict) -> bytes:
     """Generate real GLB file with actual kitchen geometry"""
     try:
-        from app.geometry_generator_real import generate_real_glb
+        from app.geometry_cache import get_or_build_glb
 
-        return generate_real_glb(spec_json)
+        return get_or_build_glb(spec_json)[1]
     except Exception as e:
         logger.warning(f"Real geometry generation failed, using fallback: {e}")
         # Fallback to simple GLB
@@ -159,6 +161,60 @@ def create_local_preview_file(spec_json: Dict, file_path: str):
         f.write(generate_mock_glb(spec_json))
 
 
+def save_spec_to_db(spec_id: str, user_id: str, prompt: str, spec_json: Dict, preview_url: str) -> str:
+    """Persist a generated spec (creating the user if needed); returns the resolved user id"""
+    from app.database import SessionLocal
+    from app.models import Spec, User
+
+    db = SessionLocal()
+    try:
+        # Ensure user exists - check by username first, then by id
+        user = db.query(User).filter((User.id == user_id) | (User.username == user_id)).first()
+
+        if not user:
+            user = User(
+                id=user_id,
+                username=user_id,
+                email=f"{user_id}@example.com",
+                password_hash="dummy_hash",
+                full_name=f"User {user_id}",
+                is_active=True,
+            )
+            db.add(user)
+            db.commit()
+            print(f"✅ Created user {user_id}")
+        else:
+            # Use the existing user's actual ID
+            user_id = user.id
+            print(f"✅ Using existing user {user.username} with id {user.id}")
+
+        # Create spec with required fields
+        db_spec = Spec(
+            id=spec_id,
+            user_id=user_id,
+            prompt=prompt,
+            city="Mumbai",  # Required field
+            spec_json=spec_json,
+            preview_url=preview_url,
+        )
+
+        db.add(db_spec)
+        db.commit()
+        db.refresh(db_spec)
+        print(f"✅ Successfully saved spec {spec_id} to database")
+    except Exception as db_error:
+        db.rollback()
+        print(f"❌ Database save FAILED: {db_error}")
+        import traceback
+
+        traceback.print_exc()
+        # Don't raise - continue without DB
+    finally:
+        db.close()
+
+    return user_id
+
+
 # Removed unused helper functions
 
 
@@ -168,7 +224,7 @@ def create_local_preview_file(spec_json: Dict, file_path: str):
 
 
 @router.post("/generate", response_model=GenerateResponse, status_code=status.HTTP_201_CREATED)
-async def generate_design(request: GenerateRequest):
+async def generate_design(request: GenerateRequest, current_user: str = Depends(get_current_user)):
     """
     Generate new design specification using LM
 
@@ -188,8 +244,10 @@ async def generate_design(request: GenerateRequest):
     - preview_url: Signed URL for 3D preview
     - estimated_cost: Cost in INR
     - compliance_check_id: ID for async compliance validation
+    - job_id: Background job upgrading the preview with AI 3D providers (if configured)
     """
     start_time = time.time()
+    timer = StageTimer("generate")
 
     # Add explicit logging
     print(f"🎨 GENERATE REQUEST: user_id={request.user_id}, prompt='{request.prompt[:50]}...'")
@@ -239,6 +297,7 @@ async def generate_design(request: GenerateRequest):
                 lm_params["context"]["budget"] = budget
 
             lm_result = await lm_run(request.prompt, lm_params)
+            timer.lap("lm")
             spec_json = lm_result.get("spec_json")
             lm_provider = lm_result.get("provider", "local")
 
@@ -283,85 +342,27 @@ async def generate_design(request: GenerateRequest):
         import uuid
 
         spec_id = f"spec_{uuid.uuid4().hex[:12]}"
+        timer.lap("cost")
 
-        # 5. GENERATE PREVIEW FILE WITH 3D GENERATORS (with timeout handling)
+        # 5. GENERATE INSTANT LOCAL PREVIEW (AI providers upgrade it in the background)
         try:
-            from app.storage import upload_geometry
-            import asyncio
+            from app.geometry_cache import build_glb_async, upload_cached_glb
 
-            glb_content = None
-
-            # Try Meshy AI first (realistic 3D) - PRIORITY: Use Meshy for all 3D generation
-            if settings.MESHY_API_KEY:
-                try:
-                    from app.meshy_3d_generator import generate_3d_with_meshy
-
-                    logger.info("🎨 Using Meshy AI for 3D generation (realistic 3D)...")
-                    # Increased timeout to 10 minutes to allow Meshy to complete
-                    # Meshy can take 3-8 minutes for complex models, sometimes shows 99% before completing
-                    # Now checks for model_urls even when status is IN_PROGRESS at 99%
-                    try:
-                        glb_content = await asyncio.wait_for(
-                            generate_3d_with_meshy(request.prompt, spec_json["dimensions"]),
-                            timeout=600.0  # 10 minutes - enough time for Meshy to complete even if stuck at 99%
-                        )
-                        if glb_content:
-                            logger.info(f"✅ Meshy AI successfully generated {len(glb_content)} bytes")
-                        else:
-                            logger.warning("⚠️ Meshy AI returned None, trying fallback...")
-                    except asyncio.TimeoutError:
-                        logger.warning("⚠️ Meshy AI timed out after 10 minutes, trying fallback...")
-                except Exception as meshy_error:
-                    logger.error(f"❌ Meshy AI error: {meshy_error}, trying fallback...")
-
-            # Fallback to Tripo AI
-            if not glb_content and settings.TRIPO_API_KEY:
-                try:
-                    from app.tripo_3d_generator import generate_3d_with_tripo
-
-                    logger.info("🎨 Trying Tripo AI (fallback)...")
-                    try:
-                        glb_content = await asyncio.wait_for(
-                            generate_3d_with_tripo(
-                                request.prompt, spec_json["dimensions"], settings.TRIPO_API_KEY
-                            ),
-                            timeout=120.0
-                        )
-                    except asyncio.TimeoutError:
-                        logger.warning("⚠️ Tripo AI timed out, using fallback...")
-                except Exception as tripo_error:
-                    logger.warning(f"Tripo AI failed: {tripo_error}")
-
-            # Try HuggingFace as another fallback (free, unlimited)
-            if not glb_content and settings.HUGGINGFACE_API_KEY:
-                try:
-                    from app.huggingface_3d_generator import generate_3d_with_huggingface
+            geometry_key, glb_content = await build_glb_async(spec_json)
+            timer.lap("geometry")
 
-                    logger.info("🎨 Trying HuggingFace (free fallback)...")
-                    glb_content = await generate_3d_with_huggingface(
-                        request.prompt, spec_json["dimensions"], settings.HUGGINGFACE_API_KEY
-                    )
-                    if glb_content:
-                        logger.info(f"✅ HuggingFace generated {len(glb_content)} bytes")
-                except Exception as hf_error:
-                    logger.warning(f"HuggingFace failed: {hf_error}")
-
-            # Final fallback to local GLB generator (ONLY if all AI 3D generators failed)
-            if not glb_content:
-                logger.warning("⚠️ All AI 3D generators (Meshy/Tripo/HuggingFace) failed")
-                logger.info("🎨 Using local geometry generator as last resort")
-                glb_content = generate_mock_glb(spec_json)
-
-            # Upload to Supabase storage
-            preview_url = upload_geometry(spec_id, glb_content)
+            # Identical geometry is stored once and shared across specs
+            preview_url = await upload_cached_glb(settings.STORAGE_BUCKET_GEOMETRY, geometry_key, glb_content)
+            timer.lap("upload")
             logger.info(f"✅ Preview uploaded: {preview_url}")
 
         except Exception as e:
             logger.warning(f"Preview generation failed, using local path: {e}")
             # Fallback to local file path
             local_preview_path = f"data/geometry_outputs/{spec_id}.glb"
-            create_local_preview_file(spec_json, local_preview_path)
+            await run_io(create_local_preview_file, spec_json, local_preview_path)
             preview_url = f"http://localhost:8000/static/geometry/{spec_id}.glb"
+            timer.lap("local_preview")
 
         # 6. SAVE TO STORAGE AND DATABASE
         from app.spec_storage import save_spec
@@ -374,60 +375,29 @@ async def generate_design(request: GenerateRequest):
             "estimated_cost": estimated_cost,
             "created_at": datetime.now(timezone.utc).isoformat(),
             "spec_version": 1,
+            "preview_url": preview_url,
         }
         save_spec(spec_id, complete_spec_data)
         print(f"💾 Saved spec {spec_id} to in-memory storage")
 
-        # Save to database
-        from app.database import SessionLocal
-        from app.models import Spec, User
-
+        # Save to database (blocking SQLAlchemy session runs on the I/O pool)
         print(f"💾 Saving spec {spec_id} to database...")
+        request.user_id = await run_io(
+            save_spec_to_db, spec_id, request.user_id, request.prompt, spec_json, preview_url
+        )
+        timer.lap("db")
 
-        db = SessionLocal()
-        try:
-            # Ensure user exists - check by username first, then by id
-            user = db.query(User).filter((User.id == request.user_id) | (User.username == request.user_id)).first()
-
-            if not user:
-                user = User(
-                    id=request.user_id,
-                    username=request.user_id,
-                    email=f"{request.user_id}@example.com",
-                    password_hash="dummy_hash",
-                    full_name=f"User {request.user_id}",
-                    is_active=True,
-                )
-                db.add(user)
-                db.commit()
-                print(f"✅ Created user {request.user_id}")
-            else:
-                # Use the existing user's actual ID
-                request.user_id = user.id
-                print(f"✅ Using existing user {user.username} with id {user.id}")
-
-            # Create spec with required fields
-            db_spec = Spec(
-                id=spec_id,
-                user_id=request.user_id,
-                prompt=request.prompt,
-                city="Mumbai",  # Required field
-                spec_json=spec_json,
-            )
+        # Race Meshy/Tripo/HuggingFace in a background job; clients poll /jobs/{job_id} or its SSE stream
+        from app.provider_orchestrator import default_providers, start_preview_upgrade
 
-            db.add(db_spec)
-            db.commit()
-            db.refresh(db_spec)
-            print(f"✅ Successfully saved spec {spec_id} to database")
-        except Exception as db_error:
-            db.rollback()
-            print(f"❌ Database save FAILED: {db_error}")
-            import traceback
-
-            traceback.print_exc()
-            # Don't raise - continue without DB
-        finally:
-            db.close()
+        job_id = None
+        providers = default_providers()
+        if providers:
+            webhook_url = str(request.webhook_url) if request.webhook_url else None
+            job = await start_preview_upgrade(
+                spec_id, request.prompt, spec_json.get("dimensions", {}), providers, webhook_url, owner=current_user
+            )
+            job_id = job["job_id"]
 
         compliance_check_id = f"check_{spec_id}"
 
@@ -437,6 +407,7 @@ async def generate_design(request: GenerateRequest):
             spec_json["estimated_cost"]["total"] = estimated_cost
 
         generation_time = int((time.time() - start_time) * 1000)
+        timer.log(spec_id)
         print(f"🎉 Generated spec {spec_id} for user {request.user_id} in {generation_time}ms")
         logger.info(f"Generated spec {spec_id} for user {request.user_id} in {generation_time}ms")
 
@@ -450,6 +421,7 @@ async def generate_design(request: GenerateRequest):
             created_at=datetime.now(timezone.utc),
             spec_version=1,
             user_id=request.user_id,
+            job_id=job_id,
         )
         print(f"📤 Returning response with spec_id: {spec_id}")
         return response
@@ -486,11 +458,13 @@ async def get_spec(spec_id: str):
             if db_spec:
                 print(f"✅ Found spec {spec_id} in database")
 
-                # Generate preview URL
+                # Generate preview URL (locally built geometry is stored under its content hash)
                 try:
                     from app.storage import supabase
 
-                    preview_url = supabase.storage.from_("geometry").get_public_url(f"{spec_id}.glb")
+                    preview_url = db_spec.preview_url or supabase.storage.from_("geometry").get_public_url(
+                        f"{spec_id}.glb"
+                    )
                 except Exception as e:
                     print(f"⚠️ Supabase URL generation failed: {e}")
                     preview_url = f"http://localhost:8000/static/geometry/{spec_id}.glb"
@@ -524,7 +498,9 @@ async def get_spec(spec_id: str):
         try:
             from app.storage import supabase
 
-            preview_url = supabase.storage.from_("geometry").get_public_url(f"{spec_id}.glb")
+            preview_url = stored_spec.get("preview_url") or supabase.storage.from_("geometry").get_public_url(
+                f"{spec_id}.glb"
+            )
         except Exception as e:
             preview_url = f"http://localhost:8000/static/geometry/{spec_id}.glb"
 
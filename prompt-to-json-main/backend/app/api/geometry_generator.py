@@ -8,8 +8,9 @@ import logging
 import os
 import struct
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
+from app.config import settings
 from fastapi import APIRouter, BackgroundTasks, HTTPException
 from pydantic import BaseModel, Field
 
@@ -23,6 +24,9 @@ class GeometryRequest(BaseModel):
     spec_json: Dict[str, Any] = Field(..., description="Design specification")
     request_id: str = Field(..., description="Request identifier")
     format: str = Field(default="glb", description="Output format (glb, obj)")
+    layout: Optional[str] = Field(
+        default=None, description="GLB layout (merged, instanced, nodes); defaults to GLB_LAYOUT"
+    )
 
 
 class GeometryResponse(BaseModel):
@@ -42,19 +46,24 @@ class GLBGenerator:
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
 
-    def generate_glb(self, spec_json: Dict[str, Any], request_id: str) -> str:
+    def generate_glb(self, spec_json: Dict[str, Any], request_id: str, layout: Optional[str] = None) -> str:
         """Generate GLB file from design specification"""
 
         try:
-            # Create simple GLB with basic room geometry
-            glb_content = self._create_simple_glb(spec_json)
-
-            # Save GLB file
             glb_filename = f"{request_id}.glb"
             glb_path = os.path.join(self.output_dir, glb_filename)
 
+            # Stream real geometry straight to the file instead of building it in memory first
             with open(glb_path, "wb") as f:
-                f.write(glb_content)
+                try:
+                    from app.geometry_generator_real import write_real_glb
+
+                    write_real_glb(spec_json, f, layout=layout or settings.GLB_LAYOUT)
+                except Exception as e:
+                    logger.warning(f"Real geometry generation failed, using fallback: {e}")
+                    f.seek(0)
+                    f.truncate()
+                    f.write(self._create_fallback_glb(spec_json))
 
             logger.info(f"Generated GLB file: {glb_path}")
             return glb_path
@@ -63,29 +72,33 @@ class GLBGenerator:
             logger.error(f"GLB generation failed for {request_id}: {e}")
             raise
 
-    def _create_simple_glb(self, spec_json: Dict[str, Any]) -> bytes:
+    def _create_simple_glb(self, spec_json: Dict[str, Any], layout: str = "merged") -> bytes:
         """Create real GLB with actual geometry from spec"""
         try:
             from app.geometry_generator_real import generate_real_glb
 
-            return generate_real_glb(spec_json)
+            return generate_real_glb(spec_json, layout=layout)
         except Exception as e:
             logger.warning(f"Real geometry generation failed, using fallback: {e}")
-            # Fallback to simple room
-            rooms = spec_json.get("rooms", [])
-            if not rooms:
-                rooms = [{"type": "room", "length": 4.0, "width": 4.0, "height": 3.0}]
+            return self._create_fallback_glb(spec_json)
+
+    def _create_fallback_glb(self, spec_json: Dict[str, Any]) -> bytes:
+        """Create minimal placeholder GLB"""
+        # Fallback to simple room
+        rooms = spec_json.get("rooms", [])
+        if not rooms:
+            rooms = [{"type": "room", "length": 4.0, "width": 4.0, "height": 3.0}]
 
-            room = rooms[0]
-            length = room.get("length", 4.0)
-            width = room.get("width", 4.0)
-            height = room.get("height", 3.0)
+        room = rooms[0]
+        length = room.get("length", 4.0)
+        width = room.get("width", 4.0)
+        height = room.get("height", 3.0)
 
-            # Simple fallback GLB
-            glb_header = b"glTF\x02\x00\x00\x00"
-            mock_data = b'{"asset":{"version":"2.0"},"scenes":[{"nodes":[0]}],"nodes":[{"mesh":0}],"meshes":[{"primitives":[{"attributes":{"POSITION":0}}]}]}'
-            padding = b"\x00" * (1024 - len(mock_data))
-            return glb_header + mock_data + padding
+        # Simple fallback GLB
+        glb_header = b"glTF\x02\x00\x00\x00"
+        mock_data = b'{"asset":{"version":"2.0"},"scenes":[{"nodes":[0]}],"nodes":[{"mesh":0}],"meshes":[{"primitives":[{"attributes":{"POSITION":0}}]}]}'
+        padding = b"\x00" * (1024 - len(mock_data))
+        return glb_header + mock_data + padding
 
 
 # Global instance
@@ -100,7 +113,7 @@ async def generate_geometry(request: GeometryRequest, background_tasks: Backgrou
 
     try:
         if request.format.lower() == "glb":
-            geometry_path = glb_generator.generate_glb(request.spec_json, request.request_id)
+            geometry_path = glb_generator.generate_glb(request.spec_json, request.request_id, request.layout)
         else:
             raise HTTPException(status_code=400, detail=f"Unsupported format: {request.format}")
 
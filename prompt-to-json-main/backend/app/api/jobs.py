@@ -0,0 +1,51 @@
+"""
+Jobs API - Background Job Status
+Polling and Server-Sent Events for slow 3D generation jobs
+"""
+import json
+import logging
+
+from app.database import get_current_user
+from app.jobs import get_job, job_events
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def _public(job: dict) -> dict:
+    """Job fields safe to return to clients"""
+    return {key: value for key, value in job.items() if key not in ("webhook_url", "owner")}
+
+
+async def _get_owned_job(job_id: str, current_user: str) -> dict:
+    """The job if ``current_user`` submitted it; other users' jobs are reported as missing"""
+    job = await get_job(job_id)
+    if not job or job.get("owner") != current_user:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str, current_user: str = Depends(get_current_user)):
+    """
+    Current state of a background job
+
+    **Status:** queued → running → succeeded | failed
+    """
+    return _public(await _get_owned_job(job_id, current_user))
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, current_user: str = Depends(get_current_user)):
+    """
+    Server-Sent Events stream of job updates; closes once the job finishes
+    """
+    await _get_owned_job(job_id, current_user)
+
+    async def event_stream():
+        async for job in job_events(job_id):
+            yield f"event: {job['status']}\ndata: {json.dumps(_public(job), default=str)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -4,7 +4,7 @@ import os
 from app.compute_routing import route, run_yotta
 from app.database import get_current_user, get_db
 from app.opt_rl.env_spec import SpecEditEnv
-from app.opt_rl.train_ppo import train_opt_ppo
+from app.opt_rl.train_ppo import PPO_VEC_ENV, PPO_VEC_ENVS, clamp_workers, train_opt_ppo
 from app.rlhf.build_dataset import build_preferences_from_db
 from app.rlhf.reward_model import SimpleRewardModel, score_spec
 from fastapi import APIRouter, Depends, HTTPException, Query
@@ -222,11 +222,22 @@ async def train_rlhf_ep(params: dict, user=Depends(get_current_user), db: Sessio
 @router.post("/rl/train/opt")
 async def train_opt_ep(params: dict, user=Depends(get_current_user)):
     """
-    Trains the PPO spec-edit policy. params: {"steps": 200000}
+    Trains the PPO spec-edit policy. params: {"steps": 200000, "vec_env": "subproc", "workers": 8}
     """
     if not os.path.exists("models_ckpt/rm.pt"):
         raise HTTPException(400, "Reward model not found. Train RLHF first.")
 
+    vec_env = params.get("vec_env", PPO_VEC_ENV)
+    if vec_env not in PPO_VEC_ENVS:
+        raise HTTPException(400, f"vec_env must be one of: {', '.join(PPO_VEC_ENVS)}")
+    workers = params.get("workers")
+    if workers is not None:
+        try:
+            workers = clamp_workers(workers)
+        except (TypeError, ValueError):
+            raise HTTPException(400, "workers must be an integer")
+        params = dict(params, workers=workers)
+
     heavy = params.get("steps", 200000) > 100000
     if route(heavy) == "yotta":
         res = await run_yotta("opt_ppo_train", {"params": params})
@@ -247,6 +258,8 @@ async def train_opt_ep(params: dict, user=Depends(get_current_user)):
                 gamma=params.get("gamma", 0.99),
                 gae_lambda=params.get("gae_lambda", 0.95),
                 clip_range=params.get("clip_range", 0.2),
+                vec_env=vec_env,
+                workers=workers,
             )
             return {"ok": True, "artifact": artifact}
         except Exception as e:
@@ -9,6 +9,7 @@ from typing import Dict, List, Optional
 
 from app.config import settings
 from app.database import get_db
+from app.execution import StageTimer, run_io
 from app.models import AuditLog, Iteration, Spec, User
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
@@ -218,6 +219,7 @@ async def switch_material(request: SwitchRequest, db: Session = Depends(get_db))
     - cost_impact: Cost difference
     """
     start_time = time.time()
+    timer = StageTimer("switch")
 
     print(f"🔄 SWITCH REQUEST: spec_id={request.spec_id}, query='{request.query}'")
     logger.info(f"🔄 SWITCH REQUEST: spec_id={request.spec_id}, query='{request.query}'")
@@ -234,7 +236,7 @@ async def switch_material(request: SwitchRequest, db: Session = Depends(get_db))
     else:
         # Fallback to database
         try:
-            spec = db.query(Spec).filter(Spec.id == request.spec_id).first()
+            spec = await run_io(db.query(Spec).filter(Spec.id == request.spec_id).first)
             if not spec:
                 print(f"❌ Spec {request.spec_id} not found in storage or database")
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Specification not found")
@@ -280,6 +282,7 @@ async def switch_material(request: SwitchRequest, db: Session = Depends(get_db))
 
         # Recalculate cost
         cost_impact = recalculate_cost(spec_json, updated_spec)
+        timer.lap("apply")
 
         # Generate iteration ID
         import uuid
@@ -311,18 +314,19 @@ async def switch_material(request: SwitchRequest, db: Session = Depends(get_db))
             db.add(iteration)
 
             # Update spec version in database
-            spec_db = db.query(Spec).filter(Spec.id == request.spec_id).first()
+            spec_db = await run_io(db.query(Spec).filter(Spec.id == request.spec_id).first)
             if spec_db:
                 spec_db.spec_json = updated_spec
                 spec_db.version += 1
                 spec_db.updated_at = datetime.now(timezone.utc)
 
-            db.commit()
+            await run_io(db.commit)
             print(f"✅ Saved iteration {iteration_id} to database")
 
         except Exception as e:
-            db.rollback()
+            await run_io(db.rollback)
             print(f"⚠️ Database save failed: {e}")
+        timer.lap("save")
 
         # Update stored spec if found in storage
         if stored_spec:
@@ -335,21 +339,22 @@ async def switch_material(request: SwitchRequest, db: Session = Depends(get_db))
 
         # Generate real preview URL
         try:
-            from app.storage import get_signed_url, upload_to_bucket
-            from app.utils import generate_glb_from_spec
+            from app.geometry_cache import build_glb_async, cas_path, upload_cached_glb
+            from app.storage import get_signed_url
 
-            # Generate GLB file
-            preview_bytes = generate_glb_from_spec(updated_spec)
-            preview_path = f"{iteration_id}.glb"
+            # Generate GLB file (material switches hit the geometry cache)
+            geometry_key, preview_bytes = await build_glb_async(updated_spec)
 
-            # Upload to Supabase
-            await upload_to_bucket("previews", preview_path, preview_bytes)
-            preview_url = get_signed_url("previews", preview_path, expires=600)
+            # Upload to Supabase once per distinct geometry
+            await upload_cached_glb("previews", geometry_key, preview_bytes)
+            preview_url = await run_io(get_signed_url, "previews", cas_path(geometry_key), expires=600)
 
         except Exception as e:
             logger.warning(f"Preview generation failed: {e}")
             preview_url = f"https://mock-preview-{iteration_id}.glb"
 
+        timer.lap("preview")
+        timer.log(iteration_id)
         print(f"✅ Switch completed: {len(changes)} changes made")
 
         return SwitchResponse(
@@ -10,6 +10,8 @@ from pathlib import Path
 from typing import Dict, List
 
 import httpx
+from app.pdf_pages import iter_pdf_pages
+from app.rule_classifier import CLASSIFICATION_ORDER, scan
 from prefect import flow, task
 from prefect.tasks import task_input_hash
 from pydantic import BaseModel
@@ -75,14 +77,11 @@ async def extract_text_from_pdf(pdf_path: Path) -> Dict:
     try:
         # Try PyPDF2 first, fallback to basic text extraction
         try:
-            import PyPDF2
+            import PyPDF2  # noqa: F401
 
-            text_content = []
-            with open(pdf_path, "rb") as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page_num, page in enumerate(pdf_reader.pages):
-                    text = page.extract_text()
-                    text_content.append({"page": page_num + 1, "content": text.strip()})
+            # Page-sharded on a process pool, cached by file hash; kept off the event loop
+            pages = await asyncio.to_thread(lambda: list(iter_pdf_pages(str(pdf_path), engines=("pypdf2",))))
+            text_content = [{"page": page_num, "content": text.strip()} for page_num, text in pages]
 
         except ImportError:
             # Fallback: treat as text file or create mock content
@@ -122,12 +121,10 @@ async def parse_rules_from_text(extracted_data: Dict) -> Dict:
         "metadata": {"total_pages": extracted_data["total_pages"], "extraction_method": "keyword_based"},
     }
 
-    # Example rule extraction (replace with LLM)
-    keywords = ["FSI", "setback", "parking", "floor height", "coverage"]
-
-    for keyword in keywords:
-        if keyword.lower() in full_text.lower():
-            rules["rules"].append({"type": keyword, "found": True, "requires_manual_review": True})
+    # Rule categories referenced in the document, from one scan of the text
+    found = dict.fromkeys(token.kind for token in scan(full_text) if token.kind in CLASSIFICATION_ORDER)
+    for category in found:
+        rules["rules"].append({"type": category, "found": True, "requires_manual_review": True})
 
     logger.info(f"Parsed {len(rules['rules'])} rule references from {extracted_data['filename']}")
 
@@ -170,6 +170,12 @@ class Settings(BaseSettings):
     # Hugging Face (3D Generation)
     HUGGINGFACE_API_KEY: Optional[str] = Field(default=None, description="Hugging Face API token for 3D generation")
 
+    # 3D provider racing: start the next provider after this many seconds without a result (0 = all at once)
+    PROVIDER_HEDGE_DELAY: float = Field(default=30.0, description="Seconds before hedging to the next 3D provider")
+    JOB_STORE: str = Field(
+        default="memory", description="Background job store: memory | database (DATABASE_URL) | SQLAlchemy URL"
+    )
+
     # Raptor (Preview) - lightweight inference option
     RAPTOR_MINI_ENABLED: bool = Field(default=False, description="Enable Raptor mini (Preview) model")
     RAPTOR_MINI_MODEL: str = Field(default="raptor-mini-preview", description="Raptor mini model name")
@@ -243,6 +249,20 @@ class Settings(BaseSettings):
     )
     UPLOAD_DIRECTORY: str = Field(default="uploads/", description="Temporary upload directory")
 
+    # ============================================================================
+    # GEOMETRY CONFIGURATION
+    # ============================================================================
+    GLB_LAYOUT: str = Field(
+        default="merged",
+        description="Local GLB layout: merged (single mesh) | instanced (EXT_mesh_gpu_instancing) | nodes (one node per object)",
+    )
+    GEOMETRY_CACHE_SIZE: int = Field(default=128, description="GLBs kept in the in-memory geometry cache")
+    GEOMETRY_CACHE_DIR: str = Field(
+        default="data/geometry_outputs/cache", description="Disk tier of the content-addressed geometry cache"
+    )
+    GEOMETRY_WORKERS: int = Field(default=2, description="Mesh-building worker processes (0 = use I/O threads)")
+    IO_WORKERS: int = Field(default=16, description="Threads for blocking storage and database calls")
+
     # ============================================================================
     # MULTI-CITY CONFIGURATION
     # ============================================================================
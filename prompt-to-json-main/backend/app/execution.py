@@ -0,0 +1,91 @@
+"""
+Execution Layer
+Bounded worker pools for blocking I/O and CPU-bound mesh building, plus per-stage timing
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Blocking SDK calls (Supabase, SQLAlchemy, disk) run here instead of on the event loop
+io_pool = ThreadPoolExecutor(max_workers=settings.IO_WORKERS, thread_name_prefix="io")
+
+_cpu_pool: Optional[ProcessPoolExecutor] = None
+_cpu_pool_lock = threading.Lock()
+
+
+def get_cpu_pool() -> Optional[ProcessPoolExecutor]:
+    """Lazily start the mesh-building process pool (None when GEOMETRY_WORKERS is 0)"""
+    global _cpu_pool
+    if settings.GEOMETRY_WORKERS <= 0:
+        return None
+    with _cpu_pool_lock:
+        if _cpu_pool is None:
+            _cpu_pool = ProcessPoolExecutor(max_workers=settings.GEOMETRY_WORKERS)
+        return _cpu_pool
+
+
+async def run_io(func: Callable, *args, **kwargs) -> Any:
+    """Await a blocking call on the bounded I/O thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_pool, partial(func, *args, **kwargs))
+
+
+async def run_cpu(func: Callable, *args) -> Any:
+    """Await a CPU-bound, picklable call on the process pool
+
+    Falls back to the I/O thread pool when no process pool is configured or
+    the pool has died (e.g. a worker was OOM-killed).
+    """
+    global _cpu_pool
+    pool = get_cpu_pool()
+    if pool is None:
+        return await run_io(func, *args)
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(pool, partial(func, *args))
+    except BrokenProcessPool:
+        logger.warning("Geometry process pool broken, restarting and running in thread pool")
+        with _cpu_pool_lock:
+            if _cpu_pool is pool:
+                _cpu_pool = None
+        pool.shutdown(wait=False)
+        return await run_io(func, *args)
+
+
+def shutdown_pools():
+    """Stop worker pools on application shutdown"""
+    global _cpu_pool
+    io_pool.shutdown(wait=False)
+    with _cpu_pool_lock:
+        if _cpu_pool is not None:
+            _cpu_pool.shutdown(wait=False)
+            _cpu_pool = None
+
+
+class StageTimer:
+    """Splits one request's wall-clock time into consecutive, named pipeline stages"""
+
+    def __init__(self, pipeline: str):
+        self.pipeline = pipeline
+        self.stages: Dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str):
+        """Attribute the time since the previous lap (or creation) to ``stage``"""
+        now = time.perf_counter()
+        self.stages[stage] = round(self.stages.get(stage, 0.0) + (now - self._last) * 1000, 1)
+        self._last = now
+
+    def log(self, request_id: str = ""):
+        total = round(sum(self.stages.values()), 1)
+        logger.info(f"⏱️ {self.pipeline} {request_id} stages (ms): {self.stages} total={total}")
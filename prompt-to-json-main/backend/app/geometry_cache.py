@@ -0,0 +1,162 @@
+"""
+Geometry Cache
+Content-addressed GLB cache keyed on a canonical hash of the geometry-relevant spec fields
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when the local generator output changes so stale disk entries are not served
+GEOMETRY_VERSION = 2
+
+# Object fields that change the generated mesh; material, colour and cost do not
+GEOMETRY_FIELDS = ("type", "subtype", "dimensions", "count", "position", "positions")
+
+# Storage prefix for deduplicated GLB objects
+CAS_PREFIX = "cas"
+
+
+def geometry_hash(spec_json: Dict, layout: str) -> str:
+    """Canonical SHA-256 of the spec fields that affect the local GLB"""
+    objects = [
+        {field: obj[field] for field in GEOMETRY_FIELDS if field in obj} for obj in spec_json.get("objects", [])
+    ]
+    canonical = json.dumps(
+        {"version": GEOMETRY_VERSION, "layout": layout, "objects": objects},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class GeometryCache:
+    """Two-tier GLB cache: bounded in-memory LRU in front of a local directory"""
+
+    def __init__(self, max_entries: int, cache_dir: str):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._urls: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.glb")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached GLB bytes, promoting disk hits into memory"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes):
+        """Store GLB bytes in both tiers"""
+        self._remember(key, data)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"Geometry cache disk write failed: {e}")
+
+    def _remember(self, key: str, data: bytes):
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_url(self, bucket: str, key: str) -> Optional[str]:
+        """URL of an already uploaded object, if any"""
+        with self._lock:
+            return self._urls.get((bucket, key))
+
+    def set_url(self, bucket: str, key: str, url: str):
+        with self._lock:
+            self._urls[(bucket, key)] = url
+
+    def clear(self):
+        """Drop the in-memory tier and known uploads (disk entries are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._urls.clear()
+
+
+geometry_cache = GeometryCache(settings.GEOMETRY_CACHE_SIZE, settings.GEOMETRY_CACHE_DIR)
+
+
+def get_or_build_glb(spec_json: Dict, layout: Optional[str] = None) -> Tuple[str, bytes]:
+    """Return (content hash, GLB bytes), building the mesh only on a cache miss"""
+    from app.geometry_generator_real import generate_real_glb
+
+    layout = layout or settings.GLB_LAYOUT
+    key = geometry_hash(spec_json, layout)
+
+    glb_data = geometry_cache.get(key)
+    if glb_data is None:
+        glb_data = generate_real_glb(spec_json, layout=layout)
+        geometry_cache.put(key, glb_data)
+    else:
+        logger.info(f"Geometry cache hit: {key[:12]}")
+
+    return key, glb_data
+
+
+async def build_glb_async(spec_json: Dict, layout: Optional[str] = None) -> Tuple[str, bytes]:
+    """Async get_or_build_glb: disk lookups on the I/O pool, mesh building on the process pool"""
+    from app.execution import run_cpu, run_io
+    from app.geometry_generator_real import generate_real_glb
+
+    layout = layout or settings.GLB_LAYOUT
+    key = geometry_hash(spec_json, layout)
+
+    glb_data = await run_io(geometry_cache.get, key)
+    if glb_data is None:
+        glb_data = await run_cpu(generate_real_glb, spec_json, layout)
+        await run_io(geometry_cache.put, key, glb_data)
+    else:
+        logger.info(f"Geometry cache hit: {key[:12]}")
+
+    return key, glb_data
+
+
+def cas_path(key: str) -> str:
+    """Storage path of a deduplicated GLB object"""
+    return f"{CAS_PREFIX}/{key}.glb"
+
+
+async def upload_cached_glb(bucket: str, key: str, glb_data: bytes) -> str:
+    """Upload a content-addressed GLB once per bucket and return its public URL
+
+    The upload upserts: an object already stored under the same hash (e.g. by
+    another process) has identical bytes, so overwriting it is harmless.
+    """
+    from app.storage import upload_to_bucket
+
+    url = geometry_cache.get_url(bucket, key)
+    if url:
+        return url
+
+    url = await upload_to_bucket(bucket, cas_path(key), glb_data, upsert=True)
+    geometry_cache.set_url(bucket, key, url)
+    return url
@@ -4,453 +4,520 @@ Converts design specs to actual 3D models
 """
 import json
 import struct
-from typing import Dict, List, Tuple
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+import numpy as np
 
-def generate_real_glb(spec_json: Dict) -> bytes:
-    """Generate real GLB file with actual geometry"""
+# glTF accessor component types
+FLOAT = 5126
+UNSIGNED_SHORT = 5123
+UNSIGNED_INT = 5125
+
+# glTF forbids the maximum value of the index type (primitive restart), so
+# UNSIGNED_SHORT indices can address at most 65535 vertices
+MAX_UINT16_INDEX = 0xFFFF
+
+INSTANCING_EXTENSION = "EXT_mesh_gpu_instancing"
+
+# Upper bound on the copies one spec object expands to (count or positions)
+MAX_OBJECT_COPIES = 10000
+
+
+# Supported GLB layouts: one merged mesh, one mesh per distinct object drawn with GPU instancing,
+# or a scene graph with one node per spec object
+GLB_LAYOUTS = ("merged", "instanced", "nodes")
+
+
+def generate_real_glb(spec_json: Dict, layout: str = "merged") -> bytes:
+    """Generate real GLB file with actual geometry
+
+    Objects are placed by ``position``/``positions`` and repeated ``count`` times.
+    ``layout="merged"`` flattens every copy into a single mesh; ``layout="instanced"``
+    emits one mesh per distinct (type, dimensions) pair and places the copies via
+    EXT_mesh_gpu_instancing; ``layout="nodes"`` emits one translated node per
+    spec object so viewers can cull and pick objects individually.
+    """
+    return build_gltf(spec_json, layout).to_glb()
+
+
+def write_real_glb(spec_json: Dict, stream: BinaryIO, layout: str = "merged") -> int:
+    """Stream the GLB for ``spec_json`` into a writable binary file object; returns bytes written"""
+    return build_gltf(spec_json, layout).write_glb(stream)
+
+
+def build_gltf(spec_json: Dict, layout: str = "merged") -> "GltfBuilder":
+    """Lay out the glTF document for a spec without assembling the final GLB bytes"""
 
     # Extract objects from spec
     objects = spec_json.get("objects", [])
 
-    # Generate vertices and faces for each object
-    vertices = []
-    indices = []
-    vertex_offset = 0
+    if layout == "instanced":
+        return build_instanced_gltf(objects)
+    if layout == "nodes":
+        return build_node_gltf(objects)
+    if layout != "merged":
+        raise ValueError(f"Unsupported GLB layout: {layout}")
+
+    # Per-object arrays are written back to back; the merged mesh is never materialised
+    builder = GltfBuilder()
+    builder.add_node({"mesh": builder.add_mesh_parts(build_scene_arrays(objects))})
+    return builder
+
+
+def generate_instanced_glb(objects: Sequence[Dict]) -> bytes:
+    """Generate a GLB with one shared mesh per distinct object and per-instance translations"""
+    return build_instanced_gltf(objects).to_glb()
+
 
+def build_instanced_gltf(objects: Sequence[Dict]) -> "GltfBuilder":
+    """Lay out one shared mesh per distinct object, placing copies via EXT_mesh_gpu_instancing"""
+    groups: Dict[Tuple[str, str], List[Dict]] = defaultdict(list)
     for obj in objects:
-        obj_vertices, obj_indices = create_object_geometry(obj)
-
-        # Add vertices
-        vertices.extend(obj_vertices)
-
-        # Add indices with offset
-        for idx in obj_indices:
-            indices.extend([i + vertex_offset for i in idx])
-
-        vertex_offset += len(obj_vertices)
-
-    # Create glTF JSON
-    gltf_json = {
-        "asset": {"version": "2.0"},
-        "scenes": [{"nodes": [0]}],
-        "nodes": [{"mesh": 0}],
-        "meshes": [{"primitives": [{"attributes": {"POSITION": 0}, "indices": 1}]}],
-        "accessors": [
-            {"bufferView": 0, "componentType": 5126, "count": len(vertices), "type": "VEC3"},  # FLOAT
-            {"bufferView": 1, "componentType": 5123, "count": len(indices), "type": "SCALAR"},  # UNSIGNED_SHORT
-        ],
-        "bufferViews": [
-            {"buffer": 0, "byteOffset": 0, "byteLength": len(vertices) * 12},  # 3 floats * 4 bytes
-            {"buffer": 0, "byteOffset": len(vertices) * 12, "byteLength": len(indices) * 2},  # 1 short * 2 bytes
-        ],
-        "buffers": [{"byteLength": len(vertices) * 12 + len(indices) * 2}],
-    }
+        groups[geometry_key(obj)].append(obj)
 
-    # Convert to binary
-    json_data = json.dumps(gltf_json).encode("utf-8")
+    builder = GltfBuilder()
+    builder.use_extension(INSTANCING_EXTENSION, required=True)
 
-    # Pack vertex data
-    vertex_data = b""
-    for vertex in vertices:
-        vertex_data += struct.pack("<fff", vertex[0], vertex[1], vertex[2])
+    for members in groups.values():
+        vertices, faces = create_object_geometry(members[0])
+        mesh = builder.add_mesh(vertices, faces.ravel())
 
-    # Pack index data
-    index_data = b""
-    for index in indices:
-        index_data += struct.pack("<H", index)
+        translations = np.concatenate([object_placements(obj, vertices) for obj in members]).astype("<f4")
+        translation = builder.add_accessor(translations, FLOAT, "VEC3")
 
-    binary_data = vertex_data + index_data
+        builder.add_node(
+            {"mesh": mesh, "extensions": {INSTANCING_EXTENSION: {"attributes": {"TRANSLATION": translation}}}}
+        )
 
-    # Create GLB
-    return create_glb_file(json_data, binary_data)
+    return builder
 
 
-def create_object_geometry(obj: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    """Create 3D geometry for any design object"""
+def build_node_gltf(objects: Sequence[Dict]) -> "GltfBuilder":
+    """Lay out one node per spec object, translated to its placement and sharing identical meshes
 
-    obj_type = obj.get("type", "")
-    dimensions = obj.get("dimensions", {})
+    Objects with several copies become a parent node with one child per copy.
+    """
+    builder = GltfBuilder()
+    meshes: Dict[Tuple[str, str], Tuple[int, np.ndarray]] = {}
 
-    # Kitchen objects
-    if obj_type == "cabinet":
-        return create_cabinet_geometry(dimensions)
-    elif obj_type == "countertop":
-        return create_countertop_geometry(dimensions)
-    elif obj_type == "island":
-        return create_island_geometry(dimensions)
-    elif obj_type == "floor":
-        return create_floor_geometry(dimensions)
+    for index, obj in enumerate(objects):
+        key = geometry_key(obj)
+        if key not in meshes:
+            vertices, faces = create_object_geometry(obj)
+            meshes[key] = (builder.add_mesh(vertices, faces.ravel()), vertices)
+        mesh, vertices = meshes[key]
 
-    # Building/Architecture objects
-    elif obj_type == "wall":
-        return create_wall_geometry(dimensions)
-    elif obj_type == "door":
-        return create_door_geometry(dimensions)
-    elif obj_type == "window":
-        return create_window_geometry(dimensions)
-    elif obj_type == "roof":
-        return create_roof_geometry(dimensions)
-    elif obj_type == "foundation":
-        return create_foundation_geometry(dimensions)
-    elif obj_type == "column":
-        return create_column_geometry(dimensions)
-    elif obj_type == "beam":
-        return create_beam_geometry(dimensions)
-    elif obj_type == "slab":
-        return create_slab_geometry(dimensions)
-    elif obj_type == "staircase":
-        return create_staircase_geometry(dimensions)
-    elif obj_type == "balcony":
-        return create_balcony_geometry(dimensions)
-
-    # Room/Interior objects
-    elif obj_type == "room":
-        # Handle different room subtypes
-        subtype = obj.get("subtype", "")
-        if subtype == "bedroom":
-            return create_room_geometry(dimensions, with_bed=True)
-        elif subtype == "living" or subtype == "living_room":
-            return create_room_geometry(dimensions, with_furniture=True)
-        elif subtype == "kitchen":
-            return create_room_geometry(dimensions, with_cabinets=True)
-        elif subtype == "bathroom":
-            return create_room_geometry(dimensions, with_fixtures=True)
+        node = {"name": str(obj.get("id") or f"{obj.get('type', 'object')}_{index}")}
+        placements = object_placements(obj, vertices)
+        if len(placements) == 1:
+            node.update(_placed_node(mesh, placements[0]))
         else:
-            return create_room_geometry(dimensions)
-    elif obj_type == "structure":
-        return create_structure_geometry(dimensions)
-    elif obj_type == "furniture":
-        # Handle furniture subtypes
-        subtype = obj.get("subtype", "")
-        if subtype == "bed":
-            return create_bed_geometry(dimensions)
-        elif subtype == "sofa":
-            return create_sofa_geometry(dimensions)
-        elif subtype == "table":
-            return create_table_geometry(dimensions)
-        elif subtype == "desk":
-            return create_table_geometry(dimensions)
-        elif subtype == "dresser":
-            return create_wardrobe_geometry(dimensions)
-        elif subtype == "entertainment" or subtype == "tv_stand":
-            return create_tv_unit_geometry(dimensions)
-        else:
-            return create_box_geometry(dimensions)
-    elif obj_type == "storage":
-        subtype = obj.get("subtype", "")
-        if subtype == "closet" or subtype == "wardrobe":
-            return create_wardrobe_geometry(dimensions)
+            node["children"] = [builder.add_node(_placed_node(mesh, placement), root=False) for placement in placements]
+        builder.add_node(node)
+
+    return builder
+
+
+def _placed_node(mesh: int, translation: np.ndarray) -> Dict:
+    """Node drawing ``mesh`` at ``translation`` (omitted when at the origin)"""
+    node: Dict = {"mesh": mesh}
+    if translation.any():
+        node["translation"] = [float(value) for value in translation]
+    return node
+
+
+class GltfBuilder:
+    """Accumulates glTF JSON and 4-byte aligned buffer views for a single-buffer GLB
+
+    Buffer views only record sizes and the arrays (or lazy chunk producers) that
+    fill them, so the whole layout is known before any binary data is written.
+    """
+
+    def __init__(self):
+        self.gltf: Dict = {
+            "asset": {"version": "2.0"},
+            "scenes": [{"nodes": []}],
+            "nodes": [],
+            "meshes": [],
+            "accessors": [],
+            "bufferViews": [],
+        }
+        self.chunks: List[Callable[[], Iterable]] = []
+        self.byte_length = 0
+
+    def add_accessor(self, data: np.ndarray, component_type: int, accessor_type: str) -> int:
+        """Append ``data`` as its own buffer view and return the new accessor index"""
+        return self.add_deferred_accessor(len(data), data.nbytes, lambda: (data,), component_type, accessor_type)
+
+    def add_deferred_accessor(
+        self, count: int, byte_length: int, chunks: Callable[[], Iterable], component_type: int, accessor_type: str
+    ) -> int:
+        """Reserve a buffer view of ``byte_length`` bytes filled by ``chunks()`` at write time
+
+        ``chunks`` is called each time the GLB is written and must yield
+        bytes-like objects totalling exactly ``byte_length`` bytes.
+        """
+        padding = -self.byte_length % 4
+        if padding:
+            self.chunks.append(lambda padding=padding: (b"\x00" * padding,))
+            self.byte_length += padding
+
+        self.gltf["bufferViews"].append({"buffer": 0, "byteOffset": self.byte_length, "byteLength": byte_length})
+        self.chunks.append(chunks)
+        self.byte_length += byte_length
+
+        self.gltf["accessors"].append(
+            {
+                "bufferView": len(self.gltf["bufferViews"]) - 1,
+                "componentType": component_type,
+                "count": count,
+                "type": accessor_type,
+            }
+        )
+        return len(self.gltf["accessors"]) - 1
+
+    def add_mesh(self, vertices: np.ndarray, indices: np.ndarray) -> int:
+        """Add a triangle mesh from (N, 3) float32 vertices and flat indices; returns the mesh index"""
+        return self.add_mesh_parts([(vertices, indices)])
+
+    def add_mesh_parts(self, parts: Sequence[Tuple[np.ndarray, np.ndarray]]) -> int:
+        """Add one mesh made of per-object (vertices, faces) arrays without concatenating them
+
+        Vertex data is written straight from each part and each part's indices are
+        offset while streaming, so only one part-sized index array exists at a time.
+        Indices are packed as UNSIGNED_SHORT when every vertex fits below the
+        restart value and as UNSIGNED_INT otherwise.
+        """
+        vertex_count = sum(len(vertices) for vertices, _ in parts)
+        index_count = sum(faces.size for _, faces in parts)
+        index_dtype, index_type = ("<u2", UNSIGNED_SHORT) if vertex_count <= MAX_UINT16_INDEX else ("<u4", UNSIGNED_INT)
+
+        def vertex_chunks():
+            for vertices, _ in parts:
+                yield np.ascontiguousarray(vertices, dtype="<f4")
+
+        def index_chunks():
+            offset = 0
+            for vertices, faces in parts:
+                yield (faces.ravel() + offset).astype(index_dtype)
+                offset += len(vertices)
+
+        position = self.add_deferred_accessor(vertex_count, vertex_count * 12, vertex_chunks, FLOAT, "VEC3")
+        if vertex_count:
+            # POSITION bounds let viewers cull without reading the buffer
+            bounds = [(vertices.min(axis=0), vertices.max(axis=0)) for vertices, _ in parts if len(vertices)]
+            accessor = self.gltf["accessors"][position]
+            accessor["min"] = [float(value) for value in np.min([low for low, _ in bounds], axis=0)]
+            accessor["max"] = [float(value) for value in np.max([high for _, high in bounds], axis=0)]
+        index = self.add_deferred_accessor(
+            index_count, index_count * np.dtype(index_dtype).itemsize, index_chunks, index_type, "SCALAR"
+        )
+
+        self.gltf["meshes"].append({"primitives": [{"attributes": {"POSITION": position}, "indices": index}]})
+        return len(self.gltf["meshes"]) - 1
+
+    def add_node(self, node: Dict, root: bool = True) -> int:
+        """Add a node (to the default scene unless it is a child); returns the node index"""
+        self.gltf["nodes"].append(node)
+        node_index = len(self.gltf["nodes"]) - 1
+        if root:
+            self.gltf["scenes"][0]["nodes"].append(node_index)
+        return node_index
+
+    def use_extension(self, name: str, required: bool = False):
+        """Declare a glTF extension used (and optionally required) by this file"""
+        self.gltf.setdefault("extensionsUsed", []).append(name)
+        if required:
+            self.gltf.setdefault("extensionsRequired", []).append(name)
+
+    def to_glb(self) -> bytes:
+        """Serialize the accumulated JSON and buffer views as GLB"""
+        return b"".join(self.iter_glb())
+
+    def write_glb(self, stream: BinaryIO) -> int:
+        """Write the GLB to a binary file object chunk by chunk; returns bytes written"""
+        written = 0
+        for chunk in self.iter_glb():
+            stream.write(chunk)
+            written += memoryview(chunk).nbytes
+        return written
+
+    def iter_glb(self) -> Iterator:
+        """Yield the GLB as a sequence of bytes-like chunks (usable as a chunked upload body)"""
+        self.gltf["buffers"] = [{"byteLength": self.byte_length}]
+        json_data = json.dumps(self.gltf).encode("utf-8")
+
+        yield glb_preamble(json_data, self.byte_length)
+        for chunks in self.chunks:
+            yield from chunks()
+        yield b"\x00" * (-self.byte_length % 4)
+
+
+def build_scene_arrays(objects: Sequence[Dict]) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Build (vertices, faces) arrays for every object, preserving object order
+
+    Objects that resolve to the same primitive are expanded together in one
+    batched transform; procedural objects (rooms, stairs, ...) are built individually.
+    """
+    parts: List[Optional[Tuple[np.ndarray, np.ndarray]]] = [None] * len(objects)
+
+    batches: Dict[str, List[int]] = defaultdict(list)
+    for position, obj in enumerate(objects):
+        geometry_type = resolve_geometry_type(obj)
+        if geometry_type in PRIMITIVES:
+            batches[geometry_type].append(position)
         else:
-            return create_box_geometry(dimensions)
-    elif obj_type == "bed":
-        return create_bed_geometry(dimensions)
-    elif obj_type == "sofa":
-        return create_sofa_geometry(dimensions)
-    elif obj_type == "table":
-        return create_table_geometry(dimensions)
-    elif obj_type == "chair":
-        return create_chair_geometry(dimensions)
-    elif obj_type == "wardrobe":
-        return create_wardrobe_geometry(dimensions)
-    elif obj_type == "tv_unit":
-        return create_tv_unit_geometry(dimensions)
-    elif obj_type == "bookshelf":
-        return create_bookshelf_geometry(dimensions)
+            parts[position] = _as_arrays(*PROCEDURAL_GEOMETRY[geometry_type](obj.get("dimensions", {})))
 
-    # Automotive objects
-    elif obj_type == "car_body":
-        return create_car_body_geometry(dimensions)
-    elif obj_type == "wheel":
-        return create_wheel_geometry(dimensions)
-    elif obj_type == "engine":
-        return create_engine_geometry(dimensions)
-    elif obj_type == "chassis":
-        return create_chassis_geometry(dimensions)
+    for geometry_type, positions in batches.items():
+        primitive = PRIMITIVES[geometry_type]
+        vertices = expand_primitive(primitive, [objects[position].get("dimensions", {}) for position in positions])
+        faces = TEMPLATES[primitive.template][1]
+        for batch_index, position in enumerate(positions):
+            parts[position] = (vertices[batch_index], faces)
 
-    # Electronics objects
-    elif obj_type == "pcb":
-        return create_pcb_geometry(dimensions)
-    elif obj_type == "component":
-        return create_component_geometry(dimensions)
-    elif obj_type == "housing":
-        return create_housing_geometry(dimensions)
-    elif obj_type == "screen":
-        return create_screen_geometry(dimensions)
+    # Expand repeated or placed objects into their world-space copies
+    for position, obj in enumerate(objects):
+        if obj.get("count") or obj.get("position") or obj.get("positions"):
+            parts[position] = place_copies(*parts[position], object_placements(obj, parts[position][0]))
 
-    else:
-        return create_box_geometry(dimensions)
-
-
-def create_cabinet_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    """Create cabinet box geometry"""
-    w = dims.get("width", 1.0)
-    d = dims.get("depth", 0.6)
-    h = dims.get("height", 0.9)
-
-    # Cabinet vertices (box)
-    vertices = [(0, 0, 0), (w, 0, 0), (w, d, 0), (0, d, 0), (0, 0, h), (w, 0, h), (w, d, h), (0, d, h)]  # Bottom  # Top
-
-    # Cabinet faces
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],  # Bottom
-        [4, 7, 6],
-        [4, 6, 5],  # Top
-        [0, 4, 5],
-        [0, 5, 1],  # Front
-        [2, 6, 7],
-        [2, 7, 3],  # Back
-        [0, 3, 7],
-        [0, 7, 4],  # Left
-        [1, 5, 6],
-        [1, 6, 2],  # Right
-    ]
+    return parts
 
-    return vertices, faces
 
+def place_copies(vertices: np.ndarray, faces: np.ndarray, placements: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Replicate one object's geometry at every placement, returning merged arrays"""
+    copies = len(placements)
+    placed = (vertices[np.newaxis] + placements[:, np.newaxis, :]).reshape(-1, 3).astype("<f4")
+    offsets = (np.arange(copies, dtype=np.uint32) * len(vertices))[:, np.newaxis, np.newaxis]
+    return placed, (faces[np.newaxis] + offsets).reshape(-1, 3).astype("<u4")
 
-def create_countertop_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    """Create countertop slab geometry"""
-    w = dims.get("width", 2.0)
-    d = dims.get("depth", 0.6)
-    h = dims.get("height", 0.05)
-
-    # Thin slab
-    vertices = [(0, 0, 0), (w, 0, 0), (w, d, 0), (0, d, 0), (0, 0, h), (w, 0, h), (w, d, h), (0, d, h)]
-
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],  # Bottom
-        [4, 7, 6],
-        [4, 6, 5],  # Top
-        [0, 4, 5],
-        [0, 5, 1],  # Front
-        [2, 6, 7],
-        [2, 7, 3],  # Back
-        [0, 3, 7],
-        [0, 7, 4],  # Left
-        [1, 5, 6],
-        [1, 6, 2],  # Right
-    ]
 
-    return vertices, faces
+def _as_arrays(vertices, faces) -> Tuple[np.ndarray, np.ndarray]:
+    """Convert list-based geometry into (N, 3) float32 vertices and (M, 3) uint32 faces"""
+    return np.asarray(vertices, dtype="<f4").reshape(-1, 3), np.asarray(faces, dtype="<u4").reshape(-1, 3)
 
 
-def create_island_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    """Create kitchen island geometry"""
-    w = dims.get("width", 2.4)
-    d = dims.get("depth", 1.2)
-    h = dims.get("height", 0.9)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, d, 0), (0, d, 0), (0, 0, h), (w, 0, h), (w, d, h), (0, d, h)]
-
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
+def geometry_key(obj: Dict) -> Tuple[str, str]:
+    """Identify objects that render to an identical mesh: resolved type plus dimensions"""
+    return resolve_geometry_type(obj), json.dumps(obj.get("dimensions", {}), sort_keys=True, default=str)
 
-    return vertices, faces
 
+def object_placements(obj: Dict, vertices: np.ndarray) -> np.ndarray:
+    """Return a (copies, 3) array of translations for every copy of an object
 
-def create_floor_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    """Create floor plane geometry"""
-    w = dims.get("width", 3.6)
-    l = dims.get("length", 3.0)
+    Explicit ``positions`` win. Otherwise ``count`` copies start at ``position``
+    (or the origin) and are laid out along x every two object widths, leaving a
+    one-width gap between neighbouring copies. An unreadable count means one copy;
+    either way an object expands to at most MAX_OBJECT_COPIES copies.
+    """
+    positions = obj.get("positions")
+    if positions and isinstance(positions, (list, tuple)):
+        return np.array([_as_point(point) for point in positions[:MAX_OBJECT_COPIES]], dtype=np.float64)
 
-    vertices = [(0, 0, 0), (w, 0, 0), (w, l, 0), (0, l, 0)]
+    try:
+        count = int(obj.get("count") or 1)
+    except (TypeError, ValueError, OverflowError):
+        count = 1
+    count = min(max(count, 1), MAX_OBJECT_COPIES)
+    width = float(np.ptp(vertices[:, 0])) if len(vertices) else 0.0
 
-    faces = [[0, 1, 2], [0, 2, 3]]
+    placements = np.tile(np.array(_as_point(obj.get("position")), dtype=np.float64), (count, 1))
+    placements[:, 0] += np.arange(count) * 2 * width
+    return placements
+
+
+def _as_point(point) -> Tuple[float, float, float]:
+    """Read an {x, y, z} dict or [x, y, z] sequence as a 3-tuple (missing or unreadable values are 0)"""
+    if isinstance(point, dict):
+        values = [point.get("x"), point.get("y"), point.get("z")]
+    elif isinstance(point, (list, tuple)):
+        values = list(point)[:3]
+    else:
+        values = []
+    coords = [_as_coordinate(value) for value in values]
+    return tuple(coords + [0.0] * (3 - len(coords)))
 
-    return vertices, faces
+
+def _as_coordinate(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
 
 
 # ============================================================================
-# BUILDING/ARCHITECTURE GEOMETRY
+# PRIMITIVE TEMPLATES
 # ============================================================================
 
+# Unit meshes, built once at import and shared by every object of that shape.
+# Each entry is (vertices, faces) spanning [0, 1] on every scaled axis.
+TEMPLATES: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+    "box": _as_arrays(
+        [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1)],  # Bottom  # Top
+        [
+            [0, 1, 2],
+            [0, 2, 3],  # Bottom
+            [4, 7, 6],
+            [4, 6, 5],  # Top
+            [0, 4, 5],
+            [0, 5, 1],  # Front
+            [2, 6, 7],
+            [2, 7, 3],  # Back
+            [0, 3, 7],
+            [0, 7, 4],  # Left
+            [1, 5, 6],
+            [1, 6, 2],  # Right
+        ],
+    ),
+    "plane": _as_arrays([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)], [[0, 1, 2], [0, 2, 3]]),
+    # Pitched roof: ridge runs along the y axis at mid-width
+    "gable": _as_arrays(
+        [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (0.5, 0, 1), (0.5, 1, 1)],
+        [[0, 1, 4], [1, 2, 5], [1, 5, 4], [2, 3, 5], [3, 0, 4], [3, 4, 5], [0, 3, 2], [0, 2, 1]],
+    ),
+    # Simplified cylinder: unit radius on x/y, unit width on z
+    "disc": _as_arrays(
+        [(0, 0, 0), (1, 0, 0), (0, 1, 0), (-1, 0, 0), (0, -1, 0), (0, 0, 1), (1, 0, 1), (0, 1, 1), (-1, 0, 1), (0, -1, 1)],
+        [
+            [0, 1, 2],
+            [0, 2, 3],
+            [0, 3, 4],
+            [0, 4, 1],
+            [5, 7, 6],
+            [5, 8, 7],
+            [5, 9, 8],
+            [5, 6, 9],
+            [1, 6, 7],
+            [1, 7, 2],
+            [2, 7, 8],
+            [2, 8, 3],
+            [3, 8, 9],
+            [3, 9, 4],
+            [4, 9, 6],
+            [4, 6, 1],
+        ],
+    ),
+}
 
-def create_wall_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 3.0)
-    h = dims.get("height", 2.7)
-    t = dims.get("thickness", 0.2)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, t, 0), (0, t, 0), (0, 0, h), (w, 0, h), (w, t, h), (0, t, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
+# Template vertices in homogeneous form, ready for the batched affine transform
+_HOMOGENEOUS_TEMPLATES = {
+    name: np.hstack([vertices.astype(np.float64), np.ones((len(vertices), 1))]) for name, (vertices, _) in TEMPLATES.items()
+}
 
 
-def create_door_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 0.9)
-    h = dims.get("height", 2.1)
-    t = dims.get("thickness", 0.05)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, t, 0), (0, t, 0), (0, 0, h), (w, 0, h), (w, t, h), (0, t, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
+@dataclass(frozen=True)
+class Primitive:
+    """A unit template plus how to read its x/y/z extents from spec dimensions
 
+    Each extent is ``(dimension_key, default)``; a ``None`` key means a fixed size.
+    ``top`` places the mesh so its upper face sits at that dimension (e.g. a table top).
+    """
 
-def create_window_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 1.2)
-    h = dims.get("height", 1.0)
-    t = dims.get("thickness", 0.1)
-
-    # Frame geometry
-    vertices = [(0, 0, 0), (w, 0, 0), (w, t, 0), (0, t, 0), (0, 0, h), (w, 0, h), (w, t, h), (0, t, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
+    template: str
+    x: Tuple[Optional[str], float]
+    y: Tuple[Optional[str], float]
+    z: Tuple[Optional[str], float]
+    top: Optional[Tuple[str, float]] = None
 
 
-def create_roof_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 10.0)
-    l = dims.get("length", 8.0)
-    h = dims.get("height", 2.0)
+PRIMITIVES: Dict[str, Primitive] = {
+    # Kitchen objects
+    "cabinet": Primitive("box", ("width", 1.0), ("depth", 0.6), ("height", 0.9)),
+    "countertop": Primitive("box", ("width", 2.0), ("depth", 0.6), ("height", 0.05)),
+    "island": Primitive("box", ("width", 2.4), ("depth", 1.2), ("height", 0.9)),
+    "floor": Primitive("plane", ("width", 3.6), ("length", 3.0), (None, 0.0)),
+    # Building/Architecture objects
+    "wall": Primitive("box", ("width", 3.0), ("thickness", 0.2), ("height", 2.7)),
+    "door": Primitive("box", ("width", 0.9), ("thickness", 0.05), ("height", 2.1)),
+    "window": Primitive("box", ("width", 1.2), ("thickness", 0.1), ("height", 1.0)),
+    "roof": Primitive("gable", ("width", 10.0), ("length", 8.0), ("height", 2.0)),
+    "foundation": Primitive("box", ("width", 10.0), ("length", 8.0), ("height", 0.5)),
+    "column": Primitive("box", ("width", 0.3), ("depth", 0.3), ("height", 3.0)),
+    "beam": Primitive("box", ("width", 0.3), ("length", 5.0), ("height", 0.4)),
+    "slab": Primitive("box", ("width", 10.0), ("length", 8.0), ("thickness", 0.15)),
+    "balcony": Primitive("box", ("width", 3.0), ("depth", 1.5), ("height", 0.1)),
+    # Furniture/Interior objects
+    "bed": Primitive("box", ("width", 1.8), ("length", 2.0), ("height", 0.6)),
+    "sofa": Primitive("box", ("width", 2.0), ("depth", 0.9), ("height", 0.8)),
+    "table": Primitive("box", ("width", 1.5), ("length", 0.8), (None, 0.05), top=("height", 0.75)),
+    "chair": Primitive("box", ("width", 0.5), ("depth", 0.5), ("height", 0.8)),
+    "wardrobe": Primitive("box", ("width", 2.0), ("depth", 0.6), ("height", 2.2)),
+    "tv_unit": Primitive("box", ("width", 1.8), ("depth", 0.4), ("height", 0.6)),
+    "bookshelf": Primitive("box", ("width", 1.2), ("depth", 0.3), ("height", 2.0)),
+    # Automotive objects
+    "car_body": Primitive("box", ("width", 1.8), ("length", 4.5), ("height", 1.5)),
+    "wheel": Primitive("disc", ("radius", 0.3), ("radius", 0.3), ("width", 0.2)),
+    "engine": Primitive("box", ("width", 0.8), ("length", 1.0), ("height", 0.6)),
+    "chassis": Primitive("box", ("width", 1.6), ("length", 4.0), ("height", 0.2)),
+    # Electronics objects
+    "pcb": Primitive("box", ("width", 0.1), ("length", 0.08), ("thickness", 0.002)),
+    "component": Primitive("box", ("width", 0.01), ("length", 0.01), ("height", 0.005)),
+    "housing": Primitive("box", ("width", 0.15), ("length", 0.1), ("height", 0.05)),
+    "screen": Primitive("box", ("width", 0.3), ("thickness", 0.005), ("height", 0.2)),
+    # Generic fallback
+    "box": Primitive("box", ("width", 1.0), ("depth", 1.0), ("height", 1.0)),
+}
+
+# Furniture/storage subtypes that reuse another object's geometry; unknown subtypes fall back to a box
+SUBTYPE_GEOMETRY: Dict[str, Dict[str, str]] = {
+    "furniture": {
+        "bed": "bed",
+        "sofa": "sofa",
+        "table": "table",
+        "desk": "table",
+        "dresser": "wardrobe",
+        "entertainment": "tv_unit",
+        "tv_stand": "tv_unit",
+    },
+    "storage": {"closet": "wardrobe", "wardrobe": "wardrobe"},
+}
+
+
+def resolve_geometry_type(obj: Dict) -> str:
+    """Map a spec object to the primitive or procedural builder that renders it"""
+    obj_type = obj.get("type", "")
 
-    # Pitched roof
-    vertices = [(0, 0, 0), (w, 0, 0), (w, l, 0), (0, l, 0), (w / 2, 0, h), (w / 2, l, h)]
-    faces = [[0, 1, 4], [1, 2, 5], [1, 5, 4], [2, 3, 5], [3, 0, 4], [3, 4, 5], [0, 3, 2], [0, 2, 1]]
-    return vertices, faces
+    if obj_type in SUBTYPE_GEOMETRY:
+        return SUBTYPE_GEOMETRY[obj_type].get(obj.get("subtype", ""), "box")
+    if obj_type in PRIMITIVES or obj_type in PROCEDURAL_GEOMETRY:
+        return obj_type
+    return "box"
 
 
-def create_foundation_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 10.0)
-    l = dims.get("length", 8.0)
-    h = dims.get("height", 0.5)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, l, 0), (0, l, 0), (0, 0, h), (w, 0, h), (w, l, h), (0, l, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
+def expand_primitive(primitive: Primitive, dims_list: Sequence[Dict]) -> np.ndarray:
+    """Scale and place a primitive template for many objects at once
 
+    Returns a (len(dims_list), template_vertices, 3) float32 array.
+    """
+    affine = np.zeros((len(dims_list), 4, 3))
+    for row, dims in enumerate(dims_list):
+        extents = [dims.get(key, default) if key else default for key, default in (primitive.x, primitive.y, primitive.z)]
+        affine[row, 0, 0], affine[row, 1, 1], affine[row, 2, 2] = extents
+        if primitive.top:
+            top_key, top_default = primitive.top
+            affine[row, 3, 2] = dims.get(top_key, top_default) - extents[2]
 
-def create_column_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 0.3)
-    d = dims.get("depth", 0.3)
-    h = dims.get("height", 3.0)
+    # (V, 4) @ (k, 4, 3) -> (k, V, 3): one matrix multiply for the whole batch
+    return (_HOMOGENEOUS_TEMPLATES[primitive.template] @ affine).astype("<f4")
 
-    vertices = [(0, 0, 0), (w, 0, 0), (w, d, 0), (0, d, 0), (0, 0, h), (w, 0, h), (w, d, h), (0, d, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
 
+def create_object_geometry(obj: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """Create 3D geometry for any design object as (vertices, faces) arrays"""
+    geometry_type = resolve_geometry_type(obj)
+    dimensions = obj.get("dimensions", {})
+
+    if geometry_type in PRIMITIVES:
+        primitive = PRIMITIVES[geometry_type]
+        return expand_primitive(primitive, [dimensions])[0], TEMPLATES[primitive.template][1]
 
-def create_beam_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 0.3)
-    l = dims.get("length", 5.0)
-    h = dims.get("height", 0.4)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, l, 0), (0, l, 0), (0, 0, h), (w, 0, h), (w, l, h), (0, l, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
+    return _as_arrays(*PROCEDURAL_GEOMETRY[geometry_type](dimensions))
 
 
-def create_slab_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 10.0)
-    l = dims.get("length", 8.0)
-    h = dims.get("thickness", 0.15)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, l, 0), (0, l, 0), (0, 0, h), (w, 0, h), (w, l, h), (0, l, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
+# ============================================================================
+# PROCEDURAL GEOMETRY
+# ============================================================================
 
 
 def create_staircase_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
@@ -492,414 +559,6 @@ def create_staircase_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, floa
     return vertices, faces
 
 
-def create_balcony_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 3.0)
-    d = dims.get("depth", 1.5)
-    h = dims.get("height", 0.1)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, d, 0), (0, d, 0), (0, 0, h), (w, 0, h), (w, d, h), (0, d, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
-
-
-# ============================================================================
-# FURNITURE/INTERIOR GEOMETRY
-# ============================================================================
-
-
-def create_bed_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 1.8)
-    l = dims.get("length", 2.0)
-    h = dims.get("height", 0.6)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, l, 0), (0, l, 0), (0, 0, h), (w, 0, h), (w, l, h), (0, l, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
-
-
-def create_sofa_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 2.0)
-    d = dims.get("depth", 0.9)
-    h = dims.get("height", 0.8)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, d, 0), (0, d, 0), (0, 0, h), (w, 0, h), (w, d, h), (0, d, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
-
-
-def create_table_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 1.5)
-    l = dims.get("length", 0.8)
-    h = dims.get("height", 0.75)
-
-    # Table top + legs
-    vertices = [
-        (0, 0, h - 0.05),
-        (w, 0, h - 0.05),
-        (w, l, h - 0.05),
-        (0, l, h - 0.05),
-        (0, 0, h),
-        (w, 0, h),
-        (w, l, h),
-        (0, l, h),
-    ]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
-
-
-def create_chair_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 0.5)
-    d = dims.get("depth", 0.5)
-    h = dims.get("height", 0.8)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, d, 0), (0, d, 0), (0, 0, h), (w, 0, h), (w, d, h), (0, d, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
-
-
-def create_wardrobe_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 2.0)
-    d = dims.get("depth", 0.6)
-    h = dims.get("height", 2.2)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, d, 0), (0, d, 0), (0, 0, h), (w, 0, h), (w, d, h), (0, d, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
-
-
-def create_tv_unit_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 1.8)
-    d = dims.get("depth", 0.4)
-    h = dims.get("height", 0.6)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, d, 0), (0, d, 0), (0, 0, h), (w, 0, h), (w, d, h), (0, d, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
-
-
-def create_bookshelf_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 1.2)
-    d = dims.get("depth", 0.3)
-    h = dims.get("height", 2.0)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, d, 0), (0, d, 0), (0, 0, h), (w, 0, h), (w, d, h), (0, d, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
-
-
-# ============================================================================
-# AUTOMOTIVE GEOMETRY
-# ============================================================================
-
-
-def create_car_body_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 1.8)
-    l = dims.get("length", 4.5)
-    h = dims.get("height", 1.5)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, l, 0), (0, l, 0), (0, 0, h), (w, 0, h), (w, l, h), (0, l, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
-
-
-def create_wheel_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    r = dims.get("radius", 0.3)
-    w = dims.get("width", 0.2)
-
-    # Simplified cylinder
-    vertices = [
-        (0, 0, 0),
-        (r, 0, 0),
-        (0, r, 0),
-        (-r, 0, 0),
-        (0, -r, 0),
-        (0, 0, w),
-        (r, 0, w),
-        (0, r, w),
-        (-r, 0, w),
-        (0, -r, w),
-    ]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [0, 3, 4],
-        [0, 4, 1],
-        [5, 7, 6],
-        [5, 8, 7],
-        [5, 9, 8],
-        [5, 6, 9],
-        [1, 6, 7],
-        [1, 7, 2],
-        [2, 7, 8],
-        [2, 8, 3],
-        [3, 8, 9],
-        [3, 9, 4],
-        [4, 9, 6],
-        [4, 6, 1],
-    ]
-    return vertices, faces
-
-
-def create_engine_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 0.8)
-    l = dims.get("length", 1.0)
-    h = dims.get("height", 0.6)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, l, 0), (0, l, 0), (0, 0, h), (w, 0, h), (w, l, h), (0, l, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
-
-
-def create_chassis_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 1.6)
-    l = dims.get("length", 4.0)
-    h = dims.get("height", 0.2)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, l, 0), (0, l, 0), (0, 0, h), (w, 0, h), (w, l, h), (0, l, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
-
-
-# ============================================================================
-# ELECTRONICS GEOMETRY
-# ============================================================================
-
-
-def create_pcb_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 0.1)
-    l = dims.get("length", 0.08)
-    h = dims.get("thickness", 0.002)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, l, 0), (0, l, 0), (0, 0, h), (w, 0, h), (w, l, h), (0, l, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
-
-
-def create_component_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 0.01)
-    l = dims.get("length", 0.01)
-    h = dims.get("height", 0.005)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, l, 0), (0, l, 0), (0, 0, h), (w, 0, h), (w, l, h), (0, l, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
-
-
-def create_housing_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 0.15)
-    l = dims.get("length", 0.1)
-    h = dims.get("height", 0.05)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, l, 0), (0, l, 0), (0, 0, h), (w, 0, h), (w, l, h), (0, l, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
-
-
-def create_screen_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    w = dims.get("width", 0.3)
-    h = dims.get("height", 0.2)
-    t = dims.get("thickness", 0.005)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, t, 0), (0, t, 0), (0, 0, h), (w, 0, h), (w, t, h), (0, t, h)]
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
-    return vertices, faces
-
-
 def create_room_geometry(dims: Dict, with_bed: bool = False, with_furniture: bool = False, with_cabinets: bool = False, with_fixtures: bool = False) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
     """Create room geometry (floor + walls)"""
     w = dims.get("width", 4.0)
@@ -993,34 +652,31 @@ def create_structure_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, floa
     return vertices, faces
 
 
-def create_box_geometry(dims: Dict) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    """Create generic box geometry"""
-    w = dims.get("width", 1.0)
-    d = dims.get("depth", 1.0)
-    h = dims.get("height", 1.0)
-
-    vertices = [(0, 0, 0), (w, 0, 0), (w, d, 0), (0, d, 0), (0, 0, h), (w, 0, h), (w, d, h), (0, d, h)]
-
-    faces = [
-        [0, 1, 2],
-        [0, 2, 3],
-        [4, 7, 6],
-        [4, 6, 5],
-        [0, 4, 5],
-        [0, 5, 1],
-        [2, 6, 7],
-        [2, 7, 3],
-        [0, 3, 7],
-        [0, 7, 4],
-        [1, 5, 6],
-        [1, 6, 2],
-    ]
+# Composite objects whose vertex count depends on their dimensions
+PROCEDURAL_GEOMETRY = {
+    "staircase": create_staircase_geometry,
+    "room": create_room_geometry,
+    "structure": create_structure_geometry,
+}
 
-    return vertices, faces
+
+def create_glb_file(json_data: bytes, *binary_chunks) -> bytes:
+    """Create GLB file from JSON and binary data
+
+    ``binary_chunks`` may be any number of bytes-like objects (e.g. NumPy array
+    buffers); they are written back to back into the BIN chunk in a single join.
+    """
+    binary_length = sum(memoryview(chunk).nbytes for chunk in binary_chunks)
+    return b"".join(
+        [glb_preamble(json_data, binary_length), *binary_chunks, b"\x00" * (-binary_length % 4)]
+    )
 
 
-def create_glb_file(json_data: bytes, binary_data: bytes) -> bytes:
-    """Create GLB file from JSON and binary data"""
+def glb_preamble(json_data: bytes, binary_length: int) -> bytes:
+    """GLB header, padded JSON chunk and BIN chunk header for a BIN payload of ``binary_length`` bytes
+
+    The BIN payload itself (plus its zero padding) follows the returned bytes.
+    """
 
     # GLB header
     magic = b"glTF"
@@ -1029,31 +685,27 @@ def create_glb_file(json_data: bytes, binary_data: bytes) -> bytes:
     # JSON chunk
     json_length = len(json_data)
     json_padding = (4 - (json_length % 4)) % 4
-    json_data += b" " * json_padding
-    json_chunk_length = struct.pack("<I", len(json_data))
+    json_chunk_length = struct.pack("<I", json_length + json_padding)
     json_chunk_type = b"JSON"
 
     # Binary chunk
-    binary_length = len(binary_data)
     binary_padding = (4 - (binary_length % 4)) % 4
-    binary_data += b"\x00" * binary_padding
-    binary_chunk_length = struct.pack("<I", len(binary_data))
+    binary_chunk_length = struct.pack("<I", binary_length + binary_padding)
     binary_chunk_type = b"BIN\x00"
 
     # Total length
-    total_length = struct.pack("<I", 12 + 8 + len(json_data) + 8 + len(binary_data))
-
-    # Assemble GLB
-    glb = (
-        magic
-        + version
-        + total_length
-        + json_chunk_length
-        + json_chunk_type
-        + json_data
-        + binary_chunk_length
-        + binary_chunk_type
-        + binary_data
+    total_length = struct.pack("<I", 12 + 8 + json_length + json_padding + 8 + binary_length + binary_padding)
+
+    return b"".join(
+        [
+            magic,
+            version,
+            total_length,
+            json_chunk_length,
+            json_chunk_type,
+            json_data,
+            b" " * json_padding,
+            binary_chunk_length,
+            binary_chunk_type,
+        ]
     )
-
-    return glb
@@ -0,0 +1,147 @@
+"""
+Job Store
+Swappable persistence for background jobs: in-memory, or any SQLAlchemy URL (SQLite / Postgres)
+"""
+import copy
+import json
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, Text, create_engine, select
+
+
+# Jobs in these states are still owned by the process that submitted them
+UNFINISHED_STATUSES = ("queued", "running")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobStore(ABC):
+    """Interface: jobs are plain dicts keyed by ``job_id``"""
+
+    @abstractmethod
+    def create(self, job: Dict) -> Dict:
+        """Insert a new job and return it"""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Return the job, or None if it does not exist"""
+
+    @abstractmethod
+    def update(self, job_id: str, **fields) -> Optional[Dict]:
+        """Merge ``fields`` into the job and return the new state (None if it does not exist)"""
+
+    @abstractmethod
+    def fail_unfinished(self, error: str) -> int:
+        """Mark every queued or running job as failed with ``error``; returns how many were marked"""
+
+
+class InMemoryJobStore(JobStore):
+    """Process-local store (jobs are lost on restart)"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: Dict) -> Dict:
+        with self._lock:
+            self._jobs[job["job_id"]] = copy.deepcopy(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return copy.deepcopy(job) if job else None
+
+    def update(self, job_id: str, **fields) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job.update(fields, updated_at=_now().isoformat())
+            return copy.deepcopy(job)
+
+    def fail_unfinished(self, error: str) -> int:
+        with self._lock:
+            unfinished = [job for job in self._jobs.values() if job["status"] in UNFINISHED_STATUSES]
+            for job in unfinished:
+                job.update(status="failed", error=error, updated_at=_now().isoformat())
+        return len(unfinished)
+
+
+class SQLJobStore(JobStore):
+    """Durable store in a single ``generation_jobs`` table; works with SQLite and Postgres URLs"""
+
+    def __init__(self, url: str):
+        connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+        self.engine = create_engine(url, connect_args=connect_args, pool_pre_ping=True)
+        metadata = MetaData()
+        self.table = Table(
+            "generation_jobs",
+            metadata,
+            Column("job_id", String, primary_key=True),
+            Column("status", String(20), index=True),
+            Column("data", Text, nullable=False),
+            Column("updated_at", DateTime(timezone=True)),
+        )
+        metadata.create_all(self.engine)
+        self._lock = threading.Lock()
+
+    def create(self, job: Dict) -> Dict:
+        with self.engine.begin() as conn:
+            conn.execute(
+                self.table.insert().values(
+                    job_id=job["job_id"], status=job["status"], data=json.dumps(job, default=str), updated_at=_now()
+                )
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self.engine.connect() as conn:
+            row = conn.execute(select(self.table.c.data).where(self.table.c.job_id == job_id)).first()
+        return json.loads(row[0]) if row else None
+
+    def update(self, job_id: str, **fields) -> Optional[Dict]:
+        # Read-modify-write of the JSON payload; serialised per process
+        with self._lock, self.engine.begin() as conn:
+            row = conn.execute(select(self.table.c.data).where(self.table.c.job_id == job_id)).first()
+            if row is None:
+                return None
+            now = _now()
+            job = json.loads(row[0])
+            job.update(fields, updated_at=now.isoformat())
+            conn.execute(
+                self.table.update()
+                .where(self.table.c.job_id == job_id)
+                .values(status=job["status"], data=json.dumps(job, default=str), updated_at=now)
+            )
+        return job
+
+    def fail_unfinished(self, error: str) -> int:
+        with self._lock, self.engine.begin() as conn:
+            rows = conn.execute(
+                select(self.table.c.job_id, self.table.c.data).where(self.table.c.status.in_(UNFINISHED_STATUSES))
+            ).all()
+            now = _now()
+            for job_id, data in rows:
+                job = json.loads(data)
+                job.update(status="failed", error=error, updated_at=now.isoformat())
+                conn.execute(
+                    self.table.update()
+                    .where(self.table.c.job_id == job_id)
+                    .values(status="failed", data=json.dumps(job, default=str), updated_at=now)
+                )
+        return len(rows)
+
+
+def create_job_store(backend: str, database_url: str) -> JobStore:
+    """Build the store named by JOB_STORE: ``memory``, ``database`` (DATABASE_URL) or a SQLAlchemy URL"""
+    if backend == "memory":
+        return InMemoryJobStore()
+    if backend == "database":
+        return SQLJobStore(database_url)
+    return SQLJobStore(backend)
@@ -0,0 +1,196 @@
+"""
+Background Jobs
+Runs slow work (AI 3D generation) outside the request; exposes status, SSE events and webhooks
+"""
+import asyncio
+import ipaddress
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+from urllib.parse import urlsplit
+
+from app.config import settings
+from app.job_store import JobStore, create_job_store
+
+logger = logging.getLogger(__name__)
+
+# queued -> running -> succeeded | failed
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+# Host names that always point back at this machine or its private network
+INTERNAL_HOST_SUFFIXES = ("localhost", ".localhost", ".local", ".internal")
+
+_store: Optional[JobStore] = None
+_tasks: Set[asyncio.Task] = set()
+_listeners: Dict[str, Set[asyncio.Queue]] = {}
+
+
+def get_job_store() -> JobStore:
+    """Job store selected by JOB_STORE (created on first use)"""
+    global _store
+    if _store is None:
+        _store = create_job_store(settings.JOB_STORE, settings.DATABASE_URL)
+    return _store
+
+
+def set_job_store(store: JobStore):
+    """Swap the job store (e.g. an in-memory store for tests)"""
+    global _store
+    _store = store
+
+
+def recover_interrupted_jobs() -> int:
+    """Fail jobs left queued or running by a previous process; their tasks died with it
+
+    Assumes a single API process runs the jobs of a store, as jobs run as in-process tasks.
+    """
+    count = get_job_store().fail_unfinished("Interrupted by a server restart")
+    if count:
+        logger.warning(f"Marked {count} interrupted job(s) as failed")
+    return count
+
+
+async def submit_job(
+    kind: str,
+    runner: Callable[[str], Awaitable[Dict]],
+    webhook_url: Optional[str] = None,
+    owner: Optional[str] = None,
+    **payload,
+) -> Dict:
+    """Record a queued job and run ``runner(job_id)`` in the background; its return value becomes ``result``
+
+    ``owner`` is the user allowed to read the job through the jobs API.
+    """
+    from app.execution import run_io
+
+    if webhook_url:
+        check_webhook_url(webhook_url)
+
+    now = datetime.now(timezone.utc).isoformat()
+    job = {
+        "job_id": f"job_{uuid.uuid4().hex[:12]}",
+        "kind": kind,
+        "owner": owner,
+        "status": "queued",
+        "result": None,
+        "error": None,
+        "webhook_url": webhook_url,
+        "created_at": now,
+        "updated_at": now,
+        **payload,
+    }
+    await run_io(get_job_store().create, job)
+
+    task = asyncio.create_task(_run_job(job["job_id"], runner, webhook_url))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job
+
+
+async def get_job(job_id: str) -> Optional[Dict]:
+    from app.execution import run_io
+
+    return await run_io(get_job_store().get, job_id)
+
+
+async def update_job(job_id: str, **fields) -> Optional[Dict]:
+    """Persist job fields and push the new state to SSE listeners"""
+    from app.execution import run_io
+
+    job = await run_io(get_job_store().update, job_id, **fields)
+    if job:
+        for queue in _listeners.get(job_id, ()):
+            queue.put_nowait(job)
+    return job
+
+
+async def job_events(job_id: str) -> AsyncIterator[Dict]:
+    """Yield the job's current state, then every update until it finishes"""
+    queue: asyncio.Queue = asyncio.Queue()
+    _listeners.setdefault(job_id, set()).add(queue)
+    try:
+        job = await get_job(job_id)
+        while job:
+            yield job
+            if job["status"] in TERMINAL_STATUSES:
+                return
+            job = await queue.get()
+    finally:
+        _listeners[job_id].discard(queue)
+        if not _listeners[job_id]:
+            del _listeners[job_id]
+
+
+async def _run_job(job_id: str, runner: Callable[[str], Awaitable[Dict]], webhook_url: Optional[str]):
+    await update_job(job_id, status="running")
+    try:
+        result = await runner(job_id)
+        job = await update_job(job_id, status="succeeded", result=result)
+    except Exception as e:
+        logger.warning(f"Job {job_id} failed: {e}")
+        job = await update_job(job_id, status="failed", error=str(e))
+
+    if webhook_url and job:
+        await _notify_webhook(webhook_url, job)
+
+
+def check_webhook_url(webhook_url: str) -> str:
+    """Reject webhook URLs that are not http(s) or that name an internal host or non-public IP
+
+    Host names are only resolved at delivery time (see ``_check_webhook_host``).
+    """
+    parts = urlsplit(webhook_url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("Webhook URL must be an absolute http or https URL")
+
+    host = parts.hostname.rstrip(".").lower()
+    if host.endswith(INTERNAL_HOST_SUFFIXES):
+        raise ValueError(f"Webhook host '{host}' is not allowed")
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return webhook_url
+    if not address.is_global:
+        raise ValueError(f"Webhook address {address} is not public")
+    return webhook_url
+
+
+async def _check_webhook_host(webhook_url: str):
+    """Resolve the webhook host and refuse delivery if any address is private, loopback or link-local"""
+    check_webhook_url(webhook_url)
+    parts = urlsplit(webhook_url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    infos = await asyncio.get_running_loop().getaddrinfo(parts.hostname, port)
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if not address.is_global:
+            raise ValueError(f"Webhook host '{parts.hostname}' resolves to non-public address {address}")
+
+
+async def _notify_webhook(webhook_url: str, job: Dict, attempts: int = 3):
+    """POST the finished job to the client's webhook, retrying with backoff
+
+    Only public addresses are contacted and redirects are not followed.
+    """
+    import httpx
+
+    payload = {key: value for key, value in job.items() if key not in ("webhook_url", "owner")}
+    delay = 1.0
+    async with httpx.AsyncClient(timeout=10.0, follow_redirects=False) as client:
+        for attempt in range(1, attempts + 1):
+            try:
+                await _check_webhook_host(webhook_url)
+                response = await client.post(webhook_url, json=payload)
+                if response.status_code < 400:
+                    logger.info(f"Webhook delivered for {job['job_id']}")
+                    return
+                logger.warning(f"Webhook for {job['job_id']} returned HTTP {response.status_code}")
+            except ValueError as e:
+                logger.warning(f"Webhook for {job['job_id']} refused: {e}")
+                return
+            except Exception as e:
+                logger.warning(f"Webhook attempt {attempt} for {job['job_id']} failed: {e}")
+            if attempt < attempts:
+                await asyncio.sleep(delay)
+                delay *= 2
@@ -12,6 +12,7 @@ from app.api import (
     generate,
     geometry_generator,
     health,
+    jobs,
     video,
 )
 
@@ -112,6 +113,22 @@ async def startup_event():
     print("=" * 70 + "\n")
     logger.info("🚀 Design Engine API Server Started Successfully")
 
+    # Background jobs run as in-process tasks, so any still queued/running were cut off by the restart
+    from app.execution import run_io
+    from app.jobs import recover_interrupted_jobs
+
+    try:
+        await run_io(recover_interrupted_jobs)
+    except Exception as e:
+        logger.warning(f"Job recovery skipped: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    from app.execution import shutdown_pools
+
+    shutdown_pools()
+
 
 # Global exception handler for consistent error responses
 @app.exception_handler(HTTPException)
@@ -244,6 +261,11 @@ app.include_router(
     generate.router, prefix="/api/v1", tags=["🎨 Design Generation"], dependencies=[Depends(get_current_user)]
 )
 
+# 2b. Background job status for slow 3D generation
+app.include_router(
+    jobs.router, prefix="/api/v1", tags=["⏳ Background Jobs"], dependencies=[Depends(get_current_user)]
+)
+
 # 3. 3D Geometry Generation (PUBLIC - visible in docs)
 app.include_router(geometry_generator.router, dependencies=[Depends(get_current_user)])
 
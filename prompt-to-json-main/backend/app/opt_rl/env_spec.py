@@ -1,21 +1,84 @@
 import json
+import os
+from collections import OrderedDict
 
 import gymnasium as gym
 import numpy as np
 import torch
-from app.rlhf.reward_model import SimpleRewardModel, hash_tokenize
+from app.rlhf.reward_model import SimpleRewardModel
+from app.rlhf.tokenizer import HASH_V1_MD5, HashTokenizer, get_tokenizer
+from stable_baselines3.common.vec_env import VecEnvWrapper
+
+REWARD_CACHE_SIZE = int(os.getenv("PPO_REWARD_CACHE_SIZE", "100000"))
+
+
+def load_reward_model(rm_ckpt="models_ckpt/rm.pt", device="cpu") -> SimpleRewardModel:
+    rm = SimpleRewardModel()
+    rm.load_state_dict(torch.load(rm_ckpt, map_location=device))
+    rm.to(device)
+    rm.eval()
+    return rm
+
+
+def load_reward_tokenizer(rm_ckpt="models_ckpt/rm.pt") -> HashTokenizer:
+    """
+    Tokenizer of a reward model checkpoint without building the model: only the
+    hash version and vocab size are read (the tensors are memory-mapped, not loaded).
+    """
+    state = torch.load(rm_ckpt, map_location="cpu", mmap=True, weights_only=True)
+    version = int(state["hash_version"]) if "hash_version" in state else HASH_V1_MD5
+    return get_tokenizer(state["emb.weight"].shape[0], 512, version)
+
+
+class RewardScorer:
+    """Reward model scores for serialized specs: one forward pass per batch, memoized per spec state."""
+
+    def __init__(self, rm, device="cpu", cache_size=REWARD_CACHE_SIZE):
+        self.rm = rm
+        self.device = device
+        self.tokenizer = rm.tokenizer
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    @torch.no_grad()
+    def score_texts(self, texts) -> np.ndarray:
+        cache = self._cache
+        misses = list(dict.fromkeys(t for t in texts if t not in cache))
+        if misses:
+            ids, offsets = self.tokenizer.encode_batch(misses)
+            scores = self.rm.forward_bag(ids.to(self.device), offsets.to(self.device)).cpu().tolist()
+            for text, score in zip(misses, scores):
+                cache[text] = score
+        rewards = np.empty(len(texts), dtype=np.float32)
+        for i, text in enumerate(texts):
+            rewards[i] = cache[text]
+            cache.move_to_end(text)
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return rewards
 
 
 class SpecEditEnv(gym.Env):
+    """
+    Edits materials of a base spec; the reward is the reward model's score of the
+    edited spec. With ``score_rewards=False`` the env returns a zero reward and the
+    serialized spec in ``info["spec_text"]`` for BatchedRewardVecEnv to score.
+    """
+
     metadata = {"render_modes": []}
 
-    def __init__(self, base_spec, rm_ckpt="models_ckpt/rm.pt", device="cpu"):
+    def __init__(self, base_spec, rm_ckpt="models_ckpt/rm.pt", device="cpu", score_rewards=True):
         super().__init__()
         self.device = device
-        self.rm = SimpleRewardModel()
-        self.rm.load_state_dict(torch.load(rm_ckpt, map_location=device))
-        self.rm.to(device)
-        self.rm.eval()
+        if score_rewards:
+            self.rm = load_reward_model(rm_ckpt, device)
+            self.tokenizer = self.rm.tokenizer
+            self.scorer = RewardScorer(self.rm, device)
+        else:
+            # Rewards are scored by BatchedRewardVecEnv; only the observation tokenizer is needed
+            self.rm = None
+            self.tokenizer = load_reward_tokenizer(rm_ckpt)
+            self.scorer = None
         self.base = base_spec
         self.spec = None
 
@@ -29,16 +92,14 @@ class SpecEditEnv(gym.Env):
 
     def _embed(self, spec_json):
         txt = json.dumps(spec_json, sort_keys=True)
-        ids = hash_tokenize(txt, max_len=512).cpu().numpy()
+        ids = self.tokenizer.ids(txt)
         vec = np.zeros(512, dtype=np.float32)
         L = min(len(ids), 512)
         vec[:L] = (np.array(ids[:L]) % 997) / 997.0
         return vec
 
-    @torch.no_grad()
     def _rm_score(self, spec_json):
-        ids = hash_tokenize(json.dumps(spec_json)).to(self.device).unsqueeze(0)
-        return float(self.rm(ids).item())
+        return float(self.scorer.score_texts([json.dumps(spec_json)])[0])
 
     def reset(self, seed=None, options=None):
         self.spec = json.loads(json.dumps(self.base))
@@ -50,6 +111,24 @@ class SpecEditEnv(gym.Env):
             if obj.get("id") == obj_id:
                 obj[field] = value
                 break
-        r = self._rm_score(self.spec)
         terminated, truncated = False, False
+        if self.scorer is None:
+            return self._embed(self.spec), 0.0, terminated, truncated, {"spec_text": json.dumps(self.spec)}
+        r = self._rm_score(self.spec)
         return self._embed(self.spec), r, terminated, truncated, {}
+
+
+class BatchedRewardVecEnv(VecEnvWrapper):
+    """Scores the specs of all sub-envs (built with score_rewards=False) in one reward model forward pass."""
+
+    def __init__(self, venv, scorer: RewardScorer):
+        super().__init__(venv)
+        self.scorer = scorer
+
+    def reset(self):
+        return self.venv.reset()
+
+    def step_wait(self):
+        obs, _, dones, infos = self.venv.step_wait()
+        rewards = self.scorer.score_texts([info["spec_text"] for info in infos])
+        return obs, rewards, dones, infos
@@ -2,9 +2,15 @@ import json
 import os
 
 import torch
-from app.opt_rl.env_spec import SpecEditEnv
+from app.opt_rl.env_spec import BatchedRewardVecEnv, RewardScorer, SpecEditEnv, load_reward_model
 from stable_baselines3 import PPO
 from stable_baselines3.common.env_util import make_vec_env
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+
+# "dummy" steps all envs in this process, "subproc" runs one worker process per env
+PPO_VEC_ENVS = ("dummy", "subproc")
+PPO_VEC_ENV = os.getenv("PPO_VEC_ENV", "dummy")
+PPO_WORKERS = int(os.getenv("PPO_WORKERS", "0")) or os.cpu_count() or 1
 
 
 def load_base_spec(path="seed_spec.json"):
@@ -16,16 +22,43 @@ def load_base_spec(path="seed_spec.json"):
     }
 
 
-def train_opt_ppo(steps=200_000, n_envs=4, **kwargs):
+def make_spec_env(base, n_envs=4, vec_env=PPO_VEC_ENV, rm_ckpt="models_ckpt/rm.pt", device="cpu"):
+    """
+    Vectorized SpecEditEnv whose rewards are scored for all envs in one
+    reward model forward pass (memoized per spec state) in this process.
+    """
+    if vec_env not in PPO_VEC_ENVS:
+        raise ValueError(f"vec_env must be one of {PPO_VEC_ENVS}, got {vec_env!r}")
+
+    def _make():
+        return SpecEditEnv(base_spec=base, rm_ckpt=rm_ckpt, device=device, score_rewards=False)
+
+    if vec_env == "subproc":
+        venv = make_vec_env(_make, n_envs=n_envs, vec_env_cls=SubprocVecEnv)
+    else:
+        venv = make_vec_env(_make, n_envs=n_envs, vec_env_cls=DummyVecEnv)
+    return BatchedRewardVecEnv(venv, RewardScorer(load_reward_model(rm_ckpt, device), device))
+
+
+def clamp_workers(workers) -> int:
+    """Worker process count limited to 1..cpu_count."""
+    return min(max(1, int(workers)), os.cpu_count() or 1)
+
+
+def train_opt_ppo(steps=200_000, n_envs=4, vec_env=PPO_VEC_ENV, workers=None, **kwargs):
+    """
+    Train the spec-edit PPO policy. With vec_env="subproc" the envs step in
+    ``workers`` processes (default PPO_WORKERS, i.e. one per CPU core), clamped
+    to 1..cpu_count.
+    """
     base = load_base_spec()
 
     # Use CPU for PPO as recommended for MLP policies
     device = "cpu"
 
-    def _make():
-        return SpecEditEnv(base_spec=base, device=device)
-
-    env = make_vec_env(_make, n_envs=n_envs)
+    if vec_env == "subproc":
+        n_envs = clamp_workers(workers or PPO_WORKERS)
+    env = make_spec_env(base, n_envs=n_envs, vec_env=vec_env, device=device)
 
     # Extract training parameters from kwargs
     learning_rate = kwargs.get("learning_rate", 3e-4)
@@ -55,6 +88,7 @@ def train_opt_ppo(steps=200_000, n_envs=4, **kwargs):
     )
 
     model.learn(total_timesteps=steps)
+    env.close()
     os.makedirs("models_ckpt/opt_ppo", exist_ok=True)
     out = "models_ckpt/opt_ppo/policy.zip"
     model.save(out)
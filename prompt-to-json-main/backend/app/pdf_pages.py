@@ -0,0 +1,258 @@
+# app/pdf_pages.py
+"""
+Page-sharded PDF text extraction shared by the parsing agent, PDF→JSON
+conversion and the ingestion flows.
+
+Pages are split into contiguous shards extracted on a process pool and yielded
+in page order as soon as each shard finishes, so clause detection can start
+before the whole document is read. Page text is cached on disk keyed by the
+SHA-256 of the file and the page number: re-ingesting an unchanged PDF reads
+the cache instead of the PDF.
+
+Environment variables:
+- PDF_TEXT_CACHE_DIR : page text cache folder (default: data/pdf_text_cache, "" disables)
+- PDF_EXTRACT_WORKERS : extraction processes (default: CPU count, 1 = in-process)
+"""
+import hashlib
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+PDF_TEXT_CACHE_DIR = os.getenv("PDF_TEXT_CACHE_DIR", "data/pdf_text_cache")
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "0")) or (os.cpu_count() or 1)
+
+# Documents shorter than this are extracted in-process (pool start-up costs more)
+MIN_PAGES_FOR_POOL = 16
+# Bump when extraction output changes so stale cached pages are not served
+EXTRACTOR_VERSION = 1
+
+DEFAULT_ENGINES = ("fitz", "pdfplumber")
+
+
+# ---------- Engines: (page_count, extract pages [start, stop)) ----------
+def _fitz_count(path: str) -> int:
+    import fitz  # PyMuPDF
+
+    with fitz.open(path) as doc:
+        return len(doc)
+
+
+def _fitz_extract(path: str, start: int, stop: int) -> List[str]:
+    import fitz  # PyMuPDF
+
+    with fitz.open(path) as doc:
+        return [doc.load_page(pno).get_text("text") or "" for pno in range(start, stop)]
+
+
+def _pdfplumber_count(path: str) -> int:
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def _pdfplumber_extract(path: str, start: int, stop: int) -> List[str]:
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        return [pdf.pages[pno].extract_text() or "" for pno in range(start, stop)]
+
+
+def _pypdf2_count(path: str) -> int:
+    import PyPDF2
+
+    with open(path, "rb") as f:
+        return len(PyPDF2.PdfReader(f).pages)
+
+
+def _pypdf2_extract(path: str, start: int, stop: int) -> List[str]:
+    import PyPDF2
+
+    with open(path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        return [reader.pages[pno].extract_text() or "" for pno in range(start, stop)]
+
+
+ENGINES: Dict[str, Tuple[Callable[[str], int], Callable[[str, int, int], List[str]]]] = {
+    "fitz": (_fitz_count, _fitz_extract),
+    "pdfplumber": (_pdfplumber_count, _pdfplumber_extract),
+    "pypdf2": (_pypdf2_count, _pypdf2_extract),
+}
+
+
+def page_count(path: str, engines: Sequence[str] = DEFAULT_ENGINES) -> int:
+    """Number of pages according to the first engine that can open the file."""
+    for name in engines:
+        try:
+            return ENGINES[name][0](path)
+        except Exception as e:
+            logger.debug("%s could not open %s: %s", name, path, e)
+    return 0
+
+
+def extract_shard(path: str, start: int, stop: int, engines: Sequence[str] = DEFAULT_ENGINES) -> List[str]:
+    """
+    Text of pages [start, stop) from the first engine that yields any text.
+    Runs in worker processes, so it only takes picklable arguments.
+    Raises RuntimeError when every engine fails, so the blank pages are not cached.
+    """
+    extracted = False
+    for name in engines:
+        try:
+            texts = ENGINES[name][1](path, start, stop)
+        except Exception as e:
+            logger.warning("%s extraction failed for pages %d-%d: %s", name, start + 1, stop, e)
+            continue
+        extracted = True
+        if any(t.strip() for t in texts):
+            return texts
+    if not extracted:
+        raise RuntimeError(f"no engine could extract pages {start + 1}-{stop} of {path}")
+    return [""] * (stop - start)
+
+
+# ---------- Page text cache ----------
+def file_digest(path: str) -> str:
+    """SHA-256 of the file contents."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class PageTextCache:
+    """Extracted page text on disk: <cache_dir>/<file sha256>/<engines>/<page>.txt"""
+
+    def __init__(self, cache_dir: str, digest: str, engines: Sequence[str]):
+        self.root = os.path.join(cache_dir, digest, f"v{EXTRACTOR_VERSION}-{'+'.join(engines)}")
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _read(self, name: str) -> Optional[str]:
+        try:
+            with open(self._path(name), "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write(self, name: str, text: str):
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            tmp_path = f"{self._path(name)}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, self._path(name))
+        except OSError as e:
+            logger.warning("PDF text cache write failed: %s", e)
+
+    def get_page_count(self) -> Optional[int]:
+        value = self._read("pages")
+        return int(value) if value and value.isdigit() else None
+
+    def set_page_count(self, count: int):
+        self._write("pages", str(count))
+
+    def get(self, page: int) -> Optional[str]:
+        return self._read(f"{page:05d}.txt")
+
+    def put(self, page: int, text: str):
+        self._write(f"{page:05d}.txt", text)
+
+
+# ---------- Extraction ----------
+def _retry_shard(path: str, start: int, stop: int, engines: Sequence[str]) -> Optional[List[str]]:
+    """In-process retry of a failed shard; None if every engine fails again."""
+    try:
+        return extract_shard(path, start, stop, engines)
+    except RuntimeError as e:
+        logger.error("PDF pages %d-%d left blank: %s", start + 1, stop, e)
+        return None
+
+
+def _shards(pages: List[int], size: int) -> List[Tuple[int, int]]:
+    """Contiguous [start, stop) runs of the missing pages, at most ``size`` long."""
+    shards: List[Tuple[int, int]] = []
+    for page in pages:
+        if shards and shards[-1][1] == page and page - shards[-1][0] < size:
+            shards[-1] = (shards[-1][0], page + 1)
+        else:
+            shards.append((page, page + 1))
+    return shards
+
+
+def iter_pdf_pages(
+    pdf_path: str,
+    engines: Sequence[str] = DEFAULT_ENGINES,
+    workers: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (page_number, text) for every page in order (page numbers start at 1).
+    Cached pages are served from disk; the rest are extracted in shards on a
+    process pool and yielded as each shard completes. A shard that no engine can
+    read (or whose worker died) is retried once in-process; if it still fails
+    its pages are yielded blank and left out of the cache.
+    """
+    if not os.path.exists(pdf_path):
+        raise FileNotFoundError(pdf_path)
+
+    workers = workers or PDF_EXTRACT_WORKERS
+    cache_dir = PDF_TEXT_CACHE_DIR if cache_dir is None else cache_dir
+    cache = PageTextCache(cache_dir, file_digest(pdf_path), engines) if cache_dir else None
+
+    total = cache.get_page_count() if cache else None
+    if total is None:
+        total = page_count(pdf_path, engines)
+        if cache and total:
+            cache.set_page_count(total)
+
+    cached: Dict[int, str] = {}
+    if cache:
+        for pno in range(total):
+            text = cache.get(pno + 1)
+            if text is not None:
+                cached[pno] = text
+    missing = [pno for pno in range(total) if pno not in cached]
+    logger.info("PDF %s: %d pages, %d cached", os.path.basename(pdf_path), total, len(cached))
+
+    size = max(1, -(-len(missing) // (workers * 4))) if missing else 1
+    shards = _shards(missing, size)
+
+    def extracted() -> Iterator[Tuple[Tuple[int, int], Optional[List[str]]]]:
+        if workers > 1 and len(missing) >= MIN_PAGES_FOR_POOL:
+            try:
+                with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+                    futures = [pool.submit(extract_shard, pdf_path, start, stop, engines) for start, stop in shards]
+                    for (start, stop), future in zip(shards, futures):
+                        try:
+                            yield (start, stop), future.result()
+                        except RuntimeError:  # includes BrokenProcessPool
+                            yield (start, stop), _retry_shard(pdf_path, start, stop, engines)
+                return
+            except OSError as e:
+                # No process support (restricted sandbox); extract in-process
+                logger.warning("PDF process pool unavailable, extracting serially: %s", e)
+        for start, stop in shards:
+            try:
+                yield (start, stop), extract_shard(pdf_path, start, stop, engines)
+            except RuntimeError:
+                yield (start, stop), _retry_shard(pdf_path, start, stop, engines)
+
+    next_page = 0
+    for (start, stop), texts in extracted():
+        failed = texts is None
+        for offset, text in enumerate([""] * (stop - start) if failed else texts):
+            cached[start + offset] = text
+            if cache and not failed:
+                cache.put(start + offset + 1, text)
+        while next_page < total and next_page in cached:
+            yield next_page + 1, cached.pop(next_page)
+            next_page += 1
+    while next_page < total:
+        yield next_page + 1, cached.pop(next_page)
+        next_page += 1
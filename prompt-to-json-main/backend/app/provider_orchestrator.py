@@ -0,0 +1,180 @@
+"""
+3D Provider Orchestrator
+Races Meshy/Tripo/HuggingFace (concurrently or hedged) and upgrades local placeholder previews
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class GeometryProvider:
+    """A 3D generator: async ``generate(prompt, dimensions)`` returning GLB bytes or None"""
+
+    name: str
+    generate: Callable[[str, Dict], Awaitable[Optional[bytes]]]
+    timeout: float
+
+
+def default_providers() -> List[GeometryProvider]:
+    """Configured providers in priority order (highest fidelity first)"""
+    providers = []
+
+    if settings.MESHY_API_KEY:
+        from app.meshy_3d_generator import generate_3d_with_meshy
+
+        providers.append(GeometryProvider("meshy", generate_3d_with_meshy, timeout=600.0))
+
+    if settings.TRIPO_API_KEY:
+        from app.tripo_3d_generator import generate_3d_with_tripo
+
+        async def tripo(prompt: str, dimensions: Dict) -> Optional[bytes]:
+            return await generate_3d_with_tripo(prompt, dimensions, settings.TRIPO_API_KEY)
+
+        providers.append(GeometryProvider("tripo", tripo, timeout=120.0))
+
+    if settings.HUGGINGFACE_API_KEY:
+        from app.huggingface_3d_generator import generate_3d_with_huggingface
+
+        async def huggingface(prompt: str, dimensions: Dict) -> Optional[bytes]:
+            return await generate_3d_with_huggingface(prompt, dimensions, settings.HUGGINGFACE_API_KEY)
+
+        providers.append(GeometryProvider("huggingface", huggingface, timeout=300.0))
+
+    return providers
+
+
+def is_valid_glb(data: Optional[bytes]) -> bool:
+    """Cheap sanity check: binary glTF magic plus a full header"""
+    return bool(data) and len(data) >= 20 and data[:4] == b"glTF"
+
+
+async def _call_provider(provider: GeometryProvider, prompt: str, dimensions: Dict) -> Optional[bytes]:
+    """Run one provider with its timeout; failures are logged and reported as None"""
+    try:
+        return await asyncio.wait_for(provider.generate(prompt, dimensions), timeout=provider.timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"⚠️ {provider.name} timed out after {provider.timeout:.0f}s")
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning(f"⚠️ {provider.name} failed: {e}")
+    return None
+
+
+async def race_providers(
+    prompt: str,
+    dimensions: Dict,
+    providers: Optional[Sequence[GeometryProvider]] = None,
+    hedge_delay: Optional[float] = None,
+) -> Optional[Tuple[str, bytes]]:
+    """Return (provider name, GLB) from the first provider to produce a valid GLB
+
+    Providers start in priority order. The next one is started when the running
+    ones fail, or after ``hedge_delay`` seconds without a result (0 starts all at
+    once). Providers still running when a winner is found are cancelled.
+    """
+    queue = list(default_providers() if providers is None else providers)
+    hedge_delay = settings.PROVIDER_HEDGE_DELAY if hedge_delay is None else hedge_delay
+    running: Dict[asyncio.Task, GeometryProvider] = {}
+
+    def launch():
+        provider = queue.pop(0)
+        logger.info(f"🎨 Starting 3D provider {provider.name}")
+        running[asyncio.create_task(_call_provider(provider, prompt, dimensions))] = provider
+
+    try:
+        while queue or running:
+            if not running or (queue and hedge_delay <= 0):
+                launch()
+                continue
+
+            done, _ = await asyncio.wait(
+                running, timeout=hedge_delay if queue else None, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                # Hedge: nothing finished in time, start the next provider alongside
+                launch()
+                continue
+
+            for task in done:
+                provider = running.pop(task)
+                glb_content = task.result()
+                if is_valid_glb(glb_content):
+                    logger.info(f"✅ {provider.name} won the provider race with {len(glb_content)} bytes")
+                    return provider.name, glb_content
+                logger.warning(f"⚠️ {provider.name} returned no usable GLB")
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+    return None
+
+
+# ============================================================================
+# PREVIEW UPGRADES
+# ============================================================================
+
+
+async def start_preview_upgrade(
+    spec_id: str,
+    prompt: str,
+    dimensions: Dict,
+    providers: Sequence[GeometryProvider],
+    webhook_url: Optional[str] = None,
+    owner: Optional[str] = None,
+) -> Dict:
+    """Submit a background job that races the providers and swaps in the winning preview"""
+    from app.jobs import submit_job
+
+    async def upgrade(job_id: str) -> Dict:
+        return await _upgrade_preview(spec_id, prompt, dimensions, providers)
+
+    return await submit_job("preview_upgrade", upgrade, webhook_url=webhook_url, owner=owner, spec_id=spec_id)
+
+
+async def _upgrade_preview(
+    spec_id: str, prompt: str, dimensions: Dict, providers: Sequence[GeometryProvider]
+) -> Dict:
+    from app.execution import run_io
+    from app.spec_storage import get_spec, save_spec
+    from app.storage import upload_geometry
+
+    result = await race_providers(prompt, dimensions, providers)
+    if not result:
+        raise RuntimeError("All 3D providers failed; the local preview remains current")
+
+    provider, glb_content = result
+    preview_url = await run_io(upload_geometry, spec_id, glb_content)
+
+    stored_spec = get_spec(spec_id)
+    if stored_spec:
+        stored_spec["preview_url"] = preview_url
+        save_spec(spec_id, stored_spec)
+    await run_io(_save_preview_url, spec_id, preview_url)
+
+    logger.info(f"✅ Upgraded preview for {spec_id} using {provider}")
+    return {"spec_id": spec_id, "preview_url": preview_url, "provider": provider, "size_bytes": len(glb_content)}
+
+
+def _save_preview_url(spec_id: str, preview_url: str):
+    from app.database import SessionLocal
+    from app.models import Spec
+
+    db = SessionLocal()
+    try:
+        db_spec = db.query(Spec).filter(Spec.id == spec_id).first()
+        if db_spec:
+            db_spec.preview_url = preview_url
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Preview URL update failed for {spec_id}: {e}")
+    finally:
+        db.close()
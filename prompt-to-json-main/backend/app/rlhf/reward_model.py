@@ -1,23 +1,18 @@
-import hashlib
 import json
 
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
+from app.rlhf.tokenizer import CURRENT_HASH_VERSION, HASH_V1_MD5, get_tokenizer
 
 
 def flatten_spec(spec_json: dict) -> str:
     return json.dumps(spec_json, sort_keys=True)
 
 
-def hash_tokenize(text: str, vocab: int = 50000, max_len: int = 512):
-    toks = text.split()
-    ids = []
-    for t in toks[:max_len]:
-        h = int(hashlib.md5(t.encode()).hexdigest(), 16)
-        ids.append(h % vocab)
-    if not ids:
-        ids = [0]
-    return torch.tensor(ids, dtype=torch.long)
+def hash_tokenize(text: str, vocab: int = 50000, max_len: int = 512, version: int = HASH_V1_MD5):
+    """Token ids for one text; defaults to the original md5 buckets (use ``model.tokenizer`` for a model)."""
+    return get_tokenizer(vocab, max_len, version).encode(text)
 
 
 class SimpleRewardModel(nn.Module):
@@ -25,15 +20,39 @@ class SimpleRewardModel(nn.Module):
         super().__init__()
         self.emb = nn.Embedding(vocab, 64)
         self.head = nn.Sequential(nn.Linear(64, hidden), nn.ReLU(), nn.Linear(hidden, 1))
+        # Tokenizer hash the embeddings were trained with; saved in the state dict
+        self.register_buffer("hash_version", torch.tensor(CURRENT_HASH_VERSION))
+
+    def _load_from_state_dict(self, state_dict, prefix, *args, **kwargs):
+        # Checkpoints saved before the hash version was recorded use md5 buckets
+        state_dict.setdefault(prefix + "hash_version", torch.tensor(HASH_V1_MD5))
+        super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
+
+    @property
+    def tokenizer(self):
+        return get_tokenizer(self.emb.num_embeddings, 512, int(self.hash_version))
 
     def forward(self, ids):
         x = self.emb(ids).mean(dim=1)
         return self.head(x).squeeze(-1)
 
+    def forward_bag(self, ids, offsets):
+        """Score a batch of variable-length sequences given as flat ids plus start offsets."""
+        x = F.embedding_bag(ids, self.emb.weight, offsets, mode="mean")
+        return self.head(x).squeeze(-1)
+
 
 @torch.no_grad()
 def score_spec(model: nn.Module, prompt: str, spec_json: dict, device="cpu") -> float:
     txt = prompt + " " + flatten_spec(spec_json)
-    ids = hash_tokenize(txt).to(device).unsqueeze(0)
+    ids = model.tokenizer.encode(txt).to(device).unsqueeze(0)
     model.eval()
     return float(model(ids).item())
+
+
+@torch.no_grad()
+def score_specs(model: nn.Module, prompt: str, specs, device="cpu") -> torch.Tensor:
+    """Score many specs in one forward pass."""
+    ids, offsets = model.tokenizer.encode_batch(prompt + " " + flatten_spec(s) for s in specs)
+    model.eval()
+    return model.forward_bag(ids.to(device), offsets.to(device)).cpu()
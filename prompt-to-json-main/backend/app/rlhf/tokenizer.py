@@ -0,0 +1,85 @@
+"""
+Hashing tokenizer for the reward model.
+
+Whitespace tokens are hashed into ``vocab`` embedding buckets. Token ids are
+memoized in a bounded LRU cache, since serialized specs repeat the same keys
+and values on every call.
+
+The hash is versioned because the buckets are baked into trained embeddings:
+- HASH_V1_MD5: md5 of the token, the original scheme (checkpoints saved
+  before the version was recorded)
+- HASH_V2_CRC32: zlib.crc32, a fast stable non-cryptographic hash
+A checkpoint must be tokenized with the version it was trained with.
+"""
+
+import hashlib
+import os
+import threading
+import zlib
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+import torch
+
+HASH_V1_MD5 = 1
+HASH_V2_CRC32 = 2
+CURRENT_HASH_VERSION = HASH_V2_CRC32
+
+TOKEN_CACHE_SIZE = int(os.getenv("RM_TOKEN_CACHE_SIZE", "262144"))
+
+
+def _md5_bucket(token: str, vocab: int) -> int:
+    return int(hashlib.md5(token.encode()).hexdigest(), 16) % vocab
+
+
+def _crc32_bucket(token: str, vocab: int) -> int:
+    return zlib.crc32(token.encode()) % vocab
+
+
+HASH_FUNCTIONS = {HASH_V1_MD5: _md5_bucket, HASH_V2_CRC32: _crc32_bucket}
+
+
+class HashTokenizer:
+    """Text to bucket ids for one (vocab, max_len, hash version)."""
+
+    def __init__(self, vocab=50000, max_len=512, version=CURRENT_HASH_VERSION, cache_size=TOKEN_CACHE_SIZE):
+        if version not in HASH_FUNCTIONS:
+            raise ValueError(f"Unknown tokenizer hash version: {version}")
+        self.vocab = vocab
+        self.max_len = max_len
+        self.version = version
+        bucket = HASH_FUNCTIONS[version]
+        self.token_id = lru_cache(maxsize=cache_size)(lambda token: bucket(token, vocab))
+
+    def ids(self, text: str) -> List[int]:
+        token_id = self.token_id
+        return [token_id(t) for t in text.split()[: self.max_len]] or [0]
+
+    def encode(self, text: str) -> torch.Tensor:
+        """One text as a 1-D id tensor (``[0]`` for empty text)."""
+        return torch.tensor(self.ids(text), dtype=torch.long)
+
+    def encode_batch(self, texts: Iterable[str]) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Many texts as one flat id tensor plus the start offset of each text (EmbeddingBag layout)."""
+        flat, offsets = [], []
+        for text in texts:
+            offsets.append(len(flat))
+            flat.extend(self.ids(text))
+        return torch.tensor(flat, dtype=torch.long), torch.tensor(offsets, dtype=torch.long)
+
+    def cache_info(self):
+        return self.token_id.cache_info()
+
+
+_tokenizers = {}
+_tokenizers_lock = threading.Lock()
+
+
+def get_tokenizer(vocab=50000, max_len=512, version=CURRENT_HASH_VERSION) -> HashTokenizer:
+    """Shared tokenizer (and token cache) per configuration."""
+    key = (vocab, max_len, version)
+    tok = _tokenizers.get(key)
+    if tok is None:
+        with _tokenizers_lock:
+            tok = _tokenizers.setdefault(key, HashTokenizer(vocab, max_len, version))
+    return tok
@@ -1,7 +1,7 @@
 import json
 
 import torch
-from app.rlhf.reward_model import SimpleRewardModel, hash_tokenize
+from app.rlhf.reward_model import SimpleRewardModel
 from transformers import AutoModelForCausalLM, AutoTokenizer
 
 try:
@@ -74,7 +74,7 @@ def rlhf_train(db, base_model_name="gpt2", steps=500, device="cpu"):
         rewards = []
         for p, r in zip(batch_prompts, responses):
             spec = _jsonify(r)
-            ids = hash_tokenize(p + " " + json.dumps(spec)).to(device).unsqueeze(0)
+            ids = rm.tokenizer.encode(p + " " + json.dumps(spec)).to(device).unsqueeze(0)
             with torch.no_grad():
                 rew = rm(ids).item()
             rewards.append(rew)
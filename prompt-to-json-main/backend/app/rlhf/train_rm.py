@@ -1,29 +1,173 @@
+import hashlib
+import json
+import os
+
 import torch
 import torch.optim as optim
-from app.rlhf.reward_model import SimpleRewardModel, flatten_spec, hash_tokenize
+from app.rlhf.reward_model import SimpleRewardModel, flatten_spec
+from app.rlhf.tokenizer import CURRENT_HASH_VERSION, get_tokenizer
+from torch.utils.data import DataLoader, Dataset
+
+RM_DATASET_CACHE_DIR = os.getenv("RM_DATASET_CACHE_DIR", "models_ckpt/rm_dataset_cache")
+# Tokenized datasets kept in the cache; the least recently used are deleted beyond this
+RM_DATASET_CACHE_MAX = int(os.getenv("RM_DATASET_CACHE_MAX", "8"))
+# Bump when tokenization changes so cached datasets are rebuilt
+DATASET_VERSION = 1
+
+
+class PreferenceDataset(Dataset):
+    """
+    Pre-tokenized preference pairs, offset-encoded: sequence 2*i is the preferred
+    candidate of pair i and 2*i+1 the other one, stored back to back in ``tokens``.
+    """
+
+    def __init__(self, tokens: torch.Tensor, offsets: torch.Tensor):
+        self.tokens = tokens
+        self.offsets = offsets
+
+    def __len__(self):
+        return (len(self.offsets) - 1) // 2
+
+    def __getitem__(self, i):
+        o = self.offsets
+        return self.tokens[o[2 * i] : o[2 * i + 1]], self.tokens[o[2 * i + 1] : o[2 * i + 2]]
+
+    @classmethod
+    def from_pairs(cls, pairs, vocab=50000, max_len=512, version=CURRENT_HASH_VERSION):
+        def texts():
+            for prompt, A, B, pref in pairs:
+                chosen, rejected = (A, B) if pref == "A" else (B, A)
+                yield prompt + " " + flatten_spec(chosen)
+                yield prompt + " " + flatten_spec(rejected)
+
+        tokens, starts = get_tokenizer(vocab, max_len, version).encode_batch(texts())
+        return cls(tokens, torch.cat([starts, torch.tensor([len(tokens)])]))
+
+    def batch(self, idx: torch.Tensor):
+        """Gather pairs ``idx`` as (chosen ids, chosen offsets, rejected ids, rejected offsets)."""
+        starts, ends = self.offsets[:-1], self.offsets[1:]
+        out = []
+        for seq in (2 * idx, 2 * idx + 1):
+            lengths = ends[seq] - starts[seq]
+            bag_offsets = torch.zeros(len(seq), dtype=torch.long)
+            bag_offsets[1:] = torch.cumsum(lengths, 0)[:-1]
+            # Token positions of every selected sequence, in order
+            pos = torch.repeat_interleave(starts[seq] - bag_offsets, lengths) + torch.arange(int(lengths.sum()))
+            out += [self.tokens[pos], bag_offsets]
+        return tuple(out)
+
+
+def collate_pairs(items):
+    """DataLoader collate: list of (chosen, rejected) id tensors to flat ids plus offsets."""
+    out = []
+    for seqs in zip(*items):
+        offsets = torch.zeros(len(seqs), dtype=torch.long)
+        offsets[1:] = torch.cumsum(torch.tensor([len(t) for t in seqs[:-1]]), 0)
+        out += [torch.cat(seqs), offsets]
+    return tuple(out)
 
 
-def train_reward_model(pairs, device="cpu", epochs=5, lr=1e-4, vocab=50000, margin=0.5):
+def prune_dataset_cache(cache_dir, keep=RM_DATASET_CACHE_MAX):
+    """Delete all but the ``keep`` most recently used datasets in ``cache_dir``."""
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".pt"):
+            path = os.path.join(cache_dir, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+    for _, path in sorted(entries, reverse=True)[max(0, keep) :]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def load_or_build_dataset(pairs, vocab=50000, max_len=512, cache_dir=RM_DATASET_CACHE_DIR, cache_max=RM_DATASET_CACHE_MAX):
+    """
+    Tokenize pairs once; reuse the tensors from ``cache_dir`` when the same pairs
+    come back. At most ``cache_max`` datasets are kept, evicting the least recently used.
+    """
+    if not cache_dir:
+        return PreferenceDataset.from_pairs(pairs, vocab, max_len)
+
+    h = hashlib.sha256(f"{DATASET_VERSION}:{CURRENT_HASH_VERSION}:{vocab}:{max_len}:".encode())
+    for pair in pairs:
+        h.update(json.dumps(pair, sort_keys=True, default=str).encode())
+    path = os.path.join(cache_dir, f"{h.hexdigest()}.pt")
+    if os.path.exists(path):
+        data = torch.load(path)
+        os.utime(path)
+        return PreferenceDataset(data["tokens"], data["offsets"])
+
+    ds = PreferenceDataset.from_pairs(pairs, vocab, max_len)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    torch.save({"tokens": ds.tokens, "offsets": ds.offsets}, tmp)
+    os.replace(tmp, path)
+    prune_dataset_cache(cache_dir, cache_max)
+    return ds
+
+
+def train_reward_model(
+    pairs,
+    device="cpu",
+    epochs=5,
+    lr=1e-4,
+    vocab=50000,
+    margin=0.5,
+    batch_size=32,
+    num_workers=0,
+    cache_dir=RM_DATASET_CACHE_DIR,
+    seed=None,
+):
+    """
+    Train SimpleRewardModel on (prompt, A, B, preferred) pairs with a margin ranking loss.
+
+    The dataset is tokenized once (cached on disk), then each epoch runs shuffled
+    mini-batches through EmbeddingBag. ``num_workers > 0`` gathers batches in
+    DataLoader worker processes; ``batch_size=1`` matches the old per-pair updates.
+
+    ``lr`` is the per-pair rate of those updates. A batch takes one optimizer step
+    for ``batch_size`` pairs, so the rate is scaled linearly by ``batch_size`` to
+    keep the distance covered per epoch.
+    """
+    ds = load_or_build_dataset(pairs, vocab=vocab, cache_dir=cache_dir)
     model = SimpleRewardModel(vocab=vocab).to(device)
-    opt = optim.AdamW(model.parameters(), lr=lr)
+    opt = optim.AdamW(model.parameters(), lr=lr * batch_size)
+    gen = torch.Generator()
+    if seed is not None:
+        gen.manual_seed(seed)
+
+    loader = None
+    if num_workers > 0:
+        loader = DataLoader(
+            ds,
+            batch_size=batch_size,
+            shuffle=True,
+            num_workers=num_workers,
+            collate_fn=collate_pairs,
+            generator=gen,
+            persistent_workers=True,
+        )
+
     for ep in range(epochs):
+        model.train()
         total = 0.0
-        for prompt, A, B, pref in pairs:
-            model.train()
-            opt.zero_grad()
+        if loader is not None:
+            batches = loader
+        else:
+            perm = torch.randperm(len(ds), generator=gen)
+            batches = (ds.batch(perm[i : i + batch_size]) for i in range(0, len(ds), batch_size))
 
-            def s(spec):
-                txt = prompt + " " + flatten_spec(spec)
-                ids = hash_tokenize(txt).to(device).unsqueeze(0)
-                return model(ids).squeeze()
-
-            rA, rB = s(A), s(B)
-            if pref == "A":
-                loss = torch.relu(margin - (rA - rB))
-            else:
-                loss = torch.relu(margin - (rB - rA))
-            loss.backward()
+        for c_ids, c_off, r_ids, r_off in batches:
+            opt.zero_grad()
+            r_chosen = model.forward_bag(c_ids.to(device), c_off.to(device))
+            r_rejected = model.forward_bag(r_ids.to(device), r_off.to(device))
+            losses = torch.relu(margin - (r_chosen - r_rejected))
+            losses.mean().backward()
             opt.step()
-            total += float(loss.item())
-        print(f"[RM] epoch {ep+1} loss={total/max(1,len(pairs)):.4f}")
+            total += float(losses.sum().item())
+        print(f"[RM] epoch {ep+1} loss={total/max(1,len(ds)):.4f}")
     return model
@@ -0,0 +1,225 @@
+# app/rule_classifier.py
+"""
+Single-pass rule classifier shared by the classification and parsing agents,
+PDF→JSON conversion and the ingestion flows.
+
+One compiled alternation scans a clause once and yields category keywords and
+numbers (with normalised units) in text order. Everything else is a linear walk
+over those tokens, so classifying a whole DCR document is linear in its length.
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+# Category keywords (phrases before their sub-words so the longest one wins)
+CATEGORY_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "fsi": (r"floor\s+space\s+index", r"f\.s\.i\.?", r"fsi"),
+    "height": (r"maximum\s+height", r"floor\s+height", r"height", r"storeys", r"storey"),
+    "setback": (r"distance\s+from\s+boundary", r"set\s*backs?"),
+    "parking": (r"parking\s+area", r"vehicle\s+space", r"car\s+park", r"parking", r"stilt"),
+    "land_use": (r"mixed\s+use", r"green\s+zone", r"residential", r"commercial", r"industrial", r"institutional"),
+    "density": (r"population\s+density", r"units\s+per\s+hectare", r"tenements", r"plinth\s+area"),
+    "coverage": (r"site\s+coverage", r"ground\s+coverage", r"building\s+coverage"),
+    "entitlement": (r"entitle(?:ments?|d)?", r"permitted", r"allowed"),
+}
+
+# Unit spellings after a number (same line) -> canonical unit.
+# A unit that is also a category keyword ("3 storeys") yields the keyword token as well.
+UNIT_PATTERNS: Tuple[Tuple[str, str], ...] = (
+    ("sqm", r"sq\.?[ \t]*m(?:eters?|etres?)?|sqm|m2|m²"),
+    ("sqft", r"sq\.?[ \t]*f(?:ee)?t|sqft"),
+    ("m", r"meters?|metres?|m"),
+    ("ft", r"feet|foot|ft"),
+    ("%", r"%|percent"),
+    ("floors", r"floors?(?!\s+space\s+index)|storeys?|stories"),
+    ("spaces", r"spaces?|slots?|cars?(?!\s+park)|ecs"),
+)
+
+LENGTH_UNITS = ("m", "ft")
+AREA_UNITS = ("sqm", "sqft")
+NUMBER = "number"
+
+_UNIT_GROUPS = "|".join(f"(?P<u_{i}>{pattern})" for i, (_, pattern) in enumerate(UNIT_PATTERNS))
+_KEYWORD_GROUPS = "|".join(
+    rf"(?P<{category}>\b(?:{'|'.join(words)})\b)" for category, words in CATEGORY_KEYWORDS.items()
+)
+TOKEN_RE = re.compile(
+    rf"{_KEYWORD_GROUPS}|(?P<{NUMBER}>(?<![\w.])(?P<value>\d+(?:\.\d+)?)(?:[ \t]*(?:{_UNIT_GROUPS})(?![a-z]))?)",
+    re.IGNORECASE,
+)
+_KEYWORD_RE = re.compile(_KEYWORD_GROUPS, re.IGNORECASE)
+_SEPARATORS = frozenset(" \t:=-")
+
+
+@dataclass
+class Token:
+    kind: str  # category name or NUMBER
+    text: str
+    start: int
+    end: int
+    value: Optional[float] = None
+    unit: Optional[str] = None
+
+
+def scan(text: str) -> List[Token]:
+    """Single pass over ``text``: keyword and number tokens in order."""
+    tokens = []
+    for m in TOKEN_RE.finditer(text or ""):
+        kind = m.lastgroup
+        if kind == NUMBER:
+            i, unit = next(((i, name) for i, (name, _) in enumerate(UNIT_PATTERNS) if m.group(f"u_{i}")), (None, None))
+            tokens.append(Token(NUMBER, m.group(0), m.start(), m.end(), float(m.group("value")), unit))
+            keyword = _KEYWORD_RE.fullmatch(m.group(f"u_{i}")) if unit else None
+            if keyword:
+                tokens.append(Token(keyword.lastgroup, keyword.group(0), m.start(f"u_{i}"), m.end()))
+        else:
+            tokens.append(Token(kind, m.group(0), m.start(), m.end()))
+    return tokens
+
+
+def _next_numbers(text: str, tokens: List[Token]) -> List[Optional[int]]:
+    """For each token, the index of the next number token on the same line (one backward pass)."""
+    result: List[Optional[int]] = [None] * len(tokens)
+    upcoming = None
+    for i in range(len(tokens) - 1, -1, -1):
+        token = tokens[i]
+        if upcoming is not None and text.find("\n", token.end, tokens[upcoming].start) != -1:
+            upcoming = None
+        result[i] = upcoming
+        if token.kind == NUMBER:
+            upcoming = i
+    return result
+
+
+def _following(tokens: List[Token], next_numbers: List[Optional[int]]) -> List[Optional[Token]]:
+    return [None if j is None else tokens[j] for j in next_numbers]
+
+
+def _adjacent(text: str, keyword: Token, number: Optional[Token]) -> bool:
+    """Only separators (spaces, ':', '=', '-') between keyword and number."""
+    return number is not None and all(c in _SEPARATORS for c in text[keyword.end:number.start])
+
+
+# ---------- Rule classification (agents/rule_classification_agent) ----------
+CLASSIFICATION_ORDER = ("fsi", "height", "setback", "parking", "land_use", "density", "coverage")
+# Categories that only count when a number follows the keyword on the same line
+NUMERIC_CATEGORIES = ("height", "setback")
+
+
+def classify_rule(text: str) -> Dict[str, Any]:
+    """
+    Category plus details: {"category", "details": {"value", "unit", "matched"}}.
+    The value is the number following the category keyword, else the first
+    number in the clause.
+    """
+    tokens = scan(text)
+    following = _following(tokens, _next_numbers(text, tokens))
+    hits: Dict[str, Tuple[Token, Optional[Token]]] = {}
+    first_number = None
+    for token, number in zip(tokens, following):
+        if token.kind == NUMBER:
+            first_number = first_number or token
+        elif token.kind not in hits and (number is not None or token.kind not in NUMERIC_CATEGORIES):
+            hits[token.kind] = (token, number)
+
+    rule_info: Dict[str, Any] = {"category": "other", "details": {}}
+    category = next((c for c in CLASSIFICATION_ORDER if c in hits), None)
+    if category is None:
+        return rule_info
+
+    keyword, number = hits[category]
+    number = number or first_number
+    rule_info["category"] = category
+    if number is not None:
+        rule_info["details"]["value"] = number.value
+        if number.unit:
+            rule_info["details"]["unit"] = number.unit
+    end = number.end if number is not None and number.start > keyword.start else keyword.end
+    rule_info["details"]["matched"] = text[keyword.start:end]
+    return rule_info
+
+
+# ---------- Parsed rule fields (parsing agent, PDF→JSON) ----------
+# Value grammar right after an FSI / setback keyword: optional ':', '=' or space, then the number.
+# The FSI value takes digits and dots, so "F.S.I. shall be" reads "." and gives an FSI rule without a value.
+_FSI_VALUE_RE = re.compile(r"\s*(?:[:=]|\s)?\s*([\d.]+)")
+_SETBACK_VALUE_RE = re.compile(r"\s*(?:[:=]|\s)?\s*(\d+(?:\.\d+)?)")
+# Matched anywhere in the clause, including inside longer words ("heights", "disallowed")
+HEIGHT_WORD = "height"
+ENTITLEMENT_WORDS = ("allowed", "permitted", "entitlement")
+
+
+def rule_fields(text: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    (rule_type, parsed_fields) in priority order: fsi, height, setback, floors,
+    entitlement, other.
+    """
+    tokens = scan(text)
+    fsi = setback = floors = length = None
+    for token in tokens:
+        kind = token.kind
+        if kind == NUMBER:
+            if length is None and token.unit == "m":
+                length = token
+            if floors is None and token.unit == "floors":
+                floors = token
+        elif kind == "fsi" and fsi is None:
+            fsi = _FSI_VALUE_RE.match(text, token.end)
+        elif kind == "setback" and setback is None and "setback" in token.text.lower():
+            setback = _SETBACK_VALUE_RE.match(text, token.end)
+
+    if fsi is not None:
+        try:
+            return "fsi", {"fsi": float(fsi.group(1))}
+        except ValueError:
+            return "fsi", {}
+    lowered = text.lower()
+    if length is not None and HEIGHT_WORD in lowered:
+        return "height", {"height_m": length.value}
+    if setback is not None:
+        return "setback", {"setback_m": float(setback.group(1))}
+    if floors is not None:
+        return "floors", {"floors": int(floors.value)}
+    if any(word in lowered for word in ENTITLEMENT_WORDS):
+        return "entitlement", {"note": text[:200]}
+    return "other", {}
+
+
+# ---------- Document rules (Prefect ingestion flows) ----------
+def extract_document_rules(text: str) -> List[Dict[str, Any]]:
+    """
+    Every FSI, setback, maximum height and parking requirement in a document,
+    in text order, from one scan.
+    """
+    tokens = scan(text)
+    next_numbers = _next_numbers(text, tokens)
+    rules: List[Dict[str, Any]] = []
+    for token, j in zip(tokens, next_numbers):
+        number = None if j is None else tokens[j]
+        if not _adjacent(text, token, number):
+            continue
+        if token.kind == "fsi":
+            rules.append({"type": "fsi", "value": number.value, "description": "Floor Space Index (FSI) regulation"})
+        elif token.kind == "setback" and number.unit in LENGTH_UNITS:
+            rules.append(
+                {"type": "setback", "value": number.value, "unit": number.unit, "description": "Minimum setback requirement"}
+            )
+        elif token.kind == "height" and token.text.lower().startswith("maximum") and number.unit in LENGTH_UNITS:
+            rules.append(
+                {"type": "height", "value": number.value, "unit": number.unit, "description": "Maximum building height"}
+            )
+        elif token.kind == "parking" and number.unit == "spaces":
+            # "<n> spaces ... per <area>" on the same line
+            k = next_numbers[j]
+            while k is not None and tokens[k].unit not in AREA_UNITS:
+                k = next_numbers[k]
+            if k is not None:
+                area = tokens[k]
+                rules.append(
+                    {
+                        "type": "parking",
+                        "spaces_per_area": f"{number.value:g} per {area.value:g} {area.unit}",
+                        "description": "Parking space requirements",
+                    }
+                )
+    return rules
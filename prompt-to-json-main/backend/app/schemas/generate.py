@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Dict, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, HttpUrl, validator
 
 
 class GenerateRequest(BaseModel):
@@ -9,6 +9,16 @@ class GenerateRequest(BaseModel):
     prompt: str
     project_id: Optional[str] = None
     context: Optional[Dict] = None
+    webhook_url: Optional[HttpUrl] = None
+
+    @validator("webhook_url")
+    def webhook_url_must_be_public(cls, v):
+        """Webhooks are POSTed by the server, so internal hosts and private IPs are refused"""
+        from app.jobs import check_webhook_url
+
+        if v is not None:
+            check_webhook_url(str(v))
+        return v
 
 
 class GenerateResponse(BaseModel):
@@ -20,3 +30,4 @@ class GenerateResponse(BaseModel):
     created_at: datetime
     spec_version: int = 1
     user_id: str
+    job_id: Optional[str] = None
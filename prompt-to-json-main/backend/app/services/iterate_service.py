@@ -12,11 +12,13 @@ from typing import Dict, Tuple
 
 from app.database import get_db
 from app.error_handler import APIException
+from app.execution import StageTimer, run_io
+from app.geometry_cache import build_glb_async, cas_path, upload_cached_glb
 from app.lm_adapter import lm_run
 from app.models import Iteration, Spec
 from app.schemas.error_schemas import ErrorCode
-from app.storage import get_signed_url, upload_to_bucket
-from app.utils import create_iter_id, generate_glb_from_spec
+from app.storage import get_signed_url
+from app.utils import create_iter_id
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
@@ -37,6 +39,7 @@ class IterateService:
 
         Returns: {before, after, feedback, iteration_id, training_triggered, ...}
         """
+        timer = StageTimer("iterate")
 
         # 1. Load spec from storage or database
         from app.spec_storage import get_spec
@@ -50,7 +53,7 @@ class IterateService:
         else:
             # Fallback to database
             try:
-                spec = self.db.query(Spec).filter(Spec.id == spec_id).first()
+                spec = await run_io(self.db.query(Spec).filter(Spec.id == spec_id).first)
                 if not spec:
                     raise APIException(
                         status_code=404, error_code=ErrorCode.NOT_FOUND, message=f"Spec {spec_id} not found"
@@ -102,6 +105,7 @@ class IterateService:
         before_spec = copy.deepcopy(spec_json)
 
         # before_spec already set above
+        timer.lap("load")
 
         # 2. Apply improvement based on strategy
         try:
@@ -129,6 +133,8 @@ class IterateService:
             logger.error(f"Error improving spec: {str(e)}", exc_info=True)
             raise APIException(status_code=500, error_code=ErrorCode.INTERNAL_ERROR, message="Failed to improve spec")
 
+        timer.lap("improve")
+
         # 3. Save iteration and update stored spec
         iter_id = create_iter_id()
 
@@ -164,7 +170,7 @@ class IterateService:
                 self.db.add(iteration)
 
                 # Update spec version and data
-                spec = self.db.query(Spec).filter(Spec.id == spec_id).first()
+                spec = await run_io(self.db.query(Spec).filter(Spec.id == spec_id).first)
                 if spec:
                     spec.spec_json = improved_spec
                     spec.version += 1
@@ -173,26 +179,30 @@ class IterateService:
                 else:
                     spec_version = 2
 
-                self.db.commit()
+                await run_io(self.db.commit)
                 print(f"✅ Saved iteration {iter_id} to database")
 
             except Exception as e:
-                self.db.rollback()
+                await run_io(self.db.rollback)
                 logger.error(f"Error saving iteration: {str(e)}")
                 print(f"⚠️ Database save failed: {e}")
                 iter_id = "iter_mock_123"
                 spec_version = 2
 
+        timer.lap("save")
+
         # 4. Generate preview
         preview_url = None
         try:
-            preview_bytes = generate_glb_from_spec(improved_spec)
-            preview_path = f"{spec_id}_v{spec_version}.glb"
-            await upload_to_bucket("previews", preview_path, preview_bytes)
-            preview_url = get_signed_url("previews", preview_path, expires=600)
+            # Geometry is content-addressed, so material/cost-only iterations reuse the stored GLB
+            geometry_key, preview_bytes = await build_glb_async(improved_spec)
+            await upload_cached_glb("previews", geometry_key, preview_bytes)
+            preview_url = await run_io(get_signed_url, "previews", cas_path(geometry_key), expires=600)
         except Exception as e:
             logger.warning(f"Preview generation failed: {str(e)}")
             preview_url = "https://mock-preview.glb"
+        timer.lap("preview")
+        timer.log(iter_id)
 
         # 5. Check if should trigger training
         training_triggered = False
@@ -300,12 +300,24 @@ def get_signed_url(bucket: str, file_path: str, expires: int = 3600) -> str:
     return generate_signed_url(file_path, bucket, expires)
 
 
-async def upload_to_bucket(bucket: str, file_path: str, data: bytes) -> str:
-    """Upload data to bucket (async wrapper)"""
+async def upload_to_bucket(bucket: str, file_path: str, data: bytes, upsert: bool = False) -> str:
+    """Upload data to bucket (async wrapper; the blocking SDK call runs on the I/O pool)
+
+    With ``upsert`` an existing object at ``file_path`` is overwritten instead of failing.
+    """
+    from app.execution import run_io
+
+    file_options = {"content-type": "application/octet-stream"}
+    if upsert:
+        file_options["upsert"] = "true"
+
     try:
         actual_bucket = get_bucket_name(bucket)
-        result = supabase.storage.from_(actual_bucket).upload(
-            file_path, data, file_options={"content-type": "application/octet-stream"}
+        result = await run_io(
+            supabase.storage.from_(actual_bucket).upload,
+            file_path,
+            data,
+            file_options=file_options,
         )
         url = supabase.storage.from_(actual_bucket).get_public_url(file_path)
         return url
@@ -0,0 +1,69 @@
+"""
+Geometry benchmark
+Measures local GLB build time against scene object count
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.geometry_generator_real import generate_real_glb
+
+# Object mix roughly matching lm_adapter house/apartment specs
+OBJECT_MIX = [
+    {"type": "wall", "dimensions": {"width": 5.0, "height": 3.0, "thickness": 0.2}},
+    {"type": "window", "dimensions": {"width": 1.2, "height": 1.5}},
+    {"type": "door", "dimensions": {"width": 0.9, "height": 2.1}},
+    {"type": "column", "dimensions": {"width": 0.3, "depth": 0.3, "height": 3.0}},
+    {"type": "slab", "dimensions": {"width": 10.0, "length": 8.0, "thickness": 0.15}},
+    {"type": "room", "subtype": "bedroom", "dimensions": {"width": 4.0, "length": 4.0, "height": 2.7}},
+    {"type": "staircase", "dimensions": {"width": 1.2, "length": 3.0, "height": 2.7}},
+    {"type": "chair", "dimensions": {"width": 0.5, "depth": 0.5, "height": 0.8}},
+]
+
+
+def build_spec(object_count: int) -> dict:
+    """Build a synthetic spec with the given number of objects"""
+    objects = []
+    for i in range(object_count):
+        obj = dict(OBJECT_MIX[i % len(OBJECT_MIX)])
+        obj["id"] = f"{obj['type']}_{i:05d}"
+        objects.append(obj)
+    return {"design_type": "building", "objects": objects}
+
+
+def time_generation(spec: dict, repeats: int) -> tuple:
+    """Return (best build time in ms, GLB size in bytes)"""
+    best = float("inf")
+    size = 0
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        glb = generate_real_glb(spec)
+        best = min(best, time.perf_counter() - start_time)
+        size = len(glb)
+    return best * 1000, size
+
+
+def run_benchmark(object_counts, repeats: int):
+    """Print GLB build time versus object count"""
+    print("GLB Build Benchmark")
+    print(f"Repeats per size: {repeats} (best time reported)")
+    print("=" * 50)
+    print(f"{'objects':>10} {'build ms':>12} {'glb KB':>10} {'us/object':>12}")
+
+    for count in object_counts:
+        build_ms, size = time_generation(build_spec(count), repeats)
+        print(f"{count:>10} {build_ms:>12.2f} {size / 1024:>10.1f} {build_ms * 1000 / count:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark local GLB generation")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500, 1000, 2500])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    run_benchmark(args.sizes, args.repeats)
@@ -0,0 +1,88 @@
+"""
+PPO spec-edit environment benchmark
+Measures env-steps/second for in-process and multiprocess vectorized envs,
+with per-env reward scoring (before) and batched, memoized scoring
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+import torch
+from app.opt_rl.env_spec import SpecEditEnv
+from app.opt_rl.train_ppo import make_spec_env
+from app.rlhf.reward_model import SimpleRewardModel
+from stable_baselines3.common.env_util import make_vec_env
+
+
+def build_spec(object_count: int) -> dict:
+    """Seed spec with the objects SpecEditEnv edits plus filler objects"""
+    objects = [
+        {"id": "floor_1", "type": "floor", "material": "wood"},
+        {"id": "sofa_1", "type": "sofa", "material": "fabric_grey"},
+        {"id": "cushion_1", "type": "cushion", "material": "fabric_white"},
+    ]
+    objects += [{"id": f"obj_{i}", "type": "chair", "material": "oak"} for i in range(max(0, object_count - 3))]
+    return {"objects": objects, "scene": {"style": "modern"}}
+
+
+def unbatched_env(base, n_envs: int, rm_ckpt: str):
+    """The original setup: DummyVecEnv, every env scores its own step with no cache"""
+
+    def _make():
+        env = SpecEditEnv(base_spec=base, rm_ckpt=rm_ckpt)
+        env.scorer.cache_size = 0
+        return env
+
+    return make_vec_env(_make, n_envs=n_envs)
+
+
+def steps_per_second(venv, steps: int) -> float:
+    """Step all envs with random actions; return env-steps/second"""
+    venv.reset()
+    actions = np.random.randint(0, venv.action_space.n, size=(steps, venv.num_envs))
+    start_time = time.perf_counter()
+    for a in actions:
+        venv.step(a)
+    elapsed = time.perf_counter() - start_time
+    venv.close()
+    return steps * venv.num_envs / elapsed
+
+
+def run_benchmark(object_count: int, steps: int, env_counts, worker_counts):
+    """Print env-steps/second for each configuration"""
+    base = build_spec(object_count)
+    with tempfile.TemporaryDirectory() as tmp:
+        rm_ckpt = os.path.join(tmp, "rm.pt")
+        torch.save(SimpleRewardModel().state_dict(), rm_ckpt)
+
+        print("PPO Env Benchmark (CPU)")
+        print(f"Objects/spec: {object_count}, steps per env: {steps}, CPU cores: {os.cpu_count()}")
+        print("=" * 60)
+        print(f"{'configuration':<40} {'envs':>6} {'steps/s':>12}")
+
+        for n in env_counts:
+            print(f"{'dummy, per-env scoring (before)':<40} {n:>6} {steps_per_second(unbatched_env(base, n, rm_ckpt), steps):>12.0f}")
+            venv = make_spec_env(base, n_envs=n, vec_env="dummy", rm_ckpt=rm_ckpt)
+            print(f"{'dummy, batched + cached':<40} {n:>6} {steps_per_second(venv, steps):>12.0f}")
+        for w in worker_counts:
+            venv = make_spec_env(base, n_envs=w, vec_env="subproc", rm_ckpt=rm_ckpt)
+            print(f"{'subproc, batched + cached':<40} {w:>6} {steps_per_second(venv, steps):>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark SpecEditEnv vectorized stepping")
+    parser.add_argument("--objects", type=int, default=50)
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--envs", type=int, nargs="+", default=[4])
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    run_benchmark(args.objects, args.steps, args.envs, sorted(set(args.workers)))
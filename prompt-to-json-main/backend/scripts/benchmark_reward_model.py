@@ -0,0 +1,106 @@
+"""
+Reward model training benchmark
+Measures CPU training throughput (pairs/second) of the old per-pair loop
+against the pre-tokenized mini-batch pipeline
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+import torch
+import torch.optim as optim
+from app.rlhf.reward_model import SimpleRewardModel, flatten_spec, hash_tokenize
+from app.rlhf.train_rm import train_reward_model
+
+MATERIALS = ["wood", "marble_white", "leather_brown", "fabric_orange", "concrete", "glass", "steel"]
+TYPES = ["floor", "wall", "sofa", "cushion", "table", "window", "door"]
+
+
+def build_pairs(count: int, objects: int) -> list:
+    """Synthetic (prompt, A, B, preferred) pairs over specs with the given object count"""
+    rng = random.Random(0)
+
+    def spec():
+        return {
+            "objects": [
+                {"id": f"obj_{i}", "type": rng.choice(TYPES), "material": rng.choice(MATERIALS)}
+                for i in range(objects)
+            ],
+            "scene": {"style": rng.choice(["modern", "classic", "industrial"])},
+        }
+
+    return [("Improve design", spec(), spec(), rng.choice("AB")) for _ in range(count)]
+
+
+def train_per_pair(pairs, epochs: int, margin=0.5):
+    """The original loop: tokenize both candidates and step once per pair, every epoch"""
+    model = SimpleRewardModel()
+    opt = optim.AdamW(model.parameters(), lr=1e-4)
+    for _ in range(epochs):
+        for prompt, A, B, pref in pairs:
+            model.train()
+            opt.zero_grad()
+            rA = model(hash_tokenize(prompt + " " + flatten_spec(A)).unsqueeze(0)).squeeze()
+            rB = model(hash_tokenize(prompt + " " + flatten_spec(B)).unsqueeze(0)).squeeze()
+            loss = torch.relu(margin - (rA - rB)) if pref == "A" else torch.relu(margin - (rB - rA))
+            loss.backward()
+            opt.step()
+
+
+def timed(fn) -> float:
+    start_time = time.perf_counter()
+    fn()
+    return time.perf_counter() - start_time
+
+
+def run_benchmark(pair_count: int, objects: int, epochs: int, batch_sizes, workers: int):
+    """Print pairs/second for each training configuration"""
+    pairs = build_pairs(pair_count, objects)
+    print("Reward Model Training Benchmark (CPU)")
+    print(f"Pairs: {pair_count}, objects/spec: {objects}, epochs: {epochs}, torch threads: {torch.get_num_threads()}")
+    print("=" * 60)
+    print(f"{'configuration':<36} {'seconds':>10} {'pairs/s':>12}")
+
+    def report(name, seconds):
+        print(f"{name:<36} {seconds:>10.2f} {pair_count * epochs / seconds:>12.0f}")
+
+    report("per-pair (before)", timed(lambda: train_per_pair(pairs, epochs)))
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for bs in batch_sizes:
+            report(
+                f"batched bs={bs} (cold cache)",
+                timed(lambda: train_reward_model(pairs, epochs=epochs, batch_size=bs, cache_dir=cache_dir)),
+            )
+            report(
+                f"batched bs={bs} (warm cache)",
+                timed(lambda: train_reward_model(pairs, epochs=epochs, batch_size=bs, cache_dir=cache_dir)),
+            )
+        if workers:
+            bs = batch_sizes[-1]
+            report(
+                f"batched bs={bs} workers={workers}",
+                timed(
+                    lambda: train_reward_model(
+                        pairs, epochs=epochs, batch_size=bs, num_workers=workers, cache_dir=cache_dir
+                    )
+                ),
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark reward model training throughput")
+    parser.add_argument("--pairs", type=int, default=2000)
+    parser.add_argument("--objects", type=int, default=8)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[32, 128])
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    run_benchmark(args.pairs, args.objects, args.epochs, args.batch_sizes, args.workers)
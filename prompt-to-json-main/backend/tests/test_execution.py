@@ -0,0 +1,71 @@
+"""
+Test cases for the I/O and geometry worker pools
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+import app.execution as execution
+from app.execution import StageTimer, run_cpu, run_io
+
+
+def _blocking_call(seconds):
+    time.sleep(seconds)
+    return threading.current_thread().name
+
+
+def test_run_io_keeps_event_loop_responsive():
+    """Blocking calls run on the io pool while the loop keeps scheduling other work"""
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        names = await asyncio.gather(*(run_io(_blocking_call, 0.2) for _ in range(2)))
+        task.cancel()
+        return names, ticks
+
+    names, ticks = asyncio.run(main())
+
+    assert all(name.startswith("io") for name in names)
+    assert ticks >= 5
+
+
+def test_run_cpu_falls_back_to_threads(monkeypatch):
+    """With GEOMETRY_WORKERS=0 CPU work runs on the io pool"""
+    monkeypatch.setattr(execution.settings, "GEOMETRY_WORKERS", 0)
+
+    assert execution.get_cpu_pool() is None
+    assert asyncio.run(run_cpu(_blocking_call, 0)).startswith("io")
+
+
+def test_run_cpu_uses_process_pool(monkeypatch):
+    """With geometry workers configured CPU work runs in another process"""
+    monkeypatch.setattr(execution.settings, "GEOMETRY_WORKERS", 1)
+    monkeypatch.setattr(execution, "_cpu_pool", None)
+    try:
+        assert asyncio.run(run_cpu(os.getpid)) != os.getpid()
+    finally:
+        execution.get_cpu_pool().shutdown()
+        execution._cpu_pool = None
+
+
+def test_stage_timer_accumulates_laps():
+    """Repeated stages add up; stages keep first-seen order"""
+    timer = StageTimer("generate")
+    time.sleep(0.01)
+    timer.lap("build")
+    timer.lap("upload")
+    time.sleep(0.01)
+    timer.lap("build")
+
+    assert list(timer.stages) == ["build", "upload"]
+    assert timer.stages["build"] >= 20
@@ -0,0 +1,89 @@
+"""
+Test cases for the content-addressed GLB cache
+"""
+
+import asyncio
+
+import app.geometry_cache as cache_module
+import app.geometry_generator_real as generator
+import app.storage as storage
+import pytest
+from app.geometry_cache import GeometryCache, cas_path, geometry_hash
+
+SPEC = {"objects": [{"id": "wall_1", "type": "wall", "material": "brick", "dimensions": {"width": 4, "height": 3}}]}
+
+
+@pytest.fixture
+def fresh_cache(tmp_path, monkeypatch):
+    """Empty cache backed by tmp_path, counting real mesh builds"""
+    cache = GeometryCache(max_entries=2, cache_dir=str(tmp_path))
+    monkeypatch.setattr(cache_module, "geometry_cache", cache)
+
+    builds = []
+    real_generate = generator.generate_real_glb
+    monkeypatch.setattr(generator, "generate_real_glb", lambda spec, layout="merged": builds.append(layout) or real_generate(spec, layout))
+    return cache, builds
+
+
+def test_hash_ignores_non_geometry_fields():
+    """Material and cost edits keep the key; dimensions and layout change it"""
+    recoloured = {"objects": [dict(SPEC["objects"][0], material="glass", cost=10)]}
+    resized = {"objects": [dict(SPEC["objects"][0], dimensions={"width": 5, "height": 3})]}
+
+    assert geometry_hash(recoloured, "merged") == geometry_hash(SPEC, "merged")
+    assert geometry_hash(resized, "merged") != geometry_hash(SPEC, "merged")
+    assert geometry_hash(SPEC, "instanced") != geometry_hash(SPEC, "merged")
+
+
+def test_miss_builds_then_hits(fresh_cache, tmp_path):
+    """First call builds and stores the GLB, repeat calls are served from memory"""
+    cache, builds = fresh_cache
+
+    key, glb = cache_module.get_or_build_glb(SPEC, layout="merged")
+    again = cache_module.get_or_build_glb(SPEC, layout="merged")
+
+    assert builds == ["merged"]
+    assert again == (key, glb) and glb == generator.generate_real_glb(SPEC)
+    assert (tmp_path / f"{key}.glb").read_bytes() == glb
+
+
+def test_disk_tier_survives_memory_eviction(fresh_cache):
+    """Entries evicted from the LRU (or lost on restart) are reloaded from disk"""
+    cache, builds = fresh_cache
+    key, glb = cache_module.get_or_build_glb(SPEC, layout="merged")
+    for width in (5, 6):
+        cache_module.get_or_build_glb({"objects": [{"type": "wall", "dimensions": {"width": width}}]}, layout="merged")
+
+    assert key not in cache._entries
+    cache.clear()
+    assert cache_module.get_or_build_glb(SPEC, layout="merged") == (key, glb)
+    assert len(builds) == 3
+
+
+def test_async_build_uses_cache(fresh_cache, monkeypatch):
+    """build_glb_async misses once, then hits, and agrees with the sync path"""
+    cache, builds = fresh_cache
+    monkeypatch.setattr(cache_module.settings, "GEOMETRY_WORKERS", 0)
+
+    first = asyncio.run(cache_module.build_glb_async(SPEC, layout="nodes"))
+    second = asyncio.run(cache_module.build_glb_async(SPEC, layout="nodes"))
+
+    assert builds == ["nodes"]
+    assert first == second == cache_module.get_or_build_glb(SPEC, layout="nodes")
+
+
+def test_upload_once_per_bucket_with_upsert(fresh_cache, monkeypatch):
+    """The CAS object is upserted once per bucket and its URL reused"""
+    uploads = []
+
+    async def fake_upload(bucket, path, data, upsert=False):
+        uploads.append((bucket, path, upsert))
+        return f"https://storage/{bucket}/{path}"
+
+    monkeypatch.setattr(storage, "upload_to_bucket", fake_upload)
+    key, glb = cache_module.get_or_build_glb(SPEC)
+
+    urls = [asyncio.run(cache_module.upload_cached_glb(bucket, key, glb)) for bucket in ("geometry", "geometry", "previews")]
+
+    assert uploads == [("geometry", cas_path(key), True), ("previews", cas_path(key), True)]
+    assert urls[0] == urls[1] == f"https://storage/geometry/cas/{key}.glb"
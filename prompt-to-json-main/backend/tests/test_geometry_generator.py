@@ -0,0 +1,182 @@
+"""
+Test cases for the GLB geometry generator
+"""
+
+import hashlib
+import json
+import struct
+
+import numpy as np
+from app.geometry_generator_real import (
+    MAX_OBJECT_COPIES,
+    MAX_UINT16_INDEX,
+    UNSIGNED_INT,
+    UNSIGNED_SHORT,
+    GltfBuilder,
+    generate_real_glb,
+    glb_preamble,
+    object_placements,
+)
+
+# Every object type the original generator handled, with distinct dimensions per object
+OBJECT_TYPES = [
+    "floor", "wall", "door", "window", "roof", "foundation", "column", "beam", "slab", "staircase",
+    "balcony", "bed", "sofa", "table", "chair", "wardrobe", "tv_unit", "bookshelf", "cabinet",
+    "countertop", "island", "car_body", "wheel", "engine", "chassis", "pcb", "component", "housing",
+    "screen", "bedroom", "kitchen", "living_room", "bathroom", "room", "structure", "desk", "unknown_thing",
+]
+
+BASELINE_SPEC = {
+    "objects": [
+        {
+            "id": f"o{i}",
+            "type": object_type,
+            "material": "wood",
+            "dimensions": {"width": 1.5 + i * 0.1, "length": 2 + i * 0.05, "depth": 0.8, "height": 2.5 + i * 0.01},
+        }
+        for i, object_type in enumerate(OBJECT_TYPES)
+    ]
+    + [
+        {"id": "store", "type": "storage", "subtype": "dresser", "dimensions": {"width": 1.2}},
+        {"id": "furn", "type": "furniture", "subtype": "entertainment"},
+    ]
+}
+
+# SHA-256 of the GLB the original per-vertex struct.pack generator produced for BASELINE_SPEC
+BASELINE_GLB_SHA256 = "9cd66d0a28cda8252cf2bcef3fff28bc69cdde1324a54773b8a5113ccb5a3a5a"
+
+
+def split_glb(glb: bytes):
+    """Return (glTF JSON dict, BIN chunk payload) of a GLB"""
+    magic, version, length = struct.unpack_from("<4sII", glb, 0)
+    assert (magic, version, length) == (b"glTF", 2, len(glb))
+    json_length, json_type = struct.unpack_from("<I4s", glb, 12)
+    assert json_type == b"JSON"
+    bin_start = 20 + json_length
+    bin_length, bin_type = struct.unpack_from("<I4s", glb, bin_start)
+    assert bin_type == b"BIN\x00"
+    return json.loads(glb[20:bin_start]), glb[bin_start + 8 : bin_start + 8 + bin_length]
+
+
+def without_bounds(glb: bytes) -> bytes:
+    """Re-encode a GLB without accessor min/max, which the original generator did not write"""
+    gltf, binary = split_glb(glb)
+    for accessor in gltf["accessors"]:
+        accessor.pop("min", None)
+        accessor.pop("max", None)
+    return glb_preamble(json.dumps(gltf).encode("utf-8"), len(binary)) + binary
+
+
+def test_merged_glb_matches_baseline():
+    """Apart from POSITION bounds, the merged layout is byte-identical to the original generator"""
+    glb = generate_real_glb(BASELINE_SPEC)
+
+    assert hashlib.sha256(without_bounds(glb)).hexdigest() == BASELINE_GLB_SHA256
+    assert generate_real_glb(BASELINE_SPEC) == glb
+
+
+def test_material_does_not_change_glb():
+    """Only geometry fields reach the mesh"""
+    recoloured = {"objects": [dict(obj, material="marble") for obj in BASELINE_SPEC["objects"]]}
+
+    assert generate_real_glb(recoloured) == generate_real_glb(BASELINE_SPEC)
+
+
+def test_instanced_layout_shares_one_mesh_per_object():
+    """Repeated objects become one mesh plus an EXT_mesh_gpu_instancing TRANSLATION accessor"""
+    spec = {
+        "objects": [
+            {"id": "window_1", "type": "window", "dimensions": {"width": 1, "height": 1.5}, "count": 3},
+            {"id": "window_2", "type": "window", "dimensions": {"width": 1, "height": 1.5}, "position": [0, 0, 5]},
+            {"id": "door_1", "type": "door", "dimensions": {"width": 0.9, "height": 2.1}},
+        ]
+    }
+
+    gltf, binary = split_glb(generate_real_glb(spec, layout="instanced"))
+
+    assert gltf["extensionsUsed"] == gltf["extensionsRequired"] == ["EXT_mesh_gpu_instancing"]
+    assert len(gltf["meshes"]) == 2 and len(gltf["nodes"]) == 2
+    translation = gltf["accessors"][gltf["nodes"][0]["extensions"]["EXT_mesh_gpu_instancing"]["attributes"]["TRANSLATION"]]
+    assert translation["type"] == "VEC3" and translation["count"] == 4
+
+    view = gltf["bufferViews"][translation["bufferView"]]
+    points = struct.unpack_from("<12f", binary, view["byteOffset"])
+    # count copies sit two widths apart along x, the positioned copy where it was placed
+    assert [points[i : i + 3] for i in range(0, 12, 3)] == [(0, 0, 0), (2, 0, 0), (4, 0, 0), (0, 0, 5)]
+
+
+def _index_accessor(glb: bytes):
+    gltf, binary = split_glb(glb)
+    return gltf["accessors"][gltf["meshes"][0]["primitives"][0]["indices"]], gltf, binary
+
+
+def test_index_type_switches_at_uint16_limit():
+    """Meshes addressing up to 65535 vertices use uint16 indices, larger ones uint32"""
+    for vertex_count, component_type, dtype in [
+        (MAX_UINT16_INDEX, UNSIGNED_SHORT, "<u2"),
+        (MAX_UINT16_INDEX + 1, UNSIGNED_INT, "<u4"),
+    ]:
+        vertices = np.zeros((vertex_count, 3), dtype="<f4")
+        indices = np.array([0, 1, vertex_count - 1], dtype="<u4")
+        builder = GltfBuilder()
+        builder.add_node({"mesh": builder.add_mesh(vertices, indices)})
+
+        accessor, gltf, binary = _index_accessor(builder.to_glb())
+
+        assert accessor["componentType"] == component_type
+        view = gltf["bufferViews"][accessor["bufferView"]]
+        assert view["byteLength"] == 3 * np.dtype(dtype).itemsize
+        stored = np.frombuffer(binary, dtype=dtype, count=3, offset=view["byteOffset"])
+        assert stored.tolist() == [0, 1, vertex_count - 1]
+
+
+def test_large_scene_uses_uint32_indices():
+    """A merged scene past the uint16 limit exports instead of raising"""
+    small = generate_real_glb({"objects": [{"type": "column", "count": MAX_UINT16_INDEX // 8}]})
+    large = generate_real_glb({"objects": [{"type": "column", "count": MAX_UINT16_INDEX // 8 + 1}]})
+
+    assert _index_accessor(small)[0]["componentType"] == UNSIGNED_SHORT
+    accessor, gltf, _ = _index_accessor(large)
+    assert accessor["componentType"] == UNSIGNED_INT
+    assert gltf["accessors"][0]["count"] == (MAX_UINT16_INDEX // 8 + 1) * 8
+
+
+def test_unreadable_placements_fall_back_instead_of_raising():
+    """Specs the original generator ignored still build: bad counts give one copy, bad coordinates 0"""
+    vertices = np.array([[0, 0, 0], [1, 1, 1]], dtype="<f4")
+
+    assert object_placements({"count": "two"}, vertices).tolist() == [[0, 0, 0]]
+    assert object_placements({"position": {"x": None, "y": "up", "z": 2}}, vertices).tolist() == [[0, 0, 2]]
+    assert object_placements({"positions": [[1, None], "here"]}, vertices).tolist() == [[1, 0, 0], [0, 0, 0]]
+    assert len(object_placements({"count": 10 ** 9}, vertices)) == MAX_OBJECT_COPIES
+    assert generate_real_glb({"objects": [{"type": "column", "count": "two", "position": {"x": None}}]})
+
+
+def test_node_layout_names_and_places_objects():
+    """One named node per object, shared meshes for identical objects, POSITION min/max on every mesh"""
+    spec = {
+        "objects": [
+            {"id": "chair_1", "type": "chair", "dimensions": {"width": 0.5, "depth": 0.5, "height": 1}, "position": {"x": 2}},
+            {"id": "chair_2", "type": "chair", "dimensions": {"width": 0.5, "depth": 0.5, "height": 1}, "positions": [[0, 1, 0], [0, 3, 0]]},
+            {"id": "table_1", "type": "table", "dimensions": {"width": 1.2, "depth": 0.8, "height": 0.75}},
+        ]
+    }
+
+    gltf, binary = split_glb(generate_real_glb(spec, layout="nodes"))
+    roots = [gltf["nodes"][i] for i in gltf["scenes"][0]["nodes"]]
+
+    assert [node["name"] for node in roots] == ["chair_1", "chair_2", "table_1"]
+    assert len(gltf["meshes"]) == 2
+    assert roots[0] == {"name": "chair_1", "mesh": 0, "translation": [2.0, 0.0, 0.0]}
+    assert [gltf["nodes"][i] for i in roots[1]["children"]] == [
+        {"mesh": 0, "translation": [0.0, 1.0, 0.0]},
+        {"mesh": 0, "translation": [0.0, 3.0, 0.0]},
+    ]
+    assert roots[2] == {"name": "table_1", "mesh": 1}
+
+    for mesh in gltf["meshes"]:
+        accessor = gltf["accessors"][mesh["primitives"][0]["attributes"]["POSITION"]]
+        view = gltf["bufferViews"][accessor["bufferView"]]
+        points = np.frombuffer(binary, dtype="<f4", count=accessor["count"] * 3, offset=view["byteOffset"]).reshape(-1, 3)
+        assert accessor["min"] == points.min(axis=0).tolist()
+        assert accessor["max"] == points.max(axis=0).tolist()
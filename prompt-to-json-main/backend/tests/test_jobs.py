@@ -0,0 +1,146 @@
+"""
+Test cases for background jobs and the swappable job store
+"""
+
+import asyncio
+import socket
+
+import pytest
+from app import jobs
+from app.job_store import InMemoryJobStore, JobStore, SQLJobStore
+from app.schemas.generate import GenerateRequest
+from pydantic import ValidationError
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def job_store(request, tmp_path):
+    """Run each test against the in-memory and SQL stores"""
+    store = InMemoryJobStore() if request.param == "memory" else SQLJobStore(f"sqlite:///{tmp_path / 'jobs.db'}")
+    jobs.set_job_store(store)
+    yield store
+    jobs.set_job_store(None)
+
+
+def test_job_store_round_trip(job_store):
+    """Created jobs can be read back and updated"""
+    job_store.create({"job_id": "job_1", "status": "queued", "result": None})
+
+    updated = job_store.update("job_1", status="succeeded", result={"preview_url": "x.glb"})
+
+    assert updated["status"] == "succeeded"
+    assert job_store.get("job_1")["result"] == {"preview_url": "x.glb"}
+    assert job_store.get("missing") is None
+    assert job_store.update("missing", status="failed") is None
+
+
+async def test_submitted_job_succeeds(job_store):
+    """Runner results are stored on the job"""
+
+    async def runner(job_id):
+        return {"preview_url": f"{job_id}.glb"}
+
+    job = await jobs.submit_job("preview_upgrade", runner, spec_id="spec_1")
+    events = [event["status"] async for event in jobs.job_events(job["job_id"])]
+
+    final = await jobs.get_job(job["job_id"])
+    assert final["status"] == "succeeded"
+    assert final["result"] == {"preview_url": f"{job['job_id']}.glb"}
+    assert final["spec_id"] == "spec_1"
+    assert events[-1] == "succeeded"
+
+
+async def test_failed_job_records_error(job_store):
+    """Runner exceptions mark the job failed with the error message"""
+
+    async def runner(job_id):
+        await asyncio.sleep(0)
+        raise RuntimeError("All 3D providers failed")
+
+    job = await jobs.submit_job("preview_upgrade", runner)
+    async for _ in jobs.job_events(job["job_id"]):
+        pass
+
+    final = await jobs.get_job(job["job_id"])
+    assert final["status"] == "failed"
+    assert "All 3D providers failed" in final["error"]
+
+
+async def test_job_records_owner(job_store):
+    """The submitting user is stored so the jobs API can restrict access"""
+
+    async def runner(job_id):
+        return {}
+
+    job = await jobs.submit_job("preview_upgrade", runner, owner="alice")
+
+    assert (await jobs.get_job(job["job_id"]))["owner"] == "alice"
+
+
+def test_unfinished_jobs_fail_after_restart(tmp_path):
+    """Jobs left queued or running by a dead process are marked failed; finished jobs are kept"""
+    url = f"sqlite:///{tmp_path / 'jobs.db'}"
+    store = SQLJobStore(url)
+    for job_id, status in [("job_q", "queued"), ("job_r", "running"), ("job_s", "succeeded")]:
+        store.create({"job_id": job_id, "status": status, "result": None})
+
+    jobs.set_job_store(SQLJobStore(url))
+    try:
+        assert jobs.recover_interrupted_jobs() == 2
+    finally:
+        jobs.set_job_store(None)
+
+    assert [store.get(job_id)["status"] for job_id in ("job_q", "job_r", "job_s")] == ["failed", "failed", "succeeded"]
+    assert "restart" in store.get("job_r")["error"]
+    assert InMemoryJobStore().fail_unfinished("restart") == 0
+
+
+def test_job_store_is_abstract():
+    """Stores must implement every operation"""
+
+    class PartialStore(JobStore):
+        def create(self, job):
+            return job
+
+    with pytest.raises(TypeError):
+        PartialStore()
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "file:///etc/passwd",
+        "ftp://example.com/hook",
+        "http://localhost:8000/hook",
+        "http://127.0.0.1/hook",
+        "http://10.0.0.5/hook",
+        "http://169.254.169.254/latest/meta-data",
+        "http://[::1]/hook",
+        "http://metadata.google.internal/hook",
+    ],
+)
+def test_internal_webhook_urls_rejected(url):
+    """Webhooks may not target other schemes, loopback, private or link-local hosts"""
+    with pytest.raises(ValidationError):
+        GenerateRequest(user_id="u1", prompt="2BHK", webhook_url=url)
+
+
+def test_public_webhook_url_accepted():
+    request = GenerateRequest(user_id="u1", prompt="2BHK", webhook_url="https://hooks.example.com/jobs")
+
+    assert str(request.webhook_url) == "https://hooks.example.com/jobs"
+
+
+async def test_webhook_not_sent_to_private_resolution(monkeypatch):
+    """A public-looking host that resolves to a private address is not contacted"""
+    import httpx
+
+    async def fake_getaddrinfo(host, port, *args, **kwargs):
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("192.168.1.20", port))]
+
+    async def fail_post(*args, **kwargs):
+        raise AssertionError("webhook must not be posted")
+
+    monkeypatch.setattr(asyncio.get_running_loop(), "getaddrinfo", fake_getaddrinfo)
+    monkeypatch.setattr(httpx.AsyncClient, "post", fail_post)
+
+    await jobs._notify_webhook("https://hooks.example.com/jobs", {"job_id": "job_1", "status": "succeeded"})
@@ -0,0 +1,104 @@
+"""
+Test cases for batched, memoized reward scoring in the PPO spec-edit envs
+"""
+
+import os
+
+import numpy as np
+import pytest
+import torch
+import app.opt_rl.env_spec as env_spec
+from app.opt_rl.env_spec import RewardScorer, SpecEditEnv, load_reward_tokenizer
+from app.opt_rl.train_ppo import clamp_workers, make_spec_env
+from app.rlhf.reward_model import SimpleRewardModel
+from app.rlhf.tokenizer import HASH_V1_MD5
+from unittest.mock import patch
+
+BASE = {
+    "objects": [
+        {"id": "floor_1", "type": "floor", "material": "wood"},
+        {"id": "sofa_1", "type": "sofa", "material": "fabric_grey"},
+    ],
+    "scene": {},
+}
+
+
+@pytest.fixture
+def rm_ckpt(tmp_path):
+    torch.manual_seed(0)
+    path = tmp_path / "rm.pt"
+    torch.save(SimpleRewardModel().state_dict(), path)
+    return str(path)
+
+
+def test_scorer_batches_and_memoizes():
+    """Unseen texts are scored in one forward pass; repeats come from the cache"""
+    scorer = RewardScorer(SimpleRewardModel(hidden=16), cache_size=2)
+
+    with patch.object(scorer.rm, "forward_bag", wraps=scorer.rm.forward_bag) as forward:
+        first = scorer.score_texts(["a b", "c", "a b"])
+        second = scorer.score_texts(["c", "a b"])
+        scorer.score_texts(["d"])
+
+    assert forward.call_count == 2
+    assert first[0] == first[2] and second.tolist() == [first[1], first[0]]
+    assert list(scorer._cache) == ["a b", "d"]
+
+
+def test_batched_vec_env_matches_per_env_rewards(rm_ckpt):
+    """Rewards scored centrally equal each env scoring its own step"""
+    single = SpecEditEnv(BASE, rm_ckpt=rm_ckpt)
+    venv = make_spec_env(BASE, n_envs=3, vec_env="dummy", rm_ckpt=rm_ckpt)
+    venv.reset()
+    single.reset()
+
+    obs, rewards, dones, infos = venv.step(np.array([0, 0, 2]))
+    _, expected, _, _, _ = single.step(0)
+
+    assert rewards.shape == (3,)
+    assert rewards[0] == rewards[1] == pytest.approx(expected, abs=1e-5)
+    assert obs.shape == (3, 512)
+    venv.close()
+
+
+def test_subproc_vec_env_steps(rm_ckpt):
+    """Envs in worker processes return rewards scored in the parent"""
+    venv = make_spec_env(BASE, n_envs=2, vec_env="subproc", rm_ckpt=rm_ckpt)
+    venv.reset()
+
+    _, rewards, _, infos = venv.step(np.array([0, 1]))
+
+    assert rewards.dtype == np.float32 and len(rewards) == 2
+    assert all("spec_text" in info for info in infos)
+    venv.close()
+
+
+def test_unscored_env_skips_reward_model(rm_ckpt, monkeypatch):
+    """score_rewards=False envs only read the checkpoint's tokenizer and embed like scored envs"""
+    scored = SpecEditEnv(BASE, rm_ckpt=rm_ckpt)
+    monkeypatch.setattr(env_spec, "load_reward_model", lambda *a, **k: 1 / 0)
+    unscored = SpecEditEnv(BASE, rm_ckpt=rm_ckpt, score_rewards=False)
+
+    assert unscored.rm is None and unscored.tokenizer is scored.tokenizer
+    assert np.array_equal(unscored.reset()[0], scored.reset()[0])
+
+
+def test_reward_tokenizer_of_legacy_checkpoint(tmp_path):
+    """Checkpoints without a recorded hash version get the md5 tokenizer and their vocab size"""
+    state = SimpleRewardModel(vocab=1000, hidden=16).state_dict()
+    del state["hash_version"]
+    torch.save(state, tmp_path / "rm_v1.pt")
+
+    tokenizer = load_reward_tokenizer(str(tmp_path / "rm_v1.pt"))
+
+    assert (tokenizer.vocab, tokenizer.version) == (1000, HASH_V1_MD5)
+
+
+def test_vec_env_and_workers_validated(rm_ckpt):
+    """Unknown vec_env values are rejected; worker counts are clamped to 1..cpu_count"""
+    with pytest.raises(ValueError):
+        make_spec_env(BASE, n_envs=1, vec_env="forkserver", rm_ckpt=rm_ckpt)
+
+    assert clamp_workers(0) == 1
+    assert clamp_workers("2") == min(2, os.cpu_count())
+    assert clamp_workers(10_000) == os.cpu_count()
@@ -0,0 +1,83 @@
+"""
+Test cases for the 3D provider orchestrator using local fake providers
+"""
+
+import asyncio
+
+import pytest
+from app.provider_orchestrator import GeometryProvider, race_providers
+
+GLB = b"glTF\x02\x00\x00\x00" + b"\x00" * 16
+
+
+def fake_provider(name, delay, result=GLB, calls=None):
+    """Provider that sleeps ``delay`` seconds then returns ``result`` (or raises it)"""
+
+    async def generate(prompt, dimensions):
+        if calls is not None:
+            calls.append(name)
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return GeometryProvider(name, generate, timeout=5.0)
+
+
+async def test_parallel_race_returns_fastest_valid_glb():
+    """With hedge_delay=0 every provider starts at once and the fastest wins"""
+    providers = [fake_provider("slow", 0.5), fake_provider("fast", 0.01)]
+
+    result = await race_providers("prompt", {}, providers, hedge_delay=0)
+
+    assert result == ("fast", GLB)
+
+
+async def test_hedged_race_starts_next_provider_after_delay():
+    """The second provider only starts once the first has been silent for hedge_delay"""
+    calls = []
+    providers = [fake_provider("meshy", 1.0, calls=calls), fake_provider("tripo", 0.01, calls=calls)]
+
+    result = await race_providers("prompt", {}, providers, hedge_delay=0.05)
+
+    assert result == ("tripo", GLB)
+    assert calls == ["meshy", "tripo"]
+
+
+async def test_failures_fall_through_without_waiting_for_hedge():
+    """Errors and invalid payloads immediately start the next provider"""
+    providers = [
+        fake_provider("broken", 0, result=RuntimeError("quota exceeded")),
+        fake_provider("garbage", 0, result=b"not a glb"),
+        fake_provider("local", 0),
+    ]
+
+    result = await race_providers("prompt", {}, providers, hedge_delay=60)
+
+    assert result == ("local", GLB)
+
+
+async def test_all_providers_failing_returns_none():
+    """No valid GLB from any provider yields None"""
+    providers = [fake_provider("a", 0, result=None), fake_provider("b", 0, result=RuntimeError("down"))]
+
+    assert await race_providers("prompt", {}, providers, hedge_delay=0) is None
+
+
+async def test_losing_providers_are_cancelled():
+    """Providers still running when a winner is found are cancelled"""
+    cancelled = []
+
+    async def hang(prompt, dimensions):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("hang")
+            raise
+
+    providers = [GeometryProvider("hang", hang, timeout=30.0), fake_provider("fast", 0.01)]
+
+    result = await race_providers("prompt", {}, providers, hedge_delay=0)
+
+    assert result == ("fast", GLB)
+    assert cancelled == ["hang"]
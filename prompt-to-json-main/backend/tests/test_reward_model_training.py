@@ -0,0 +1,83 @@
+"""
+Test cases for batched reward model training
+"""
+
+import os
+
+import app.rlhf.train_rm as train_rm
+import torch
+from app.rlhf.reward_model import SimpleRewardModel, flatten_spec
+from app.rlhf.train_rm import PreferenceDataset, collate_pairs, load_or_build_dataset, train_reward_model
+
+
+def _pairs(n):
+    specs = [{"objects": [{"id": "floor_1", "material": m}] * (i % 3 + 1)} for i, m in enumerate(["wood", "marble", "oak"])]
+    return [("Improve design", specs[i % 3], specs[(i + 1) % 3], "AB"[i % 2]) for i in range(n)]
+
+
+def test_batch_scores_match_single_forward():
+    """EmbeddingBag batches score each pair like the padded single-sequence forward"""
+    pairs = _pairs(5)
+    ds = PreferenceDataset.from_pairs(pairs)
+    model = SimpleRewardModel(hidden=32)
+    idx = torch.tensor([3, 0, 4])
+
+    c_ids, c_off, r_ids, r_off = ds.batch(idx)
+
+    for k, i in enumerate(idx.tolist()):
+        prompt, A, B, pref = pairs[i]
+        chosen = A if pref == "A" else B
+        expected = model(model.tokenizer.encode(prompt + " " + flatten_spec(chosen)).unsqueeze(0))
+        assert torch.allclose(model.forward_bag(c_ids, c_off)[k], expected[0], atol=1e-5)
+    assert [t.tolist() for t in collate_pairs([ds[i] for i in idx.tolist()])] == [t.tolist() for t in (c_ids, c_off, r_ids, r_off)]
+
+
+def test_dataset_cached_on_disk(tmp_path, monkeypatch):
+    """Pairs are tokenized once; the same pairs load from the cache"""
+    pairs = _pairs(4)
+    first = load_or_build_dataset(pairs, cache_dir=str(tmp_path))
+
+    monkeypatch.setattr(PreferenceDataset, "from_pairs", classmethod(lambda cls, *a, **k: 1 / 0))
+    second = load_or_build_dataset(pairs, cache_dir=str(tmp_path))
+
+    assert len(list(tmp_path.glob("*.pt"))) == 1
+    assert torch.equal(first.tokens, second.tokens) and torch.equal(first.offsets, second.offsets)
+
+
+def test_training_ranks_preferred_higher(tmp_path):
+    """A short run learns to score the preferred candidate above the other"""
+    pairs = [("p", {"material": "marble"}, {"material": "wood"}, "A")] * 32
+    model = train_reward_model(pairs, epochs=20, lr=1e-3, batch_size=8, cache_dir=str(tmp_path), seed=0)
+
+    c_ids, c_off, r_ids, r_off = PreferenceDataset.from_pairs(pairs[:1]).batch(torch.tensor([0]))
+    with torch.no_grad():
+        assert model.forward_bag(c_ids, c_off) > model.forward_bag(r_ids, r_off)
+
+
+def test_dataset_cache_evicts_least_recently_used(tmp_path):
+    """At most cache_max datasets are kept; loading a cached dataset counts as a use"""
+
+    def cached_pair_counts():
+        return sorted(len(torch.load(p)["offsets"]) // 2 for p in tmp_path.glob("*.pt"))
+
+    for age, n in ((2, 2), (1, 3)):
+        load_or_build_dataset(_pairs(n), cache_dir=str(tmp_path), cache_max=2)
+        (path,) = [p for p in tmp_path.glob("*.pt") if len(torch.load(p)["offsets"]) // 2 == n]
+        os.utime(path, (age, age))
+
+    load_or_build_dataset(_pairs(2), cache_dir=str(tmp_path), cache_max=2)
+    load_or_build_dataset(_pairs(4), cache_dir=str(tmp_path), cache_max=2)
+
+    assert cached_pair_counts() == [2, 4]
+
+
+def test_learning_rate_scales_with_batch_size(tmp_path, monkeypatch):
+    """One step per batch uses lr * batch_size, keeping the per-pair rate of batch_size=1"""
+    rates = []
+    adamw = train_rm.optim.AdamW
+    monkeypatch.setattr(train_rm.optim, "AdamW", lambda params, lr: rates.append(lr) or adamw(params, lr=lr))
+
+    for batch_size in (1, 32):
+        train_reward_model(_pairs(4), epochs=1, lr=1e-4, batch_size=batch_size, cache_dir=str(tmp_path))
+
+    assert rates == [1e-4, 1e-4 * 32]
@@ -0,0 +1,67 @@
+"""
+Test cases for the versioned reward model tokenizer
+"""
+
+import hashlib
+
+import torch
+from app.rlhf.reward_model import SimpleRewardModel, hash_tokenize, score_spec, score_specs
+from app.rlhf.tokenizer import HASH_V1_MD5, HASH_V2_CRC32, HashTokenizer
+
+TEXT = 'Improve design {"objects": [{"id": "floor_1", "material": "wood"}]}'
+
+
+def test_v1_matches_md5_buckets():
+    """Version 1 keeps the original md5 buckets"""
+    expected = [int(hashlib.md5(t.encode()).hexdigest(), 16) % 50000 for t in TEXT.split()]
+
+    assert hash_tokenize(TEXT).tolist() == expected
+    assert HashTokenizer(version=HASH_V1_MD5).ids(TEXT) == expected
+    assert hash_tokenize("").tolist() == [0]
+
+
+def test_encode_batch_offsets():
+    """Batch encoding is the per-text ids back to back with start offsets"""
+    tok = HashTokenizer(version=HASH_V2_CRC32, max_len=4)
+    texts = [TEXT, "", "a b"]
+
+    ids, offsets = tok.encode_batch(texts)
+
+    assert offsets.tolist() == [0, 4, 5]
+    assert ids.tolist() == tok.ids(TEXT) + [0] + tok.ids("a b")
+
+
+def test_token_cache_is_bounded():
+    """The token cache evicts beyond its size"""
+    tok = HashTokenizer(cache_size=8)
+    tok.ids(" ".join(f"t{i}" for i in range(100)))
+    tok.ids("t99 t98")
+
+    info = tok.cache_info()
+    assert info.currsize == 8 and info.hits == 2
+
+
+def test_checkpoint_hash_version(tmp_path):
+    """Legacy checkpoints load as md5; new ones keep their version"""
+    legacy = SimpleRewardModel(hidden=16).state_dict()
+    del legacy["hash_version"]
+    path = tmp_path / "rm.pt"
+    torch.save(legacy, path)
+
+    model = SimpleRewardModel(hidden=16)
+    model.load_state_dict(torch.load(path))
+    assert model.tokenizer.version == HASH_V1_MD5
+
+    torch.save(SimpleRewardModel(hidden=16).state_dict(), path)
+    model.load_state_dict(torch.load(path))
+    assert model.tokenizer.version == HASH_V2_CRC32
+
+
+def test_score_specs_matches_single_scores():
+    """Batched scoring equals scoring specs one at a time"""
+    model = SimpleRewardModel(hidden=16)
+    specs = [{"objects": [{"material": m}] * n} for n, m in [(1, "wood"), (3, "marble"), (2, "oak")]]
+
+    batch = score_specs(model, "Improve design", specs)
+
+    assert torch.allclose(batch, torch.tensor([score_spec(model, "Improve design", s) for s in specs]), atol=1e-5)
@@ -10,7 +10,8 @@ from pathlib import Path
 from typing import Dict, List
 
 import httpx
-import PyPDF2
+from app.pdf_pages import iter_pdf_pages
+from app.rule_classifier import extract_document_rules
 from prefect import flow, get_run_logger, task
 from prefect.tasks import task_input_hash
 
@@ -40,22 +41,13 @@ def download_pdf_from_storage(pdf_url: str, local_path: str) -> str:
 
 @task(name="extract_text_from_pdf", retries=2)
 def extract_text_from_pdf(pdf_path: str) -> str:
-    """Extract text content from PDF"""
+    """Extract text content from PDF, page-parallel with a per-page text cache"""
     logger = get_run_logger()
     logger.info(f"Extracting text from {pdf_path}")
 
-    text_content = []
-
-    with open(pdf_path, "rb") as f:
-        pdf_reader = PyPDF2.PdfReader(f)
-        num_pages = len(pdf_reader.pages)
-
-        logger.info(f"PDF has {num_pages} pages")
-
-        for page_num in range(num_pages):
-            page = pdf_reader.pages[page_num]
-            text = page.extract_text()
-            text_content.append(text)
+    # Pages sharded across processes; unchanged PDFs are served from the page text cache
+    text_content = [text for _, text in iter_pdf_pages(pdf_path, engines=("pypdf2",))]
+    logger.info(f"PDF has {len(text_content)} pages")
 
     full_text = "\n\n".join(text_content)
     logger.info(f"Extracted {len(full_text)} characters")
@@ -65,50 +57,16 @@ def extract_text_from_pdf(pdf_path: str) -> str:
 
 @task(name="parse_compliance_rules", retries=1)
 def parse_compliance_rules(text_content: str, city: str) -> Dict:
-    """Parse compliance rules from text using regex patterns"""
+    """Parse compliance rules from text using the shared single-pass rule classifier"""
     logger = get_run_logger()
     logger.info(f"Parsing compliance rules for {city}")
 
     rules = {"city": city, "rules": [], "sections": []}
 
-    # FSI Rules - FIXED
-    fsi_pattern = r"FSI[:\s]+(\d+\.?\d*)"
-    fsi_matches = re.findall(fsi_pattern, text_content, re.IGNORECASE)
-    for fsi_value in fsi_matches:  # FIXED: Loop through matches
-        rules["rules"].append(
-            {"type": "fsi", "value": float(fsi_value), "description": f"Floor Space Index (FSI) regulation"}
-        )
-        logger.info(f"Found FSI rule: {fsi_value}")
-
-    # Setback Rules
-    setback_pattern = r"setback[:\s]+(\d+\.?\d*)\s*(m|meter|metre|feet|ft)"
-    setback_matches = re.findall(setback_pattern, text_content, re.IGNORECASE)
-    for match in setback_matches:
-        value, unit = match
-        rules["rules"].append(
-            {"type": "setback", "value": float(value), "unit": unit, "description": f"Minimum setback requirement"}
-        )
-        logger.info(f"Found setback rule: {value} {unit}")
-
-    # Height Restrictions
-    height_pattern = r"maximum height[:\s]+(\d+\.?\d*)\s*(m|meter|metre|feet|ft)"
-    height_matches = re.findall(height_pattern, text_content, re.IGNORECASE)
-    for match in height_matches:
-        value, unit = match
-        rules["rules"].append(
-            {"type": "height", "value": float(value), "unit": unit, "description": f"Maximum building height"}
-        )
-        logger.info(f"Found height rule: {value} {unit}")
-
-    # Parking Requirements
-    parking_pattern = r"parking[:\s]+(\d+)\s*(?:space|slot|car).*per.*(\d+)\s*(?:sq.*ft|sqft|m2)"
-    parking_matches = re.findall(parking_pattern, text_content, re.IGNORECASE)
-    for match in parking_matches:
-        spaces, area = match
-        rules["rules"].append(
-            {"type": "parking", "spaces_per_area": f"{spaces} per {area}", "description": f"Parking space requirements"}
-        )
-        logger.info(f"Found parking rule: {spaces} per {area}")
+    # FSI, setback, height and parking rules from a single scan of the text
+    for rule in extract_document_rules(text_content):
+        rules["rules"].append(rule)
+        logger.info(f"Found {rule['type']} rule: {rule.get('value', rule.get('spaces_per_area'))}")
 
     # Extract section headings
     section_pattern = r"^([A-Z][A-Z\s]+)$"
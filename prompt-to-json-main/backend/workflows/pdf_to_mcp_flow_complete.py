@@ -10,19 +10,9 @@ from pathlib import Path
 from typing import Dict, List
 
 import httpx
+from app.pdf_pages import iter_pdf_pages
+from app.rule_classifier import extract_document_rules
 from prefect import flow, get_run_logger, task
-
-# Optional PDF processing
-try:
-    import PyPDF2
-except ImportError:
-
-    class MockPyPDF2:
-        class PdfReader:
-            def __init__(self, file):
-                self.pages = []
-
-    PyPDF2 = MockPyPDF2()
 from prefect.tasks import task_input_hash
 
 
@@ -75,18 +65,9 @@ def extract_text_from_pdf(pdf_path: str) -> str:
     logger.info(f"Extracting text from {pdf_path}")
 
     try:
-        text_content = []
-
-        with open(pdf_path, "rb") as f:
-            pdf_reader = PyPDF2.PdfReader(f)
-            num_pages = len(pdf_reader.pages)
-
-            logger.info(f"PDF has {num_pages} pages")
-
-            for page_num in range(num_pages):
-                page = pdf_reader.pages[page_num]
-                text = page.extract_text()
-                text_content.append(text)
+        # Pages sharded across processes; unchanged PDFs are served from the page text cache
+        text_content = [text for _, text in iter_pdf_pages(pdf_path, engines=("pypdf2",))]
+        logger.info(f"PDF has {len(text_content)} pages")
 
         full_text = "\n\n".join(text_content)
         logger.info(f"✓ Extracted {len(full_text)} characters")
@@ -100,7 +81,7 @@ def extract_text_from_pdf(pdf_path: str) -> str:
 @task(name="parse_compliance_rules", retries=1)
 def parse_compliance_rules(text_content: str, city: str) -> Dict:
     """
-    Parse compliance rules from text using regex patterns
+    Parse compliance rules from text using the shared single-pass rule classifier
 
     Args:
         text_content: Extracted PDF text
@@ -114,44 +95,10 @@ def parse_compliance_rules(text_content: str, city: str) -> Dict:
 
     rules = {"city": city, "rules": [], "sections": []}
 
-    # FSI Rules - FIXED
-    fsi_pattern = r"FSI[:\s]+(\d+\.?\d*)"
-    fsi_matches = re.findall(fsi_pattern, text_content, re.IGNORECASE)
-    for fsi_value in fsi_matches:
-        rules["rules"].append(
-            {"type": "fsi", "value": float(fsi_value), "description": f"Floor Space Index (FSI) regulation"}
-        )
-        logger.info(f"Found FSI rule: {fsi_value}")
-
-    # Setback Rules
-    setback_pattern = r"setback[:\s]+(\d+\.?\d*)\s*(m|meter|metre|feet|ft)"
-    setback_matches = re.findall(setback_pattern, text_content, re.IGNORECASE)
-    for match in setback_matches:
-        value, unit = match
-        rules["rules"].append(
-            {"type": "setback", "value": float(value), "unit": unit, "description": f"Minimum setback requirement"}
-        )
-        logger.info(f"Found setback rule: {value} {unit}")
-
-    # Height Restrictions
-    height_pattern = r"maximum height[:\s]+(\d+\.?\d*)\s*(m|meter|metre|feet|ft)"
-    height_matches = re.findall(height_pattern, text_content, re.IGNORECASE)
-    for match in height_matches:
-        value, unit = match
-        rules["rules"].append(
-            {"type": "height", "value": float(value), "unit": unit, "description": f"Maximum building height"}
-        )
-        logger.info(f"Found height rule: {value} {unit}")
-
-    # Parking Requirements
-    parking_pattern = r"parking[:\s]+(\d+)\s*(?:space|slot|car).*per.*(\d+)\s*(?:sq.*ft|sqft|m2)"
-    parking_matches = re.findall(parking_pattern, text_content, re.IGNORECASE)
-    for match in parking_matches:
-        spaces, area = match
-        rules["rules"].append(
-            {"type": "parking", "spaces_per_area": f"{spaces} per {area}", "description": f"Parking space requirements"}
-        )
-        logger.info(f"Found parking rule: {spaces} per {area}")
+    # FSI, setback, height and parking rules from a single scan of the text
+    for rule in extract_document_rules(text_content):
+        rules["rules"].append(rule)
+        logger.info(f"Found {rule['type']} rule: {rule.get('value', rule.get('spaces_per_area'))}")
 
     # Extract section headings
     section_pattern = r"^([A-Z][A-Z\s]+)$"
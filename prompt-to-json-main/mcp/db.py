@@ -3,11 +3,12 @@ MCP Database Layer
 Handles all MongoDB connections and operations for the MCP (Model Context Protocol) system.
 """
 import os
+import time
 import logging
-from typing import Optional
-from pymongo import MongoClient
+from typing import Any, Dict, Iterable, List, Optional
+from pymongo import InsertOne, MongoClient
 from pymongo.database import Database
-from pymongo.errors import ServerSelectionTimeoutError
+from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 from dotenv import load_dotenv
 from urllib.parse import quote_plus
 
@@ -23,6 +24,11 @@ _database: Optional[Database] = None
 # Check if we should use mock MongoDB (for testing)
 USE_MOCK_MONGO = os.environ.get("USE_MOCK_MONGO") == "1"
 
+# Bulk write batching: operations per round-trip and retries on transient network errors
+BULK_BATCH_SIZE = int(os.environ.get("MONGO_BULK_BATCH_SIZE", "500"))
+BULK_RETRIES = int(os.environ.get("MONGO_BULK_RETRIES", "3"))
+BULK_RETRY_DELAY = float(os.environ.get("MONGO_BULK_RETRY_DELAY", "0.5"))
+
 
 def get_database() -> Database:
     """
@@ -116,6 +122,10 @@ def _create_indexes(db: Database):
         # rules collection indexes
         db.rules.create_index([("city", 1), ("rule_id", 1)], unique=True)
         
+        # classified_rules collection indexes (one document per source rule)
+        db.classified_rules.create_index("source_rule_id")
+        db.classified_rules.create_index("city")
+        
         # geometry_outputs collection indexes
         db.geometry_outputs.create_index("case_id")
         
@@ -149,6 +159,122 @@ def get_collection(collection_name: str):
     return db[collection_name]
 
 
+def _batches(items: List[Any], batch_size: Optional[int]) -> Iterable[List[Any]]:
+    size = max(1, batch_size or BULK_BATCH_SIZE)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _not_yet_stored(collection, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop documents whose ``_id`` is already in the collection."""
+    ids = [doc["_id"] for doc in docs if "_id" in doc]
+    if not ids:
+        return docs
+    stored = {doc["_id"] for doc in collection.find({"_id": {"$in": ids}}, {"_id": 1})}
+    return [doc for doc in docs if doc.get("_id") not in stored]
+
+
+def _with_retries(write, retries: Optional[int], what: str):
+    """
+    Run one batch, retrying on connection failures with linear backoff.
+    ``write`` is called with ``retry=True`` after a failure, when the batch
+    may already have been partly applied.
+    """
+    attempts = 1 + max(0, BULK_RETRIES if retries is None else retries)
+    for attempt in range(1, attempts + 1):
+        try:
+            return write(attempt > 1)
+        except ConnectionFailure as e:
+            if attempt == attempts:
+                raise
+            logger.warning(f"{what} failed (attempt {attempt}/{attempts}): {e}; retrying")
+            time.sleep(BULK_RETRY_DELAY * attempt)
+
+
+def bulk_insert(
+    collection,
+    documents: Iterable[Dict[str, Any]],
+    ordered: bool = True,
+    batch_size: Optional[int] = None,
+    retries: Optional[int] = None,
+) -> List[Any]:
+    """
+    Insert documents with one insert_many per batch.
+    
+    A retried batch only resends the documents whose ``_id`` is not stored yet.
+    
+    Args:
+        collection: Target collection
+        documents: Documents to insert (``_id`` is assigned in place, as with insert_many)
+        ordered: Stop at the first failed document within a batch
+        batch_size: Documents per round-trip (default MONGO_BULK_BATCH_SIZE)
+        retries: Retries per batch on connection failures (default MONGO_BULK_RETRIES)
+        
+    Returns:
+        Inserted ids in document order
+    """
+    docs = list(documents)
+
+    def insert(batch, retry):
+        pending = _not_yet_stored(collection, batch) if retry else batch
+        if pending:
+            collection.insert_many(pending, ordered=ordered)
+
+    for batch in _batches(docs, batch_size):
+        _with_retries(
+            lambda retry: insert(batch, retry),
+            retries,
+            f"insert_many into {collection.name}",
+        )
+    return [doc.get("_id") for doc in docs]
+
+
+def bulk_write(
+    collection,
+    operations: Iterable[Any],
+    ordered: bool = True,
+    batch_size: Optional[int] = None,
+    retries: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Apply pymongo write operations (InsertOne, UpdateOne, DeleteMany, ...) in batches.
+    
+    Batches run in sequence, so with ``ordered=True`` operations are applied in
+    the given order. A retried batch drops the InsertOne operations whose document
+    is already stored; updates should be idempotent ($set/upserts) to be safe to retry.
+    
+    Returns:
+        Totals: inserted, matched, modified, upserted, deleted
+    """
+    totals = {"inserted": 0, "matched": 0, "modified": 0, "upserted": 0, "deleted": 0}
+
+    def write(batch, retry):
+        if not retry:
+            return collection.bulk_write(batch, ordered=ordered), 0
+        # bulk_write assigns _id to InsertOne documents in place, so they can be looked up
+        inserts = [op._doc for op in batch if isinstance(op, InsertOne)]
+        pending = {id(doc) for doc in _not_yet_stored(collection, inserts)}
+        resend = [op for op in batch if not isinstance(op, InsertOne) or id(op._doc) in pending]
+        stored = len(inserts) - len(pending)
+        return (collection.bulk_write(resend, ordered=ordered) if resend else None), stored
+
+    for batch in _batches(list(operations), batch_size):
+        result, already_stored = _with_retries(
+            lambda retry: write(batch, retry),
+            retries,
+            f"bulk_write on {collection.name}",
+        )
+        totals["inserted"] += already_stored
+        if result is None:
+            continue
+        totals["inserted"] += result.inserted_count
+        totals["matched"] += result.matched_count
+        totals["modified"] += result.modified_count
+        totals["upserted"] += result.upserted_count
+        totals["deleted"] += result.deleted_count
+    return totals
+
+
 # Collection name constants for consistency
 class Collections:
     """MongoDB collection name constants."""
@@ -0,0 +1,56 @@
+"""
+Benchmark batch compliance evaluation against per-spec evaluate_all_rules.
+- Reuses the synthetic corpus from benchmark_rule_index
+- Reports columnar check throughput and end-to-end results time
+
+Usage:
+  python -m scripts.benchmark_batch_evaluation
+  python -m scripts.benchmark_batch_evaluation --rules 1000 --specs 2000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from agents.compliance_pipeline import LimitChecks, evaluate_all_rules
+from scripts.benchmark_rule_index import build_corpus, build_specs
+
+
+def run_benchmark(rule_count: int, spec_count: int, loop_specs: int) -> None:
+    rules = build_corpus(rule_count)
+    specs = build_specs(spec_count)
+
+    start = time.perf_counter()
+    checks = LimitChecks(rules, specs)
+    checks_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    checks.results()
+    results_s = time.perf_counter() - start
+
+    sample = specs[:loop_specs]
+    start = time.perf_counter()
+    for spec in sample:
+        evaluate_all_rules(rules, spec)
+    loop_s = (time.perf_counter() - start) * spec_count / len(sample)
+
+    pairs = rule_count * spec_count
+    print("Batch Evaluation Benchmark")
+    print(f"Batch: {spec_count} specs x {rule_count} rules = {pairs} spec x rule pairs")
+    print("=" * 50)
+    print(f"{'columnar checks':<18} {checks_s * 1000:>10.1f} ms {pairs / (checks_s * 1000):>10.0f} pairs/ms")
+    print(f"{'+ clean results':<18} {(checks_s + results_s) * 1000:>10.1f} ms")
+    print(f"{'per-spec loop':<18} {loop_s * 1000:>10.1f} ms (extrapolated from {len(sample)} specs)")
+
+
+if __name__ == "__main__":
+    import logging
+
+    logging.disable(logging.INFO)
+    parser = argparse.ArgumentParser(description="Benchmark batch compliance evaluation")
+    parser.add_argument("--rules", type=int, default=1000)
+    parser.add_argument("--specs", type=int, default=2000)
+    parser.add_argument("--loop-specs", type=int, default=100)
+    args = parser.parse_args()
+
+    run_benchmark(args.rules, args.specs, args.loop_specs)
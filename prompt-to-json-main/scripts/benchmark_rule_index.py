@@ -0,0 +1,165 @@
+"""
+Benchmark rule filtering against a synthetic DCPR/DCR corpus.
+- Compares the original per-spec linear scan with the compiled RuleIndex
+- Verifies both select the same rules, in the same order
+
+Usage:
+  python -m scripts.benchmark_rule_index
+  python -m scripts.benchmark_rule_index --rules 10000 --specs 500
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Any, Dict, List
+
+from agents.compliance_pipeline import RuleIndex, filter_applicable_rules
+
+CITIES = ["Mumbai", "Pune", "Nashik", "Ahmedabad", "Surat", "Nagpur", "Thane", "Indore"]
+ZONES = ["R1", "R2", "C1", "C2", "I1"]
+USES = ["residential", "commercial", "mixed", "industrial"]
+SIGNATURES = [
+    ["height_m"],
+    ["height_m", "abutting_road_width_m"],
+    ["plot_area_sq_m", "fsi"],
+    ["setback_m", "abutting_road_width_m"],
+    ["plot_area_sq_m", "building_use"],
+    ["height_m", "plot_width_m"],
+]
+
+
+def build_corpus(rule_count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """Synthetic corpus with a realistic share of duplicates and city-agnostic rules"""
+    rng = random.Random(seed)
+    rules = []
+    for i in range(rule_count):
+        if rules and rng.random() < 0.05:
+            rules.append(dict(rng.choice(rules)))  # duplicate import of an existing clause
+            continue
+        conditions: Dict[str, Any] = {"land_use_zone": rng.sample(ZONES, rng.randint(1, 3))}
+        if rng.random() < 0.6:
+            low = rng.choice([0, 6, 9, 12, 18])
+            conditions["abutting_road_width_m"] = {"min": low, "max": low + rng.choice([6, 12, 30])}
+        if rng.random() < 0.4:
+            conditions["building_use"] = rng.choice(USES)
+        rules.append({
+            "clause_no": f"{i // 3}.{i % 3}",
+            "city": None if rng.random() < 0.02 else rng.choice(CITIES),
+            "required_fields": rng.choice(SIGNATURES),
+            "conditions": conditions,
+            "limits": {"height_m": {"max": rng.choice([15, 24, 32, 45, 70])}},
+        })
+    return rules
+
+
+def build_specs(spec_count: int, seed: int = 11) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "city": rng.choice(CITIES),
+            "land_use_zone": rng.choice(ZONES),
+            "plot_area_sq_m": rng.choice([250, 500, 1000, 4000]),
+            "plot_width_m": rng.choice([None, 12, 20, 30]),
+            "abutting_road_width_m": rng.choice([6, 9, 12, 18, 24, 30]),
+            "building_use": rng.choice(USES),
+            "height_m": rng.choice([9, 15, 24, 32, 50]),
+            "fsi": rng.choice([None, 1.0, 1.5, 2.5]),
+            "setback_m": rng.choice([None, 3, 4.5, 6]),
+        }
+        for _ in range(spec_count)
+    ]
+
+
+def linear_filter(rules: List[Dict[str, Any]], spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Original filter_applicable_rules: interpret every rule for every spec"""
+
+    def conditions_match(conditions: Dict[str, Any], subject: Dict[str, Any]) -> bool:
+        if not conditions:
+            return True
+        for field, cond in conditions.items():
+            val = subject.get(field)
+            if val is None:
+                return False
+            if isinstance(cond, list):
+                if val not in cond:
+                    return False
+            elif isinstance(cond, dict):
+                min_v = cond.get("min")
+                max_v = cond.get("max")
+                eq_v = cond.get("equals")
+                if min_v is not None and float(val) < float(min_v):
+                    return False
+                if max_v is not None and float(val) > float(max_v):
+                    return False
+                if eq_v is not None and val != eq_v:
+                    return False
+            else:
+                if val != cond:
+                    return False
+        return True
+
+    applicable = []
+    seen_clauses = set()
+    for rule in rules:
+        clause_no = rule.get("clause_no") or rule.get("id")
+        rule_city = (rule.get("city") or spec.get("city") or "").lower()
+        if rule_city and rule_city != (spec.get("city") or "").lower():
+            continue
+        if clause_no in seen_clauses:
+            continue
+        required_fields = rule.get("required_fields") or []
+        if not required_fields:
+            continue
+        if not all(spec.get(f) is not None for f in required_fields):
+            continue
+        if not conditions_match(rule.get("conditions", {}), spec):
+            continue
+        applicable.append(rule)
+        seen_clauses.add(clause_no)
+    return applicable
+
+
+def run_benchmark(rule_count: int, spec_count: int) -> None:
+    rules = build_corpus(rule_count)
+    specs = build_specs(spec_count)
+
+    start = time.perf_counter()
+    expected = [linear_filter(rules, spec) for spec in specs]
+    linear_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = RuleIndex(rules)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [filter_applicable_rules(index, spec) for spec in specs]
+    indexed_s = time.perf_counter() - start
+
+    mismatches = sum(
+        1 for want, got in zip(expected, actual) if [id(r) for r in want] != [id(r) for r in got]
+    )
+    matched = sum(len(result) for result in actual) / len(actual)
+
+    print("Rule Filtering Benchmark")
+    print(f"Corpus: {rule_count} rules, {spec_count} specs, {matched:.1f} applicable rules/spec")
+    print("=" * 50)
+    print(f"{'linear scan':<16} {linear_s * 1000 / spec_count:>10.3f} ms/spec")
+    print(f"{'index build':<16} {build_s * 1000:>10.1f} ms (once)")
+    print(f"{'rule index':<16} {indexed_s * 1000 / spec_count:>10.3f} ms/spec")
+    print(f"{'speedup':<16} {linear_s / indexed_s:>10.1f}x")
+    print(f"{'mismatches':<16} {mismatches:>10}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    import logging
+
+    logging.disable(logging.INFO)
+    parser = argparse.ArgumentParser(description="Benchmark compiled rule filtering")
+    parser.add_argument("--rules", type=int, default=10000)
+    parser.add_argument("--specs", type=int, default=500)
+    args = parser.parse_args()
+
+    run_benchmark(args.rules, args.specs)
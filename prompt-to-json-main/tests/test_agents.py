@@ -93,6 +93,30 @@ class TestCalculatorAgent:
         assert results[0]["checks"]["height"]["ok"] is False
         mock_save_summary.assert_called_once()
 
+    @patch('agents.calculator_agent.get_rules_for_city')
+    @patch('agents.calculator_agent.save_output_summary')
+    @patch('agents.calculator_agent.log_geometry')
+    @patch('agents.calculator_agent.json_to_glb')
+    def test_calculator_agent_uploads_geometry_once_per_status(self, mock_glb, mock_log, mock_save_summary, mock_get_rules):
+        """Geometry is rendered and uploaded once per compliance status, not per rule"""
+        mock_get_rules.return_value = [
+            {"id": f"rule_{i}", "rule": {"clause_no": f"R-{i}", "parsed_fields": {"height": {"op": "<=", "value_m": limit}}}}
+            for i, limit in enumerate([30.0, 24.0, 18.0, 40.0, 12.0])
+        ]
+        mock_glb.return_value = "outputs/geometry/subject.glb"
+
+        results = calculator_agent("Mumbai", {"height_m": 20.0})
+
+        assert len(results) == 5
+        assert mock_glb.call_count == 2
+        assert [r["geometry_case_id"] for r in results] == ["rule_0", "rule_0", "rule_2", "rule_0", "rule_2"]
+
+        # Every rule id is still logged; only the first rule of each status carries the file
+        assert [c.args[0] for c in mock_log.call_args_list] == [f"rule_{i}" for i in range(5)]
+        uploads = [c.args[0] for c in mock_log.call_args_list if c.kwargs.get("include_file_blob")]
+        assert uploads == ["rule_0", "rule_2"]
+        assert mock_log.call_args_list[4].kwargs["metadata"]["geometry_case_id"] == "rule_2"
+
 
 class TestRLAgent:
     """Test Reinforcement Learning agent"""
@@ -102,7 +126,7 @@ class TestRLAgent:
         """Test RL agent submitting positive feedback"""
         mock_send.return_value = {"success": True, "reward": 2}
         
-        reward = rl_agent_submit_feedback("case_123", "up")
+        reward = rl_agent_submit_feedback("case_123", "up", wait=True)
         assert reward == 2
         mock_send.assert_called_once_with("case_123", "up")
     
@@ -111,7 +135,7 @@ class TestRLAgent:
         """Test RL agent submitting negative feedback"""
         mock_send.return_value = {"success": True, "reward": -2}
         
-        reward = rl_agent_submit_feedback("case_456", "down")
+        reward = rl_agent_submit_feedback("case_456", "down", wait=True)
         assert reward == -2
     
     @patch('agents.rl_agent.send_feedback')
@@ -119,7 +143,7 @@ class TestRLAgent:
         """Test RL agent handling feedback failure"""
         mock_send.return_value = {"success": False, "error": "Connection failed"}
         
-        reward = rl_agent_submit_feedback("case_789", "up")
+        reward = rl_agent_submit_feedback("case_789", "up", wait=True)
         assert reward is None
     
     @patch('agents.rl_agent.send_feedback')
@@ -133,7 +157,7 @@ class TestRLAgent:
         rl_module.TRAIN_LOG = str(tmp_path / "rl_training_logs.json")
         
         try:
-            reward = rl_agent_submit_feedback("case_test", "up", {"test": "metadata"})
+            reward = rl_agent_submit_feedback("case_test", "up", {"test": "metadata"}, wait=True)
             assert reward == 2
             
             # Check log file was created
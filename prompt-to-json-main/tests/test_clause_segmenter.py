@@ -0,0 +1,58 @@
+# tests/test_clause_segmenter.py
+"""
+Tests for streaming clause segmentation over page text
+"""
+from utils.clause_segmenter import ClauseSegmenter, iter_clauses
+
+DOCUMENT = (
+    "Development Control Regulations\n"
+    "Clause 3.1: Maximum height 24 m\n"
+    "for residential buildings\n"
+    "Clause 3.2 - FSI 2.0\n"
+    "4. Setback of 3 m from road\n"
+    "Section 5 Parking 1 ECS per 100 sqm\n"
+)
+
+
+class TestClauseSegmenter:
+    """Test iter_clauses against the whole-document clause rules"""
+
+    def test_clauses_across_page_boundaries(self):
+        """Clauses split mid-line between pages are reassembled"""
+        pages = [(1, DOCUMENT[:45]), (2, DOCUMENT[45:90]), (3, DOCUMENT[90:])]
+
+        clauses = list(iter_clauses(pages))
+
+        assert [(c["clause_no"], c["page"]) for c in clauses] == [("3.1", 1), ("3.2", 3), ("5", 3)]
+        assert clauses[0]["text"] == "Maximum height 24 m\nfor residential buildings"
+        assert clauses[2]["text"] == "Parking 1 ECS per 100 sqm"
+
+    def test_clauses_yielded_before_document_ends(self):
+        """A clause is returned as soon as the next boundary line is read"""
+        segmenter = ClauseSegmenter()
+
+        assert segmenter.feed("Clause 1: FSI 1.5 permitted\n", page=1) == []
+        done = segmenter.feed("Clause 2: Height 30 m\n", page=2)
+
+        assert [c["clause_no"] for c in done] == ["1"]
+        assert [c["clause_no"] for c in segmenter.close()] == ["2"]
+
+    def test_heading_and_paragraph_fallbacks(self):
+        """Without Clause/Section markers, headings and then long paragraphs are used"""
+        headings = list(iter_clauses([(1, "1. Height limited to 24m\n2) Setback 3 m\n")]))
+        paragraph = "A" * 70
+        paragraphs = list(iter_clauses([(1, f"{paragraph}\n\nshort\n\n"), (2, f"{paragraph}\n")]))
+
+        assert [(c["clause_no"], c["text"]) for c in headings] == [("1", "Height limited to 24m"), ("2", "Setback 3 m")]
+        assert [(c["clause_no"], c["page"]) for c in paragraphs] == [(None, 1), (None, 2)]
+
+    def test_empty_clause_keeps_fallbacks(self):
+        """A trailing Clause/Section marker with no text does not discard the heading fallback"""
+        text = "1. Height limited to 24m\n2) Setback 3 m\nSection 9\n"
+
+        clauses = list(iter_clauses([(1, text[:20]), (2, text[20:])]))
+
+        assert [(c["clause_no"], c["text"], c["page"]) for c in clauses] == [
+            ("1", "Height limited to 24m", 1),
+            ("2", "Setback 3 m", 2),
+        ]
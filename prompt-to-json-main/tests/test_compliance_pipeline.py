@@ -0,0 +1,105 @@
+# tests/test_compliance_pipeline.py
+"""
+Tests for compliance rule filtering and batch evaluation
+"""
+from agents.compliance_pipeline import RuleIndex, evaluate_all_rules, evaluate_rules_batch, filter_applicable_rules
+
+
+SPEC = {
+    "city": "Mumbai",
+    "land_use_zone": "R1",
+    "abutting_road_width_m": 12,
+    "height_m": 20.0,
+    "fsi": None,
+}
+
+
+def _rule(clause_no, **overrides):
+    rule = {
+        "clause_no": clause_no,
+        "city": "Mumbai",
+        "required_fields": ["height_m"],
+        "conditions": {},
+        "limits": {"height_m": {"max": 24}},
+    }
+    rule.update(overrides)
+    return rule
+
+
+class TestRuleIndex:
+    """Test RuleIndex filtering semantics"""
+
+    def test_filters_by_city_fields_and_conditions_in_corpus_order(self):
+        """Only rules for the spec's city (or no city) with present fields and matching conditions"""
+        rules = [
+            _rule("1", conditions={"land_use_zone": ["R1", "R2"]}),
+            _rule("2", city="Pune"),
+            _rule("3", city=None),
+            _rule("4", required_fields=["fsi"]),
+            _rule("5", conditions={"abutting_road_width_m": {"min": "9", "max": 18}}),
+            _rule("6", conditions={"abutting_road_width_m": {"min": 18}}),
+            _rule("7", required_fields=[]),
+        ]
+
+        applicable = filter_applicable_rules(rules, SPEC)
+
+        assert [r["clause_no"] for r in applicable] == ["1", "3", "5"]
+
+    def test_duplicate_clause_falls_through_when_first_does_not_apply(self):
+        """A clause variant is still selected when an earlier variant's conditions fail"""
+        rules = [
+            _rule("1", conditions={"land_use_zone": ["C1"]}),
+            _rule("1", conditions={"land_use_zone": ["R1"]}, limits={"height_m": 15}),
+            _rule("1", conditions={"land_use_zone": ["R1"]}),
+        ]
+
+        applicable = filter_applicable_rules(RuleIndex(rules), SPEC)
+
+        assert applicable == [rules[1]]
+
+    def test_identical_duplicates_dropped_at_load(self):
+        """Exact re-imports of a clause are removed when the index is built"""
+        rules = [_rule("1"), _rule("1"), _rule("2")]
+
+        index = RuleIndex(rules)
+
+        assert len(index) == 3
+        assert len(list(index.candidates(SPEC))) == 2
+        assert index.filter(SPEC) == [rules[0], rules[2]]
+
+
+class TestBatchEvaluation:
+    """Test columnar batch evaluation against evaluate_all_rules"""
+
+    @staticmethod
+    def _strip(results):
+        return [{k: v for k, v in result.items() if k != "evaluated_at"} for result in results]
+
+    def test_batch_matches_single_spec_evaluation(self):
+        """Same clean per-clause results as evaluate_all_rules, including skipped rules"""
+        rules = [
+            _rule("1", limits={"height_m": {"min": 10, "max": 24}, "fsi": {"max": "2.5"}}),
+            _rule("2", limits={"height_m": 15, "setback_m": 3}),
+            _rule("3", limits={"height_m": {}}),
+            _rule("4", limits={"height_m": "n/a"}),
+            _rule("5", limits={"land_use_zone": 5}),
+            _rule("6", limits={}),
+            _rule("7", limits={"height_m": None}),
+        ]
+        specs = [SPEC, dict(SPEC, fsi=3.0, height_m=9), dict(SPEC, height_m=None), {}]
+
+        batch = evaluate_rules_batch(rules, specs)
+
+        assert [self._strip(results) for results in batch] == [
+            self._strip(evaluate_all_rules(rules, spec)) for spec in specs
+        ]
+
+    def test_batch_with_index_evaluates_applicable_rules_only(self):
+        """With a RuleIndex each spec only gets its filtered rules"""
+        rules = [_rule("1"), _rule("2", city="Pune"), _rule("3", conditions={"land_use_zone": ["C1"]})]
+        specs = [SPEC, dict(SPEC, city="Pune")]
+
+        batch = evaluate_rules_batch(rules, specs, index=RuleIndex(rules))
+
+        assert [[result["clause_no"] for result in results] for results in batch] == [["1"], ["2"]]
+        assert batch[0][0]["checks"]["height_m"] == {"rule_max": 24.0, "subject": 20.0, "ok": True}
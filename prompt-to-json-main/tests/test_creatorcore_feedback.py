@@ -32,7 +32,8 @@ class TestCreatorCoreFeedback:
                 user_feedback="up",
                 metadata={"city": "Mumbai"},
                 prompt="Test prompt",
-                output={"result": "test"}
+                output={"result": "test"},
+                wait=True
             )
 
             assert reward == 2
@@ -53,7 +54,8 @@ class TestCreatorCoreFeedback:
             reward = rl_agent_submit_feedback(
                 case_id="test_456",
                 user_feedback="down",
-                metadata={"city": "Pune"}
+                metadata={"city": "Pune"},
+                wait=True
             )
 
             assert reward == -2
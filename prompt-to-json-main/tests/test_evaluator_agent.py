@@ -0,0 +1,83 @@
+# tests/test_evaluator_agent.py
+"""
+Tests for batch project evaluation (per-city rule cache, bulk write-back)
+"""
+import os
+
+import mongomock
+import pytest
+from unittest.mock import patch
+
+# evaluator_agent requires MONGO_URI at import time (the client connects lazily)
+os.environ.setdefault("MONGO_URI", "mongodb://mock:27017")
+import agents.evaluator_agent as evaluator
+import agents.rule_classification_agent as classifier
+
+
+@pytest.fixture
+def eval_db():
+    """mongomock projects/classified_rules/evaluations and an empty rules cache"""
+    db = mongomock.MongoClient().test_db
+    evaluator.invalidate_rules_cache()
+    with patch.object(evaluator, "PROJECTS_COL", db.projects), \
+            patch.object(evaluator, "CLASSIFIED_COL", db.classified_rules), \
+            patch.object(evaluator, "EVAL_COL", db.evaluations):
+        yield db
+    evaluator.invalidate_rules_cache()
+
+
+def _seed(db):
+    db.classified_rules.insert_many([
+        {"city": "Mumbai", "category": "height", "details": {"value": 24.0}},
+        {"city": "Pune", "category": "fsi", "details": {"value": 1.5}},
+    ])
+    db.projects.insert_many(
+        [{"city": "Mumbai", "status": "pending", "parameters": {"height_m": 20 + i}} for i in range(6)]
+        + [{"city": "Pune", "status": "pending", "parameters": {"fsi": 2.0}}]
+    )
+
+
+class TestEvaluatePendingProjects:
+    """Test evaluate_pending_projects batching"""
+
+    def test_rules_loaded_once_for_all_cities(self, eval_db):
+        """All projects' cities are fetched in one rules query"""
+        _seed(eval_db)
+
+        with patch.object(eval_db.classified_rules, "find", wraps=eval_db.classified_rules.find) as find:
+            evals = evaluator.evaluate_pending_projects()
+
+        assert find.call_count == 1
+        assert len(evals) == 7
+        assert [e["overall_status"] for e in evals[:6]] == ["COMPLIANT"] * 5 + ["PARTIALLY_COMPLIANT"]
+        assert evals[6]["overall_status"] == "NON_COMPLIANT"
+        assert eval_db.evaluations.count_documents({}) == 7
+        assert eval_db.projects.count_documents({"status": "evaluated"}) == 7
+
+    def test_cache_shared_with_single_evaluation(self, eval_db):
+        """evaluate_single_project reuses rules cached by the batch run until invalidated"""
+        _seed(eval_db)
+        evaluator.evaluate_pending_projects(city="Mumbai")
+        project_id = eval_db.projects.insert_one({"city": "Mumbai", "parameters": {"height_m": 30}}).inserted_id
+
+        with patch.object(eval_db.classified_rules, "find", wraps=eval_db.classified_rules.find) as find:
+            evaluator.evaluate_single_project(str(project_id))
+            evaluator.invalidate_rules_cache("Mumbai")
+            evaluator.evaluate_single_project(str(project_id))
+
+        assert find.call_count == 1
+
+    def test_classification_replaces_cached_rules(self, eval_db):
+        """Rules written by classify_rules_for_city are what the evaluator sees next"""
+        _seed(eval_db)
+        assert [r["category"] for r in evaluator.load_classified_rules_for_city("Mumbai")] == ["height"]
+        eval_db.rules.insert_one({"city": "Mumbai", "clause_no": "4.1", "full_text": "FSI 2.5 permitted"})
+
+        with patch.object(classifier, "_collections", return_value=(eval_db.rules, eval_db.classified_rules)):
+            classified = classifier.classify_rules_for_city("Mumbai")
+        with patch.object(eval_db.classified_rules, "find", wraps=eval_db.classified_rules.find) as find:
+            rules = evaluator.load_classified_rules_for_city("Mumbai")
+
+        assert find.call_count == 0
+        assert rules == classified
+        assert [r["category"] for r in rules] == ["fsi"] and rules[0]["_id"]
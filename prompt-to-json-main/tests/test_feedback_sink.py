@@ -0,0 +1,153 @@
+# tests/test_feedback_sink.py
+"""
+Tests for the buffered RL feedback sink (immediate ack, batched background writes)
+"""
+import json
+import statistics
+import time
+
+import pytest
+from unittest.mock import patch
+
+import agents.rl_agent as rl_module
+from agents.feedback_sink import FeedbackCounters, FeedbackSink, append_to_json_array
+
+
+@pytest.fixture
+def sink_env(tmp_path):
+    """Fresh sink and counters writing to tmp_path, with MCP/CreatorCore mocked"""
+    with patch.object(rl_module, "TRAIN_LOG", str(tmp_path / "rl_training_logs.json")), \
+            patch.object(rl_module, "FEEDBACK_FLOW_LOG", str(tmp_path / "reports" / "feedback_flow.jsonl")), \
+            patch.object(rl_module, "FEEDBACK_SUMMARY_FILE", str(tmp_path / "reports" / "feedback_summary.json")), \
+            patch.object(rl_module, "FEEDBACK_FLOW_REPORT", str(tmp_path / "reports" / "feedback_flow.json")), \
+            patch.object(rl_module, "_sink", None), patch.object(rl_module, "_counters", None), \
+            patch.object(rl_module, "_flow_rendered_at", None), \
+            patch.object(rl_module, "send_feedback", lambda case_id, fb: {"success": True, "reward": 2 if fb == "up" else -2}), \
+            patch.object(rl_module, "send_feedback_to_core", return_value={"success": True}) as core, \
+            patch.object(rl_module, "list_feedback_entries", return_value=[]):
+        yield tmp_path, core
+        rl_module.flush_feedback(timeout=30)
+
+
+def _submit_timed(n):
+    """Submit n feedbacks; returns (median ack latency, mean time per feedback until written)"""
+    latencies = []
+    begin = time.perf_counter()
+    for i in range(n):
+        start = time.perf_counter()
+        rl_module.rl_agent_submit_feedback(f"case_{i % 500}", "up" if i % 3 else "down", {"city": "Mumbai"})
+        latencies.append(time.perf_counter() - start)
+    assert rl_module.flush_feedback(timeout=60)
+    return statistics.median(latencies), (time.perf_counter() - begin) / n
+
+
+class TestFeedbackSink:
+    """Test enqueue/ack, batching and log persistence"""
+
+    def test_submit_acks_before_processing(self):
+        """submit returns while the handler is still blocked; wait gets its result"""
+        sink = FeedbackSink(lambda items: time.sleep(0.2) or ["done"] * len(items), flush_interval=0)
+
+        start = time.perf_counter()
+        ticket = sink.submit({"case_id": "c1"})
+        assert time.perf_counter() - start < 0.05
+        assert not ticket.done()
+        assert ticket.wait(5) == "done"
+
+    def test_items_are_batched(self):
+        """Items queued while the writer is busy go to the handler together"""
+        batches = []
+        sink = FeedbackSink(lambda items: batches.append(len(items)) or items, batch_size=50, flush_interval=0.2)
+
+        for i in range(120):
+            sink.submit({"n": i})
+        assert sink.flush(timeout=10)
+
+        assert sum(batches) == 120
+        assert max(batches) == 50 and len(batches) <= 4
+        assert sink.stats()["processed"] == 120
+
+    def test_append_to_json_array_in_place(self, tmp_path):
+        """Appends keep the file one valid JSON array, including from an empty array"""
+        path = tmp_path / "log.json"
+        path.write_text("[]")
+
+        append_to_json_array(str(path), [{"n": 0}])
+        append_to_json_array(str(path), [{"n": 1}, {"n": 2}])
+
+        assert json.loads(path.read_text()) == [{"n": 0}, {"n": 1}, {"n": 2}]
+
+    def test_counters_match_history_confidence(self):
+        """Incremental confidence equals the old full-history calculation"""
+        history = ["up", "up", "down", "up"]
+        counters = FeedbackCounters()
+        for fb in history:
+            counters.add("c1", "Mumbai", fb)
+
+        assert counters.case_confidence("c1") == rl_module._calculate_confidence([{"feedback": fb} for fb in history])
+        assert counters.summary()["cities"]["Mumbai"] == {"up": 3, "down": 1}
+
+    def test_submit_feedback_writes_logs(self, sink_env):
+        """Queued feedback lands in the training log, flow log and summary"""
+        tmp_path, core = sink_env
+
+        assert rl_module.rl_agent_submit_feedback("case_1", "up", {"city": "Pune"}) == 2
+        assert rl_module.rl_agent_submit_feedback("case_1", "down", {"city": "Pune"}, wait=True) == -2
+        assert rl_module.flush_feedback(timeout=10)
+
+        logs = json.loads((tmp_path / "rl_training_logs.json").read_text())
+        assert [r["feedback"] for r in logs] == ["up", "down"]
+        assert logs[-1]["history_size"] == 2 and logs[-1]["confidence_score"] == 0.0
+        assert len((tmp_path / "reports" / "feedback_flow.jsonl").read_text().splitlines()) == 2
+        summary = json.loads((tmp_path / "reports" / "feedback_summary.json").read_text())
+        assert summary["total_feedback"] == 2 and summary["cities"]["Pune"] == {"up": 1, "down": 1}
+        assert core.call_count == 2
+
+    def test_flow_report_rendered_from_log(self, sink_env):
+        """feedback_flow.json keeps its {"feedback_submissions": [...]} shape and old entries"""
+        tmp_path, _ = sink_env
+        (tmp_path / "reports").mkdir()
+        old = {"case_id": "case_0", "feedback": 1, "city": "Pune", "reward": None, "success": False}
+        (tmp_path / "reports" / "feedback_flow.json").write_text(json.dumps({"feedback_submissions": [old], "success_rate": 100}))
+
+        rl_module.rl_agent_submit_feedback("case_1", "up", {"city": "Pune"}, wait=True)
+        rl_module.rl_agent_submit_feedback("case_2", "down", {"city": "Pune"}, wait=True)
+        report = json.loads((tmp_path / "reports" / "feedback_flow.json").read_text())
+        # Within the render interval only the first batch has been rendered
+        assert [e["case_id"] for e in report["feedback_submissions"]] == ["case_0", "case_1"]
+
+        rl_module.render_feedback_flow_report()
+        report = json.loads((tmp_path / "reports" / "feedback_flow.json").read_text())
+        assert report["success_rate"] == 100
+        assert [e["case_id"] for e in report["feedback_submissions"]] == ["case_0", "case_1", "case_2"]
+        assert report["feedback_submissions"][2]["feedback"] == -1
+        assert rl_module._get_feedback_counters().summary()["cities"]["Pune"] == {"up": 2, "down": 1}
+
+
+class TestFeedbackLoad:
+    """Per-feedback latency does not grow with accumulated history"""
+
+    def test_latency_stable_at_100k_entries(self, sink_env):
+        tmp_path, _ = sink_env
+        n = 2000
+
+        # Baseline with no history
+        empty_ack, empty_write = _submit_timed(n)
+
+        # Grow the logs to 100k entries
+        records = [{"case_id": f"case_{i % 500}", "feedback": "up", "reward": 2} for i in range(100_000)]
+        (tmp_path / "rl_training_logs.json").write_text(json.dumps(records))
+        with open(tmp_path / "reports" / "feedback_flow.jsonl", "w") as f:
+            for i in range(100_000):
+                f.write(json.dumps({"case_id": f"case_{i % 500}", "feedback": 1, "city": "Mumbai", "success": True}) + "\n")
+        rl_module._counters = None
+        rl_module._get_feedback_counters()
+
+        loaded_ack, loaded_write = _submit_timed(n)
+
+        assert loaded_ack < 0.001
+        assert loaded_ack < empty_ack * 5 + 0.0002
+        # A full rewrite of 100k records per feedback would cost tens of ms each
+        assert loaded_write < empty_write * 3 + 0.001
+        assert len(json.loads((tmp_path / "rl_training_logs.json").read_text())) == 100_000 + n
+        assert rl_module._counters.total == 100_000 + n
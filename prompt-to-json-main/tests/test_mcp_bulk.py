@@ -0,0 +1,101 @@
+# tests/test_mcp_bulk.py
+"""
+Tests for the batched bulk-write layer in mcp.db (mongomock, USE_MOCK_MONGO=1)
+"""
+import mongomock
+import pytest
+from unittest.mock import patch
+from pymongo import DeleteMany, InsertOne, UpdateOne
+from pymongo.errors import AutoReconnect
+
+from mcp import db as mcp_db
+
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient().test_db.rules
+
+
+class TestBulkWrites:
+    """Test bulk_insert / bulk_write batching and retries"""
+
+    def test_bulk_insert_batches(self, collection):
+        """Documents go out in ceil(n / batch_size) insert_many calls"""
+        docs = [{"city": "Mumbai", "n": i} for i in range(25)]
+
+        with patch.object(collection, "insert_many", wraps=collection.insert_many) as insert_many:
+            ids = mcp_db.bulk_insert(collection, docs, batch_size=10)
+
+        assert insert_many.call_count == 3
+        assert len(ids) == 25 and all(ids)
+        assert collection.count_documents({}) == 25
+
+    def test_bulk_write_keeps_order_across_batches(self, collection):
+        """Later batches see the effects of earlier ones"""
+        ops = [InsertOne({"rule_id": f"r{i}", "status": "new"}) for i in range(5)]
+        ops += [UpdateOne({"rule_id": "r1"}, {"$set": {"status": "done"}}), DeleteMany({"rule_id": "r4"})]
+
+        totals = mcp_db.bulk_write(collection, ops, batch_size=2)
+
+        assert totals["inserted"] == 5 and totals["modified"] == 1 and totals["deleted"] == 1
+        assert collection.find_one({"rule_id": "r1"})["status"] == "done"
+        assert collection.count_documents({}) == 4
+
+    def test_transient_failure_is_retried(self, collection):
+        """A connection failure retries the batch instead of failing the push"""
+        real_insert_many = collection.insert_many
+        calls = []
+
+        def flaky_insert_many(batch, ordered=True):
+            calls.append(len(batch))
+            if len(calls) == 1:
+                raise AutoReconnect("connection reset")
+            return real_insert_many(batch, ordered=ordered)
+
+        with patch.object(mcp_db, "BULK_RETRY_DELAY", 0), patch.object(collection, "insert_many", flaky_insert_many):
+            mcp_db.bulk_insert(collection, [{"n": i} for i in range(3)], retries=2)
+
+        assert calls == [3, 3]
+        assert collection.count_documents({}) == 3
+
+    def test_retry_after_partial_insert_stores_the_rest(self, collection):
+        """A batch cut off mid-way only resends the documents not stored yet"""
+        real_insert_many = collection.insert_many
+        calls = []
+
+        def partial_insert_many(batch, ordered=True):
+            calls.append(len(batch))
+            if len(calls) == 1:
+                real_insert_many(batch[:4], ordered=ordered)
+                raise AutoReconnect("connection reset")
+            return real_insert_many(batch, ordered=ordered)
+
+        docs = [{"_id": f"d{i}"} for i in range(10)]
+        with patch.object(mcp_db, "BULK_RETRY_DELAY", 0), patch.object(collection, "insert_many", partial_insert_many):
+            ids = mcp_db.bulk_insert(collection, docs, retries=2)
+
+        assert calls == [10, 6]
+        assert ids == [f"d{i}" for i in range(10)]
+        assert collection.count_documents({}) == 10
+
+    def test_retry_after_partial_bulk_write_skips_stored_inserts(self, collection):
+        """Inserts already applied are counted, not resent; updates are replayed"""
+        real_bulk_write = collection.bulk_write
+        calls = []
+
+        def partial_bulk_write(ops, ordered=True):
+            calls.append(len(ops))
+            if len(calls) == 1:
+                real_bulk_write(ops[:2], ordered=ordered)
+                raise AutoReconnect("connection reset")
+            return real_bulk_write(ops, ordered=ordered)
+
+        ops = [InsertOne({"rule_id": f"r{i}", "status": "new"}) for i in range(4)]
+        ops.append(UpdateOne({"rule_id": "r3"}, {"$set": {"status": "done"}}))
+        with patch.object(mcp_db, "BULK_RETRY_DELAY", 0), patch.object(collection, "bulk_write", partial_bulk_write):
+            totals = mcp_db.bulk_write(collection, ops, retries=2)
+
+        assert calls == [5, 3]
+        assert totals["inserted"] == 4 and totals["modified"] == 1
+        assert collection.count_documents({}) == 4
+        assert collection.find_one({"rule_id": "r3"})["status"] == "done"
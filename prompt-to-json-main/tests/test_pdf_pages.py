@@ -0,0 +1,92 @@
+# tests/test_pdf_pages.py
+"""
+Tests for page-sharded PDF extraction with the on-disk page text cache
+"""
+import os
+
+import pytest
+from unittest.mock import patch
+
+import utils.pdf_pages as pdf_pages
+
+PAGES = 20
+
+
+@pytest.fixture
+def fake_pdf(tmp_path):
+    """A file plus a fake extraction engine that records the shards it reads"""
+    calls = []
+
+    def count(path):
+        return PAGES
+
+    def extract(path, start, stop):
+        calls.append((start, stop))
+        return [f"FSI 1.{pno} on page {pno + 1}" for pno in range(start, stop)]
+
+    pdf = tmp_path / "dcr.pdf"
+    pdf.write_bytes(b"%PDF-1.4 fake")
+    with patch.dict(pdf_pages.ENGINES, {"fake": (count, extract)}):
+        yield str(pdf), str(tmp_path / "cache"), calls
+
+
+class TestPdfPages:
+    """Test iter_pdf_pages ordering and caching"""
+
+    def test_pages_in_order(self, fake_pdf):
+        """Shards are reassembled into page order"""
+        path, cache_dir, calls = fake_pdf
+
+        pages = list(pdf_pages.iter_pdf_pages(path, engines=("fake",), workers=1, cache_dir=cache_dir))
+
+        assert [pno for pno, _ in pages] == list(range(1, PAGES + 1))
+        assert pages[4][1] == "FSI 1.4 on page 5"
+        assert sum(stop - start for start, stop in calls) == PAGES
+
+    def test_unchanged_pdf_served_from_cache(self, fake_pdf):
+        """Re-ingesting the same file extracts nothing; a changed file is re-read"""
+        path, cache_dir, calls = fake_pdf
+        first = list(pdf_pages.iter_pdf_pages(path, engines=("fake",), workers=1, cache_dir=cache_dir))
+        calls.clear()
+
+        second = list(pdf_pages.iter_pdf_pages(path, engines=("fake",), workers=1, cache_dir=cache_dir))
+        assert second == first
+        assert calls == []
+
+        with open(path, "ab") as f:
+            f.write(b"% revised")
+        list(pdf_pages.iter_pdf_pages(path, engines=("fake",), workers=1, cache_dir=cache_dir))
+        assert sum(stop - start for start, stop in calls) == PAGES
+
+    def test_only_missing_pages_extracted(self, fake_pdf):
+        """A partially cached document only extracts the pages it lacks"""
+        path, cache_dir, calls = fake_pdf
+        list(pdf_pages.iter_pdf_pages(path, engines=("fake",), workers=1, cache_dir=cache_dir))
+        cache = pdf_pages.PageTextCache(cache_dir, pdf_pages.file_digest(path), ("fake",))
+        for pno in (7, 8):
+            os.remove(cache._path(f"{pno:05d}.txt"))
+        calls.clear()
+
+        pages = list(pdf_pages.iter_pdf_pages(path, engines=("fake",), workers=1, cache_dir=cache_dir))
+
+        assert [pno for start, stop in calls for pno in range(start, stop)] == [6, 7]
+        assert pages[7] == (8, "FSI 1.7 on page 8")
+
+    def test_failed_shard_not_cached(self, fake_pdf):
+        """Pages no engine could read are retried, yielded blank and re-extracted next time"""
+        path, cache_dir, calls = fake_pdf
+        count, extract = pdf_pages.ENGINES["fake"]
+
+        def broken(path, start, stop):
+            calls.append((start, stop))
+            raise IOError("damaged xref")
+
+        with patch.dict(pdf_pages.ENGINES, {"fake": (count, broken)}):
+            pages = list(pdf_pages.iter_pdf_pages(path, engines=("fake",), workers=1, cache_dir=cache_dir))
+        assert pages == [(pno, "") for pno in range(1, PAGES + 1)]
+        assert sum(stop - start for start, stop in calls) == 2 * PAGES
+        calls.clear()
+
+        pages = list(pdf_pages.iter_pdf_pages(path, engines=("fake",), workers=1, cache_dir=cache_dir))
+        assert pages[4] == (5, "FSI 1.4 on page 5")
+        assert sum(stop - start for start, stop in calls) == PAGES
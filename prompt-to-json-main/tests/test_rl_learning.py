@@ -112,6 +112,79 @@ def test_policy_save_load(clean_policy, tmp_path):
     assert loaded_policy.q_values[state_key]["height_m"] == clean_policy.q_values[state_key]["height_m"]
 
 
+
+def test_policy_checkpoint_replays_wal(clean_policy, tmp_path):
+    """Checkpoints append deltas to the WAL; load replays them over the snapshot."""
+    policy_file = str(tmp_path / "test_policy.pkl")
+    clean_policy.update("Mumbai", {"height_m": 25.0}, reward=1)
+    clean_policy.save(policy_file)
+
+    clean_policy.update("Mumbai", {"height_m": 30.0}, reward=1)
+    clean_policy.update("Pune", {"fsi": 1.0}, reward=-1)
+    clean_policy.checkpoint(policy_file)
+
+    with open(policy_file + ".wal") as f:
+        assert len(f.readlines()) == 2
+    loaded = SimpleRLPolicy.load(policy_file)
+    mumbai = clean_policy.get_state_key("Mumbai")
+    assert loaded.visit_counts[mumbai] == 2
+    assert loaded.q_values[mumbai] == clean_policy.q_values[mumbai]
+    assert len(loaded.success_history[mumbai]) == 2
+    assert loaded.visit_counts[clean_policy.get_state_key("Pune")] == 1
+
+
+def test_policy_wal_compaction(clean_policy, tmp_path):
+    """Reaching the record threshold folds the WAL into the snapshot."""
+    policy_file = str(tmp_path / "test_policy.pkl")
+    with patch("agents.rl_agent.POLICY_COMPACT_EVERY", 3):
+        for i in range(3):
+            clean_policy.update("Mumbai", {"height_m": 20.0 + i}, reward=1)
+            clean_policy.checkpoint(policy_file)
+
+    assert os.path.getsize(policy_file + ".wal") == 0
+    loaded = SimpleRLPolicy.load(policy_file)
+    assert loaded.visit_counts[clean_policy.get_state_key("Mumbai")] == 3
+
+
+def test_policy_load_after_interrupted_compaction(clean_policy, tmp_path):
+    """WAL records already in the snapshot are skipped; a torn last record is ignored."""
+    policy_file = str(tmp_path / "test_policy.pkl")
+    clean_policy.update("Mumbai", {"height_m": 25.0}, reward=1)
+    clean_policy.checkpoint(policy_file)
+    with open(policy_file + ".wal") as f:
+        wal = f.read()
+
+    # Crash after the snapshot rename but before the WAL was truncated, mid-way through another append
+    clean_policy.save(policy_file)
+    with open(policy_file + ".wal", "w") as f:
+        f.write(wal + '{"seq": 2, "state": ["mum')
+
+    loaded = SimpleRLPolicy.load(policy_file)
+    state_key = clean_policy.get_state_key("Mumbai")
+    assert loaded.visit_counts[state_key] == 1
+    assert len(loaded.success_history[state_key]) == 1
+
+
+def test_policy_load_truncates_torn_wal_tail(clean_policy, tmp_path):
+    """A torn last record is cut off on load, so records appended afterwards still replay."""
+    policy_file = str(tmp_path / "test_policy.pkl")
+    clean_policy.update("Mumbai", {"height_m": 25.0}, reward=1)
+    clean_policy.checkpoint(policy_file)
+    with open(policy_file + ".wal", "a") as f:
+        f.write('{"seq": 2, "state": ["mum')
+
+    loaded = SimpleRLPolicy.load(policy_file)
+    with open(policy_file + ".wal") as f:
+        assert f.read().endswith("}\n")
+    loaded.update("Mumbai", {"height_m": 30.0}, reward=1)
+    loaded.checkpoint(policy_file)
+
+    reloaded = SimpleRLPolicy.load(policy_file)
+    state_key = clean_policy.get_state_key("Mumbai")
+    assert reloaded.visit_counts[state_key] == 2
+    assert reloaded.q_values[state_key] == loaded.q_values[state_key]
+
+
 @patch('agents.rl_agent.send_feedback')
 @patch('agents.rl_agent.send_feedback_to_core')
 @patch('agents.rl_agent.list_feedback_entries')
@@ -134,7 +207,8 @@ def test_rl_agent_submit_feedback_with_learning(mock_list, mock_core, mock_send)
                 "fsi": 2.2,
                 "setback_m": 3.5
             }
-        }
+        },
+        wait=True
     )
     
     # Verify feedback was sent
@@ -1,61 +1,221 @@
 #mcp_store.py
+"""
+Local MCP fallback store.
+
+SQLite in WAL mode instead of whole-file JSON rewrites: each save is a single
+indexed insert, readers never block the writer, and concurrent writers (threads
+or processes) are serialised by SQLite's lock instead of overwriting each other.
+Rules are indexed by city, feedback and geometry by case id.
+
+Legacy rules.json / feedback.json / geometry.json files in MCP_DIR are imported
+once on first use and renamed to *.json.migrated; files that cannot be
+imported are renamed to *.json.corrupt and skipped.
+"""
 import os
 import json
 import uuid
+import logging
+import sqlite3
 import datetime
+import threading
+
+logger = logging.getLogger(__name__)
 
 MCP_DIR = "mcpdata"
 os.makedirs(MCP_DIR, exist_ok=True)
 
+DB_FILE = os.path.join(MCP_DIR, "mcp_store.db")
 RULES_FILE = os.path.join(MCP_DIR, "rules.json")
 FEEDBACK_FILE = os.path.join(MCP_DIR, "feedback.json")
 GEOMETRY_FILE = os.path.join(MCP_DIR, "geometry.json")
 
-def _read(path):
-    if not os.path.exists(path):
-        return {}
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rules (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    city TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    meta TEXT NOT NULL,
+    time TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rules_city ON rules (city, seq);
+CREATE TABLE IF NOT EXISTS feedback (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    case_id TEXT NOT NULL,
+    feedback TEXT NOT NULL,
+    reward INTEGER NOT NULL,
+    time TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS feedback_case ON feedback (case_id, seq);
+CREATE TABLE IF NOT EXISTS geometry (
+    case_id TEXT PRIMARY KEY,
+    file TEXT NOT NULL,
+    time TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS migrations (
+    name TEXT PRIMARY KEY,
+    time TEXT NOT NULL
+);
+"""
+
+
+def _now():
+    return datetime.datetime.utcnow().isoformat() + "Z"
+
+
+class LocalMCPStore:
+    """SQLite (WAL) store with one connection per thread."""
+
+    def __init__(self, db_path, legacy_dir=None):
+        self.db_path = db_path
+        self.legacy_dir = legacy_dir
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        if not self._ready:
+            with self._init_lock:
+                if not self._ready:
+                    conn.executescript(SCHEMA)
+                    if self.legacy_dir:
+                        self._migrate_json(conn)
+                    self._ready = True
+        return conn
+
+    def _write(self, sql, params):
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(sql, params)
+
+    # ---------- legacy JSON import ----------
+    def _migrate_json(self, conn):
+        for name, load in (
+            ("rules.json", self._import_rules),
+            ("feedback.json", self._import_feedback),
+            ("geometry.json", self._import_geometry),
+        ):
+            path = os.path.join(self.legacy_dir, name)
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    # Recorded in the same transaction so concurrent processes import once
+                    if conn.execute("SELECT 1 FROM migrations WHERE name = ?", (name,)).fetchone():
+                        continue
+                    load(conn, data)
+                    conn.execute("INSERT INTO migrations (name, time) VALUES (?, ?)", (name, _now()))
+            except (ValueError, TypeError, AttributeError, sqlite3.IntegrityError) as e:
+                # Unreadable or malformed: set it aside rather than fail every store call
+                logger.warning("Legacy MCP file %s could not be imported (%s); moved to %s.corrupt", path, e, name)
+                self._rename(path, path + ".corrupt")
+                continue
+            self._rename(path, path + ".migrated")
+
+    @staticmethod
+    def _rename(path, target):
+        try:
+            os.replace(path, target)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _import_rules(conn, data):
+        conn.executemany(
+            "INSERT INTO rules (id, city, rule, meta, time) VALUES (?, ?, ?, ?, ?)",
+            [
+                (rec.get("id") or uuid.uuid4().hex[:8], city, json.dumps(rec.get("rule")),
+                 json.dumps(rec.get("meta") or {}), rec.get("time") or _now())
+                for city, recs in data.items() for rec in recs
+            ],
+        )
+
+    @staticmethod
+    def _import_feedback(conn, data):
+        rows = [
+            (case_id, e.get("feedback"), e.get("reward", 0), e.get("time") or _now())
+            for case_id, entries in data.items() for e in entries
+        ]
+        valid = [row for row in rows if row[1] is not None]
+        if len(valid) < len(rows):
+            logger.warning("Skipped %d legacy feedback entries without a feedback value", len(rows) - len(valid))
+        conn.executemany("INSERT INTO feedback (case_id, feedback, reward, time) VALUES (?, ?, ?, ?)", valid)
+
+    @staticmethod
+    def _import_geometry(conn, data):
+        conn.executemany(
+            "INSERT OR REPLACE INTO geometry (case_id, file, time) VALUES (?, ?, ?)",
+            [(case_id, e.get("file"), e.get("time") or _now()) for case_id, e in data.items()],
+        )
+
+    # ---------- API ----------
+    def save_rule(self, city, rule, meta=None):
+        rec_id = uuid.uuid4().hex[:8]
+        self._write(
+            "INSERT INTO rules (id, city, rule, meta, time) VALUES (?, ?, ?, ?, ?)",
+            (rec_id, city, json.dumps(rule), json.dumps(meta or {}), _now()),
+        )
+        return rec_id
+
+    def get_rules(self, city):
+        rows = self._conn().execute(
+            "SELECT id, rule, meta, time FROM rules WHERE city = ? ORDER BY seq", (city,)
+        ).fetchall()
+        return [{"id": i, "rule": json.loads(r), "meta": json.loads(m), "time": t} for i, r, m, t in rows]
+
+    def save_feedback(self, case_id, feedback_type):
+        reward = 2 if feedback_type == "up" else -2
+        self._write(
+            "INSERT INTO feedback (case_id, feedback, reward, time) VALUES (?, ?, ?, ?)",
+            (case_id, feedback_type, reward, _now()),
+        )
+        return reward
+
+    def get_feedback(self, case_id):
+        rows = self._conn().execute(
+            "SELECT feedback, reward, time FROM feedback WHERE case_id = ? ORDER BY seq", (case_id,)
+        ).fetchall()
+        return [{"case_id": case_id, "feedback": f, "reward": r, "time": t} for f, r, t in rows]
+
+    def log_geometry(self, case_id, file_path):
+        self._write(
+            "INSERT OR REPLACE INTO geometry (case_id, file, time) VALUES (?, ?, ?)",
+            (case_id, file_path, _now()),
+        )
+
+    def get_geometry(self, case_id):
+        row = self._conn().execute("SELECT file, time FROM geometry WHERE case_id = ?", (case_id,)).fetchone()
+        return {"file": row[0], "time": row[1]} if row else None
+
+
+_store = LocalMCPStore(DB_FILE, legacy_dir=MCP_DIR)
 
-def _write(path, data):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
 
 def save_rule(city, rule, meta=None):
-    data = _read(RULES_FILE)
-    if city not in data:
-        data[city] = []
-    rec = {
-        "id": uuid.uuid4().hex[:8],
-        "rule": rule,
-        "meta": meta or {},
-        "time": datetime.datetime.utcnow().isoformat() + "Z"
-    }
-    data[city].append(rec)
-    _write(RULES_FILE, data)
-    return rec["id"]
+    return _store.save_rule(city, rule, meta)
 
 def get_rules(city):
-    data = _read(RULES_FILE)
-    return data.get(city, [])
+    return _store.get_rules(city)
 
 def save_feedback(case_id, feedback_type):
-    db = _read(FEEDBACK_FILE)
-    reward = 2 if feedback_type == "up" else -2
-    entry = {
-        "case_id": case_id,
-        "feedback": feedback_type,
-        "reward": reward,
-        "time": datetime.datetime.utcnow().isoformat() + "Z"
-    }
-    db.setdefault(case_id, []).append(entry)
-    _write(FEEDBACK_FILE, db)
-    return reward
+    return _store.save_feedback(case_id, feedback_type)
+
+def get_feedback(case_id):
+    return _store.get_feedback(case_id)
 
 def log_geometry(case_id, file_path):
-    db = _read(GEOMETRY_FILE)
-    db[case_id] = {
-        "file": file_path,
-        "time": datetime.datetime.utcnow().isoformat() + "Z"
-    }
-    _write(GEOMETRY_FILE, db)
+    _store.log_geometry(case_id, file_path)
+
+def get_geometry(case_id):
+    return _store.get_geometry(case_id)
@@ -0,0 +1,15 @@
+# utils/pdf_pages.py
+"""
+Root-tree entry point for page-sharded PDF text extraction.
+
+The implementation lives in backend/app/pdf_pages.py, which deploys on its own;
+the agents import it from there so there is one copy of the extractor.
+"""
+import os
+import sys
+
+_BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+if _BACKEND not in sys.path:
+    sys.path.append(_BACKEND)
+
+from app.pdf_pages import *  # noqa: E402,F401,F403
@@ -0,0 +1,15 @@
+# utils/rule_classifier.py
+"""
+Root-tree entry point for the single-pass rule classifier.
+
+The implementation lives in backend/app/rule_classifier.py, which deploys on its
+own; the agents import it from there so there is one copy of the engine.
+"""
+import os
+import sys
+
+_BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+if _BACKEND not in sys.path:
+    sys.path.append(_BACKEND)
+
+from app.rule_classifier import *  # noqa: E402,F401,F403